@@ -8,9 +8,11 @@ It sets up logging, Datadog APM, Flask, and Slack Bolt app.
 import logging
 import threading
 
-# Datadog APM - must be first
+# Datadog APM - must be first (render workers re-import this module as
+# __mp_main__ and must not patch; under a WSGI server use ddtrace-run)
 from ddtrace import patch_all, tracer
-patch_all()
+if __name__ == "__main__":
+    patch_all()
 
 from flask import Flask, request, jsonify
 from slack_bolt import App
@@ -19,7 +21,9 @@ from slack_bolt.adapter.socket_mode import SocketModeHandler
 
 from config import Config
 from database import db
+from generators import TextRenderer, font_registry
 from slack import register_workflow_step
+from slack.jobs import job_worker
 from slack.oauth import oauth_bp
 from slack.handlers import register_all_handlers
 from routes import register_routes
@@ -50,98 +54,126 @@ logging.getLogger("ddtrace.internal").setLevel(logging.WARNING)
 logging.getLogger("ddtrace.propagation").setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
-logger.info("=" * 50)
-logger.info("Slack Emoji Bot - Starting up...")
-logger.info("=" * 50)
-
-# ============================================================
-# Datadog Tracer Configuration
-# ============================================================
-
-tracer.set_tags({
-    "env": Config.DD_ENV,
-    "version": Config.DD_VERSION,
-    "service": Config.DD_SERVICE,
-})
-
-# ============================================================
-# Slack Bolt App Initialization
-# ============================================================
-
-slack_app = App(
-    token=Config.SLACK_BOT_TOKEN,
-    signing_secret=Config.SLACK_SIGNING_SECRET,
-    # Explicitly disable OAuth to use bot token
-    oauth_settings=None,
-    oauth_flow=None,
-)
-
-# Register workflow step
-register_workflow_step(slack_app)
-
-# Register all Slack handlers (commands, events, actions, modals, home)
-register_all_handlers(slack_app)
-
-# ============================================================
-# Flask App Initialization
-# ============================================================
-
-app = Flask(__name__, static_folder=Config.STATIC_DIR, static_url_path="/static")
-app.config["SQLALCHEMY_DATABASE_URI"] = Config.DATABASE_URL
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
-
-# Initialize database
-db.init_app(app)
-
-# Register blueprints
-app.register_blueprint(oauth_bp)
-register_routes(app)
-
-# Slack request handler for HTTP mode
-handler = SlackRequestHandler(slack_app)
-
-
-# ============================================================
-# Slack Event Routes (HTTP Mode)
-# ============================================================
-
-@app.route("/slack/events", methods=["POST"])
-def slack_events():
-    """Handle Slack events (HTTP mode only)."""
-    return handler.handle(request)
-
-
-@app.route("/slack/interactions", methods=["POST"])
-def slack_interactions():
-    """Handle Slack interactions."""
-    return handler.handle(request)
-
-
-# ============================================================
-# Error Handlers
-# ============================================================
 
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({"error": "Not found"}), 404
 
-
-@app.errorhandler(500)
-def internal_error(error):
-    logger.error(f"Internal error: {error}", exc_info=True)
-    return jsonify({"error": "Internal server error"}), 500
+def create_app() -> Flask:
+    """
+    Create the Flask app with the Slack Bolt app mounted on it.
+    
+    Everything with side effects (tracer tags, font preloading, the Slack
+    auth check) happens here rather than on import: render pool workers are
+    spawned processes that import this module again.
+    
+    Returns:
+        Flask app (the Bolt app is in app.extensions["slack_bolt"])
+    """
+    logger.info("=" * 50)
+    logger.info("Slack Emoji Bot - Starting up...")
+    logger.info("=" * 50)
+    
+    # ============================================================
+    # Datadog Tracer Configuration
+    # ============================================================
+    
+    tracer.set_tags({
+        "env": Config.DD_ENV,
+        "version": Config.DD_VERSION,
+        "service": Config.DD_SERVICE,
+    })
+    
+    # ============================================================
+    # Font Preloading
+    # ============================================================
+    
+    # Open configured fonts once so the first requests don't pay for it
+    # (the reference size is what the font size solver measures first)
+    font_registry.preload(sizes=[Config.DEFAULT_FONT_SIZE, TextRenderer.REFERENCE_FONT_SIZE])
+    
+    # ============================================================
+    # Slack Bolt App Initialization
+    # ============================================================
+    
+    slack_app = App(
+        token=Config.SLACK_BOT_TOKEN,
+        signing_secret=Config.SLACK_SIGNING_SECRET,
+        # Explicitly disable OAuth to use bot token
+        oauth_settings=None,
+        oauth_flow=None,
+    )
+    
+    # Register workflow step
+    register_workflow_step(slack_app)
+    
+    # Register all Slack handlers (commands, events, actions, modals, home)
+    register_all_handlers(slack_app)
+    
+    # ============================================================
+    # Flask App Initialization
+    # ============================================================
+    
+    app = Flask(__name__, static_folder=Config.STATIC_DIR, static_url_path="/static")
+    app.config["SQLALCHEMY_DATABASE_URI"] = Config.DATABASE_URL
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+    }
+    app.extensions["slack_bolt"] = slack_app
+    
+    # Initialize database
+    db.init_app(app)
+    job_worker.init_app(app)
+    
+    # Run queued generation jobs (including ones left over from the last run).
+    # Every process serving the app runs its own worker threads (e.g. each
+    # gunicorn worker); jobs are claimed in the database, so none runs twice.
+    if Config.RUN_JOB_WORKERS:
+        create_tables(app)
+        job_worker.start()
+    
+    # Register blueprints
+    app.register_blueprint(oauth_bp)
+    register_routes(app)
+    
+    # Slack request handler for HTTP mode
+    handler = SlackRequestHandler(slack_app)
+    
+    # ============================================================
+    # Slack Event Routes (HTTP Mode)
+    # ============================================================
+    
+    @app.route("/slack/events", methods=["POST"])
+    def slack_events():
+        """Handle Slack events (HTTP mode only)."""
+        return handler.handle(request)
+    
+    @app.route("/slack/interactions", methods=["POST"])
+    def slack_interactions():
+        """Handle Slack interactions."""
+        return handler.handle(request)
+    
+    # ============================================================
+    # Error Handlers
+    # ============================================================
+    
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({"error": "Not found"}), 404
+    
+    @app.errorhandler(500)
+    def internal_error(error):
+        logger.error(f"Internal error: {error}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+    
+    return app
 
 
 # ============================================================
 # Socket Mode
 # ============================================================
 
-def run_socket_mode():
-    """Run the app in Socket Mode (WebSocket)."""
+def run_socket_mode(slack_app: App):
+    """Run the Slack app in Socket Mode (WebSocket)."""
     logger.info("=" * 50)
     logger.info("[SOCKET] Socket Mode 시작...")
     logger.info(f"[SOCKET] App Token: {Config.SLACK_APP_TOKEN[:20]}..." if Config.SLACK_APP_TOKEN else "[SOCKET] App Token: 없음!")
@@ -155,7 +187,7 @@ def run_socket_mode():
         logger.error(f"[SOCKET] Socket Mode 오류: {e}", exc_info=True)
 
 
-def create_tables():
+def create_tables(app: Flask):
     """Create database tables."""
     with app.app_context():
         db.create_all()
@@ -167,15 +199,16 @@ def create_tables():
 # ============================================================
 
 if __name__ == "__main__":
-    # Create tables
-    create_tables()
+    app = create_app()
     
     if Config.USE_SOCKET_MODE:
         # Socket Mode: Run WebSocket in background, Flask for health checks
         logger.info(f"Starting {Config.DD_SERVICE} with Socket Mode")
         
         # Start Socket Mode in background thread
-        socket_thread = threading.Thread(target=run_socket_mode, daemon=True)
+        socket_thread = threading.Thread(
+            target=run_socket_mode, args=(app.extensions["slack_bolt"],), daemon=True
+        )
         socket_thread.start()
         
         # Run Flask for health checks and OAuth
@@ -41,6 +41,65 @@ class Config:
     DEFAULT_FONT_SIZE = 32
     GIF_DURATION = 100  # milliseconds per frame
     GIF_FRAME_COUNT = 12  # number of frames for animations
+    EMOJI_MAX_KB = int(os.getenv("EMOJI_MAX_KB", "128"))  # Slack custom emoji file size limit
+    
+    # Font cache: max number of (font, size) faces kept open per process
+    FONT_CACHE_SIZE = int(os.getenv("FONT_CACHE_SIZE", "256"))
+    
+    # Threads rendering the frames of one animation (0 = one per CPU, or per CPU share
+    # in render pool workers, 1 = serial); changes take effect on the next animation
+    FRAME_WORKERS = int(os.getenv("FRAME_WORKERS", "0"))
+    
+    # Grow effect: resample one rendering per frame instead of drawing each size
+    # (faster on large fonts, slightly softer small frames)
+    GROW_RESAMPLE_FRAMES = os.getenv("GROW_RESAMPLE_FRAMES", "false").lower() == "true"
+    
+    # Render cache: finished emojis keyed by their render parameters
+    # (memory tier in MB, disk tier in MB, 0 disables the disk tier). The disk
+    # tier holds renders of private uploads, so it must stay outside STATIC_DIR.
+    RENDER_CACHE_MEMORY_MB = int(os.getenv("RENDER_CACHE_MEMORY_MB", "64"))
+    RENDER_CACHE_DISK_MB = int(os.getenv("RENDER_CACHE_DISK_MB", "512"))
+    RENDER_CACHE_DIR = os.getenv(
+        "RENDER_CACHE_DIR",
+        os.path.join(os.path.dirname(__file__), "render_cache"),
+    )
+    
+    # Split mode: max number of rendered characters kept in memory
+    GLYPH_CACHE_SIZE = int(os.getenv("GLYPH_CACHE_SIZE", "4096"))
+    
+    # Uploaded images: downloaded bytes (MB) and resized results kept for re-submits (seconds)
+    IMAGE_CACHE_MB = int(os.getenv("IMAGE_CACHE_MB", "64"))
+    IMAGE_CACHE_TTL = int(os.getenv("IMAGE_CACHE_TTL", "600"))
+    
+    # Uploaded image downloads: size limit (MB), timeouts (seconds) and keep-alive connections
+    DOWNLOAD_MAX_MB = int(os.getenv("DOWNLOAD_MAX_MB", "20"))
+    DOWNLOAD_CONNECT_TIMEOUT = float(os.getenv("DOWNLOAD_CONNECT_TIMEOUT", "5"))
+    DOWNLOAD_READ_TIMEOUT = float(os.getenv("DOWNLOAD_READ_TIMEOUT", "30"))
+    DOWNLOAD_POOL_SIZE = int(os.getenv("DOWNLOAD_POOL_SIZE", "8"))
+    
+    # Render worker processes (0 = one per CPU) and render jobs queued in total / per user
+    RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "0"))
+    RENDER_QUEUE_SIZE = int(os.getenv("RENDER_QUEUE_SIZE", "64"))
+    RENDER_QUEUE_PER_USER = int(os.getenv("RENDER_QUEUE_PER_USER", "4"))
+    
+    # Generation jobs: whether app processes run the job worker, jobs run at once,
+    # idle poll and progress update interval (seconds), heartbeat age after which
+    # a running job counts as interrupted, and runs per job
+    RUN_JOB_WORKERS = os.getenv("RUN_JOB_WORKERS", "true").lower() == "true"
+    JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+    JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "5"))
+    JOB_PROGRESS_SECONDS = float(os.getenv("JOB_PROGRESS_SECONDS", "2"))
+    JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "120"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))
+    
+    # REST batch endpoint: items per request, and items of one request queued on the
+    # render pool at once (0 = RENDER_QUEUE_PER_USER)
+    API_BATCH_MAX_ITEMS = int(os.getenv("API_BATCH_MAX_ITEMS", "200"))
+    API_BATCH_WORKERS = int(os.getenv("API_BATCH_WORKERS", "0"))
+    
+    # Animated uploads: frames kept and longest animation (milliseconds)
+    ANIMATED_MAX_FRAMES = int(os.getenv("ANIMATED_MAX_FRAMES", "50"))
+    ANIMATED_MAX_DURATION = int(os.getenv("ANIMATED_MAX_DURATION", "10000"))
     
     # Available fonts
     AVAILABLE_FONTS = {
@@ -1,4 +1,5 @@
-from .models import db, UserToken
+from .models import db, UserToken, GenerationJob
 from .token_store import TokenStore
+from .job_store import JobStore
 
-__all__ = ["db", "UserToken", "TokenStore"]
+__all__ = ["db", "UserToken", "GenerationJob", "TokenStore", "JobStore"]
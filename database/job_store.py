@@ -0,0 +1,207 @@
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import update
+
+from .models import db, GenerationJob
+
+logger = logging.getLogger(__name__)
+
+
+class JobStore:
+    """Manage background emoji generation jobs in the database."""
+    
+    def create(
+        self,
+        user_id: str,
+        team_id: Optional[str],
+        channel_id: str,
+        kind: str,
+        params: dict,
+        message_ts: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Queue a new generation job.
+        
+        Args:
+            user_id: Slack user ID the job is for
+            team_id: Slack team/workspace ID
+            channel_id: Channel the results are posted to
+            kind: Job type ("text", "image" or "workflow")
+            params: Generation parameters (JSON serializable)
+            message_ts: Progress message to update, if one was posted
+        
+        Returns:
+            Job ID or None if it could not be saved
+        """
+        try:
+            job = GenerationJob(
+                user_id=user_id,
+                team_id=team_id,
+                channel_id=channel_id,
+                kind=kind,
+                params=json.dumps(params, ensure_ascii=False),
+                message_ts=message_ts,
+                status="queued",
+            )
+            db.session.add(job)
+            db.session.commit()
+            logger.info(f"Queued {kind} job {job.id} for user {user_id}")
+            return job.id
+        except Exception as e:
+            logger.error(f"Error creating job: {e}", exc_info=True)
+            db.session.rollback()
+            return None
+    
+    def claim(self, worker_id: str) -> Optional[GenerationJob]:
+        """
+        Take the oldest queued job for a worker.
+        
+        The status switch is a conditional UPDATE, so two workers (or two
+        app instances) racing for the same row cannot both get it.
+        
+        Args:
+            worker_id: Name of the claiming worker
+        
+        Returns:
+            The claimed job (now running) or None if nothing is queued
+        """
+        try:
+            candidates = (
+                db.session.query(GenerationJob.id)
+                .filter_by(status="queued")
+                .order_by(GenerationJob.id)
+                .limit(5)
+                .all()
+            )
+            for (job_id,) in candidates:
+                result = db.session.execute(
+                    update(GenerationJob)
+                    .where(GenerationJob.id == job_id, GenerationJob.status == "queued")
+                    .values(
+                        status="running",
+                        worker_id=worker_id,
+                        attempts=GenerationJob.attempts + 1,
+                        updated_at=datetime.utcnow(),
+                    )
+                )
+                db.session.commit()
+                if result.rowcount == 1:
+                    return db.session.get(GenerationJob, job_id)
+            return None
+        except Exception as e:
+            logger.error(f"Error claiming job: {e}", exc_info=True)
+            db.session.rollback()
+            return None
+    
+    def update_progress(self, job_id: int, progress: str, worker_id: Optional[str] = None) -> bool:
+        """
+        Record a running job's progress (also its heartbeat).
+        
+        Args:
+            job_id: Job ID
+            progress: Progress text shown to the user
+            worker_id: Only update while this worker holds the job
+        
+        Returns:
+            True if the job is still running, False otherwise
+        """
+        return self._update(
+            job_id, status="running", worker_id=worker_id, values={"progress": progress[:100]}
+        )
+    
+    def mark_uploaded(self, job_id: int, worker_id: Optional[str] = None) -> bool:
+        """Record that a job's files were posted, so it is never run twice."""
+        return self._update(
+            job_id, status="running", worker_id=worker_id, values={"uploaded_at": datetime.utcnow()}
+        )
+    
+    def finish(self, job_id: int, worker_id: Optional[str] = None) -> bool:
+        """Mark a running job as done (only while this worker holds it, if given)."""
+        return self._update(
+            job_id, status="running", worker_id=worker_id, values={"status": "done", "error": None}
+        )
+    
+    def fail(self, job_id: int, error: str, worker_id: Optional[str] = None) -> bool:
+        """Mark a running job as failed with the error shown to the user."""
+        return self._update(
+            job_id, status="running", worker_id=worker_id, values={"status": "failed", "error": error}
+        )
+    
+    def recover_stale(self, stale_seconds: int, max_attempts: int) -> List[GenerationJob]:
+        """
+        Clean up running jobs whose worker stopped sending heartbeats.
+        
+        Jobs whose files were already posted are marked done, jobs with
+        attempts left are queued again and the rest are marked failed.
+        
+        Args:
+            stale_seconds: Heartbeat age after which a worker counts as gone
+            max_attempts: Runs a job gets in total
+        
+        Returns:
+            Jobs that were marked failed (to notify their users)
+        """
+        failed = []
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+            stale = (
+                GenerationJob.query
+                .filter(GenerationJob.status == "running", GenerationJob.updated_at < cutoff)
+                .all()
+            )
+            for job in stale:
+                worker_id = job.worker_id
+                if job.uploaded_at is not None:
+                    values = {"status": "done"}
+                elif job.attempts < max_attempts:
+                    values = {"status": "queued", "worker_id": None, "progress": None}
+                else:
+                    values = {"status": "failed", "error": "작업이 중단되었습니다"}
+                
+                # Another instance may be recovering the same job
+                result = db.session.execute(
+                    update(GenerationJob)
+                    .where(
+                        GenerationJob.id == job.id,
+                        GenerationJob.status == "running",
+                        GenerationJob.updated_at < cutoff,
+                    )
+                    .values(updated_at=datetime.utcnow(), **values)
+                )
+                db.session.commit()
+                if result.rowcount != 1:
+                    continue
+                
+                logger.warning(f"Recovered stale job {job.id} (worker {worker_id}): {values['status']}")
+                if values["status"] == "failed":
+                    db.session.refresh(job)
+                    failed.append(job)
+        except Exception as e:
+            logger.error(f"Error recovering jobs: {e}", exc_info=True)
+            db.session.rollback()
+        return failed
+    
+    def _update(
+        self,
+        job_id: int,
+        values: dict,
+        status: Optional[str] = None,
+        worker_id: Optional[str] = None,
+    ) -> bool:
+        """Update one job, optionally only while it has the given status and worker."""
+        try:
+            statement = update(GenerationJob).where(GenerationJob.id == job_id)
+            if status:
+                statement = statement.where(GenerationJob.status == status)
+            if worker_id:
+                statement = statement.where(GenerationJob.worker_id == worker_id)
+            result = db.session.execute(statement.values(updated_at=datetime.utcnow(), **values))
+            db.session.commit()
+            return result.rowcount == 1
+        except Exception as e:
+            logger.error(f"Error updating job {job_id}: {e}", exc_info=True)
+            db.session.rollback()
+            return False
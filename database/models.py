@@ -36,3 +36,28 @@ class GenerationLog(db.Model):
     
     def __repr__(self):
         return f"<GenerationLog id={self.id} effect={self.effect}>"
+
+
+class GenerationJob(db.Model):
+    """Emoji generation job run by the background job worker."""
+    
+    __tablename__ = "generation_jobs"
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.String(50), nullable=False, index=True)
+    team_id = db.Column(db.String(50))
+    channel_id = db.Column(db.String(50), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # text, image, workflow
+    params = db.Column(db.Text, nullable=False)  # JSON request parameters
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)  # queued, running, done, failed
+    progress = db.Column(db.String(100))
+    message_ts = db.Column(db.String(50))  # Progress message being updated
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker_id = db.Column(db.String(100))
+    error = db.Column(db.Text)
+    uploaded_at = db.Column(db.DateTime)  # Set once the files were posted
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f"<GenerationJob id={self.id} kind={self.kind} status={self.status}>"
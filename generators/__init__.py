@@ -1,5 +1,25 @@
-from .base import EmojiGenerator
+from .base import EmojiGenerator, split_chars
 from .text_renderer import TextRenderer
+from .font_registry import FontRegistry, font_registry
 from .image_processor import ImageProcessor, ResizeMode, process_image
+from .render_cache import RenderCache, render_cache
+from .render_pool import RenderPool, RenderQueueFull, render_pool
+from .effects.gif_encoder import budget_report, was_reduced
 
-__all__ = ["EmojiGenerator", "TextRenderer", "ImageProcessor", "ResizeMode", "process_image"]
+__all__ = [
+    "EmojiGenerator",
+    "split_chars",
+    "TextRenderer",
+    "FontRegistry",
+    "font_registry",
+    "ImageProcessor",
+    "ResizeMode",
+    "process_image",
+    "RenderCache",
+    "render_cache",
+    "RenderPool",
+    "RenderQueueFull",
+    "render_pool",
+    "budget_report",
+    "was_reduced",
+]
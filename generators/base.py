@@ -1,20 +1,66 @@
+import hashlib
 import io
 import os
-from typing import Optional, Tuple, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type, Union
 from PIL import Image
 
 from config import Config
+from .cache import LRUCache
 from .text_renderer import TextRenderer
-from .effects import get_effect
+from .effects import BaseEffect, get_effect
+from .effects.frame_pool import cpu_share
+from .effects.gif_encoder import Encoded, budget_report
+from .font_registry import font_registry
 from .image_processor import ImageProcessor, ResizeMode
+from .render_cache import render_cache
+
+# Split-mode characters keyed by (char, font file, font size, text color, background)
+glyph_cache = LRUCache(max_entries=Config.GLYPH_CACHE_SIZE)
+
+# Progress callback: (items done, items total)
+Progress = Callable[[int, int], None]
+
+# generate_many() result: (image bytes, extension, None) or (None, None, error message),
+# GIFs carrying their budget report like generate() results
+BatchResult = Tuple[Optional[bytes], Optional[str], Optional[str]]
+
+# Keyword arguments of EmojiGenerator.generate(), accepted per generate_many() request
+GENERATE_OPTIONS = ("text", "effect", "text_color", "background", "font_name", "line_break_at")
+
+# Decoded and resized uploads keyed by (source id, resize mode, background, size)
+processed_image_cache = LRUCache(max_entries=256, ttl=Config.IMAGE_CACHE_TTL)
+
+
+def split_chars(text: str, max_chars: int) -> List[str]:
+    """Get the characters generate_split() renders: the first max_chars, spaces skipped."""
+    return [char for char in list(text)[:max_chars] if not char.isspace()]
+
+
+class _TextPlan(NamedTuple):
+    """A text emoji request resolved for rendering (see EmojiGenerator._plan_text)."""
+    
+    text: str
+    effect_class: Type[BaseEffect]
+    text_color: Tuple[int, int, int, int]
+    bg_color: Tuple[int, int, int, int]
+    font_name: str
+    font_path: str
+    font_size: Optional[int]
+    cache_key: Optional[str]
 
 
 class EmojiGenerator:
     """Main emoji generator that combines text rendering with effects."""
     
+    # Padding between text and canvas edges (larger for better top/bottom margins)
+    TEXT_PADDING = 16
+    
     def __init__(self):
         self.text_renderer = TextRenderer()
         self.config = Config
+        self.render_cache = render_cache
     
     def generate(
         self,
@@ -37,38 +83,221 @@ class EmojiGenerator:
             line_break_at: Insert line break after N characters (0 = no break)
             
         Returns:
-            Tuple of (image bytes, file extension)
+            Tuple of (image bytes, file extension). GIFs carry the report of
+            fitting them into the byte budget, see budget_report().
+        """
+        plan = self._plan_text(text, effect, text_color, background, font_name, line_break_at)
+        result = self._render_plans([plan])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    def generate_many(
+        self,
+        requests: Sequence[Dict[str, Any]],
+        progress: Optional[Progress] = None,
+        on_result: Optional[Callable[[int, BatchResult], None]] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[BatchResult]:
+        """
+        Generate several text emojis in one call.
+        
+        Colors are parsed once per batch and identical requests are rendered
+        once. Requests sharing a font, size and colors form a group that
+        looks up its face once and rasterizes each text once for all its
+        effects; groups render concurrently.
+        
+        Args:
+            requests: Keyword arguments of generate() for each emoji
+            progress: Called with (done, total) as emojis finish
+            on_result: Called with (request index, result) as each emoji finishes,
+                in completion order
+            max_workers: Groups rendered at once (defaults to one per CPU)
+        
+        Returns:
+            (image bytes, extension, None) or (None, None, error message) per
+            request, in input order
+        """
+        results: List[BatchResult] = [None] * len(requests)
+        colors: Dict[Tuple[str, str], Tuple[int, int, int, int]] = {}
+        done = 0
+        
+        def finish(index: int, result: Union[Tuple[bytes, str], Exception]):
+            nonlocal done
+            if isinstance(result, Exception):
+                results[index] = (None, None, str(result))
+            else:
+                results[index] = Encoded((result[0], result[1], None), budget_report(result))
+            done += 1
+            if on_result:
+                on_result(index, results[index])
+            if progress:
+                progress(done, len(requests))
+        
+        plans = []
+        for index, request in enumerate(requests):
+            try:
+                unknown = set(request) - set(GENERATE_OPTIONS)
+                if unknown:
+                    raise ValueError(f"unknown options: {', '.join(sorted(unknown))}")
+                if "text" not in request:
+                    raise ValueError("text is required")
+                plans.append((index, self._plan_text(colors=colors, **request)))
+            except Exception as e:
+                finish(index, e)
+        
+        self._render_plans(
+            [plan for _, plan in plans],
+            on_result=lambda plan_index, result: finish(plans[plan_index][0], result),
+            max_workers=max_workers,
+        )
+        return results
+    
+    def _plan_text(
+        self,
+        text: str,
+        effect: str = "none",
+        text_color: str = "#000000",
+        background: str = "transparent",
+        font_name: str = "nanumgothic",
+        line_break_at: int = 0,
+        font_size: Optional[int] = None,
+        colors: Optional[Dict[Tuple[str, str], Tuple[int, int, int, int]]] = None,
+    ) -> _TextPlan:
+        """
+        Resolve a text emoji request into what _render_plans() needs.
+        
+        Args:
+            font_size: Fixed font size; rendered without the render cache
+                (callers keep their own cache), solved to fit if None
+            colors: Parsed colors of the batch, filled in as they are parsed
         """
+        if not isinstance(text, str):
+            raise ValueError("text must be a string")
+        
         # Parse colors
-        text_color_tuple = self._parse_color(text_color)
-        bg_color_tuple = self._parse_background(background)
+        if colors is None:
+            colors = {}
+        if ("text", text_color) not in colors:
+            colors[("text", text_color)] = self._parse_color(text_color)
+        if ("background", background) not in colors:
+            colors[("background", background)] = self._parse_background(background)
+        text_color_tuple = colors[("text", text_color)]
+        bg_color_tuple = colors[("background", background)]
         
         # Apply line breaks
         processed_text = self._apply_line_breaks(text, line_break_at)
         
-        # Get font with auto-size to fit text in canvas
-        # Use larger padding (16px) for better top/bottom margins
-        optimal_size = self.text_renderer.calculate_auto_font_size(
-            processed_text,
-            font_name,
-            self.config.EMOJI_SIZE,
-            padding=16
-        )
-        font = self.text_renderer.get_font(font_name, optimal_size)
-        
-        # Get effect class and generate
+        # Get effect class
         effect_class = get_effect(effect)
-        effect_instance = effect_class(
-            text=processed_text,
-            font=font,
-            text_color=text_color_tuple,
-            bg_color=bg_color_tuple,
-            size=self.config.EMOJI_SIZE,
-            frame_count=self.config.GIF_FRAME_COUNT,
-            duration=self.config.GIF_DURATION,
+        
+        cache_key = None
+        if font_size is None:
+            cache_key = self._text_cache_key(
+                "text", processed_text, effect_class.__name__, text_color_tuple, bg_color_tuple, font_name
+            )
+        
+        return _TextPlan(
+            processed_text, effect_class, text_color_tuple, bg_color_tuple,
+            font_name, font_registry.resolve_path(font_name), font_size, cache_key,
         )
+    
+    def _render_plans(
+        self,
+        plans: Sequence[_TextPlan],
+        on_result: Optional[Callable[[int, Union[Tuple[bytes, str], Exception]], None]] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[Union[Tuple[bytes, str], Exception]]:
+        """
+        Render planned text emojis, sharing work between similar ones.
+        
+        Args:
+            plans: Plans from _plan_text()
+            on_result: Called with (plan index, result) as each plan finishes,
+                one call at a time
+            max_workers: Groups rendered at once (defaults to one per CPU)
+        
+        Returns:
+            (image bytes, extension) or the raised exception per plan, in order
+        """
+        results: List[Union[Tuple[bytes, str], Exception, None]] = [None] * len(plans)
+        lock = threading.Lock()
+        
+        def finish(indexes: List[int], result: Union[Tuple[bytes, str], Exception]):
+            with lock:
+                for index in indexes:
+                    results[index] = result
+                    if on_result:
+                        on_result(index, result)
+        
+        # Identical requests are rendered once
+        duplicates: Dict[Any, List[int]] = {}
+        for index, plan in enumerate(plans):
+            duplicates.setdefault(plan.cache_key or plan, []).append(index)
+        
+        groups: Dict[tuple, List[List[int]]] = {}
+        for indexes in duplicates.values():
+            plan = plans[indexes[0]]
+            
+            # Finished images come from the render cache
+            cached = self.render_cache.get(plan.cache_key) if plan.cache_key else None
+            if cached:
+                finish(indexes, cached[0])
+                continue
+            
+            # Get font with auto-size to fit text in canvas
+            try:
+                font_size = plan.font_size or self.text_renderer.calculate_auto_font_size(
+                    plan.text,
+                    plan.font_name,
+                    self.config.EMOJI_SIZE,
+                    padding=self.TEXT_PADDING
+                )
+            except Exception as e:
+                finish(indexes, e)
+                continue
+            group_key = (plan.font_path, font_size, plan.text_color, plan.bg_color)
+            groups.setdefault(group_key, []).append(indexes)
+        
+        def render_group(group_key: tuple, members: List[List[int]]):
+            _, font_size, _, _ = group_key
+            font = self.text_renderer.get_font(plans[members[0][0]].font_name, font_size)
+            
+            # Effects of the same text share its measurements and coverage mask
+            shapes: Dict[str, BaseEffect] = {}
+            for indexes in members:
+                plan = plans[indexes[0]]
+                try:
+                    effect_instance = plan.effect_class(
+                        text=plan.text,
+                        font=font,
+                        text_color=plan.text_color,
+                        bg_color=plan.bg_color,
+                        size=self.config.EMOJI_SIZE,
+                        frame_count=self.config.GIF_FRAME_COUNT,
+                        duration=self.config.GIF_DURATION,
+                    )
+                    if plan.text in shapes:
+                        effect_instance.share_text_geometry(shapes[plan.text])
+                    else:
+                        shapes[plan.text] = effect_instance
+                    
+                    result = effect_instance.generate()
+                    if plan.cache_key:
+                        self.render_cache.put(plan.cache_key, [result])
+                except Exception as e:
+                    result = e
+                finish(indexes, result)
+        
+        workers = min(len(groups), max_workers or cpu_share())
+        if workers <= 1:
+            for group_key, members in groups.items():
+                render_group(group_key, members)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(lambda item: render_group(*item), groups.items()))
         
-        return effect_instance.generate()
+        return results
     
     def _parse_color(self, color: str) -> Tuple[int, int, int, int]:
         """Parse hex color code to RGBA tuple."""
@@ -106,12 +335,110 @@ class EmojiGenerator:
             lines.append(text[i:i + line_break_at])
         return "\n".join(lines)
     
+    def _text_cache_key(
+        self,
+        kind: str,
+        text: str,
+        effect_name: str,
+        text_color: Tuple[int, int, int, int],
+        bg_color: Tuple[int, int, int, int],
+        font_name: str,
+    ) -> str:
+        """Build the render cache key of a text emoji."""
+        return self.render_cache.make_key(
+            kind,
+            text=text,
+            effect=effect_name,
+            text_color=text_color,
+            background=bg_color,
+            font=os.path.basename(font_registry.resolve_path(font_name)),
+            size=self.config.EMOJI_SIZE,
+            frame_count=self.config.GIF_FRAME_COUNT,
+            duration=self.config.GIF_DURATION,
+            grow_resample=self.config.GROW_RESAMPLE_FRAMES,
+        )
+    
+    def generate_split(
+        self,
+        text: str,
+        text_color: str = "#000000",
+        background: str = "transparent",
+        font_name: str = "nanumgothic",
+        max_chars: int = 20,
+        progress: Optional[Progress] = None,
+    ) -> List[Tuple[str, bytes, str]]:
+        """
+        Generate one static emoji per character (split mode).
+        
+        All characters share one font size, solved once for the whole set, so
+        they come out uniform. Characters are looked up in the glyph cache
+        first, so common syllables and letters skip rasterization and encoding;
+        the rest are rendered together like generate_many().
+        
+        Args:
+            text: Text to split
+            text_color: Hex color code for text
+            background: Background color name or hex code
+            font_name: Font name
+            max_chars: Maximum number of characters taken from text
+            progress: Called with (done, total) after each character
+            
+        Returns:
+            List of (character, image_bytes, extension) tuples, spaces skipped
+        """
+        chars = split_chars(text, max_chars)
+        if not chars:
+            return []
+        
+        font_file = os.path.basename(font_registry.resolve_path(font_name))
+        text_color_tuple = self._parse_color(text_color)
+        bg_color_tuple = self._parse_background(background)
+        
+        # One face for every character
+        font_size = self.text_renderer.calculate_shared_font_size(
+            chars,
+            font_name,
+            self.config.EMOJI_SIZE,
+            padding=self.TEXT_PADDING
+        )
+        
+        glyphs = {}
+        for char in chars:
+            cache_key = (char, font_file, font_size, text_color_tuple, bg_color_tuple)
+            glyphs[char] = glyph_cache.get(cache_key)
+        
+        # Characters not cached yet are rendered as one batch at the shared size
+        missing = [char for char, cached in glyphs.items() if cached is None]
+        # Characters finished so far, repeats included
+        ready = len(chars) - sum(chars.count(char) for char in missing)
+        if progress and ready:
+            progress(ready, len(chars))
+        
+        def report(index: int, result: Union[Tuple[bytes, str], Exception]):
+            nonlocal ready
+            ready += chars.count(missing[index])
+            if progress:
+                progress(ready, len(chars))
+        
+        plans = [
+            self._plan_text(char, "none", text_color, background, font_name, font_size=font_size)
+            for char in missing
+        ]
+        for char, result in zip(missing, self._render_plans(plans, report)):
+            if isinstance(result, Exception):
+                raise result
+            glyphs[char] = result
+            glyph_cache.put((char, font_file, font_size, text_color_tuple, bg_color_tuple), result)
+        
+        return [(char, *glyphs[char]) for char in chars]
+    
     def generate_scroll_tiles(
         self,
         text: str,
         text_color: str = "#000000",
         background: str = "transparent",
         font_name: str = "nanumgothic",
+        progress: Optional[Progress] = None,
     ) -> List[Tuple[bytes, str, int]]:
         """
         Generate multiple scroll tiles for marquee effect.
@@ -121,15 +448,27 @@ class EmojiGenerator:
             text_color: Hex color code for text
             background: Background color name or hex code
             font_name: Font name
+            progress: Called with (done, total) as tiles are encoded
             
         Returns:
-            List of (image_bytes, extension, tile_index) tuples
+            List of (image_bytes, extension, tile_index) tuples, GIF tiles
+            carrying their budget report
         """
         from .effects.scroll import ScrollEffect
         
         text_color_tuple = self._parse_color(text_color)
         bg_color_tuple = self._parse_background(background)
         
+        cache_key = self._text_cache_key(
+            "scroll", text, ScrollEffect.__name__, text_color_tuple, bg_color_tuple, font_name
+        )
+        cached = self.render_cache.get(cache_key)
+        if cached:
+            return [
+                Encoded((*artifact, tile_idx), budget_report(artifact))
+                for tile_idx, artifact in enumerate(cached)
+            ]
+        
         # For scroll, use height-based font size (text can be wider than canvas)
         # Use minimal padding so text fills vertical space
         optimal_size = self.text_renderer.calculate_font_size_for_height(
@@ -143,7 +482,7 @@ class EmojiGenerator:
         # Generate all tiles with smooth animation
         # Higher fps (20fps) for buttery smooth scrolling
         # 100 frames x 50ms = 5 seconds total animation
-        return ScrollEffect.generate_all_tiles(
+        tiles = ScrollEffect.generate_all_tiles(
             text=text,
             font=font,
             text_color=text_color_tuple,
@@ -151,13 +490,18 @@ class EmojiGenerator:
             size=self.config.EMOJI_SIZE,
             frame_count=100,  # More frames for smoother scroll (was 60)
             duration=50,      # 20fps for smooth animation (was 150ms = 6.67fps)
+            progress=progress,
         )
+        
+        self.render_cache.put(cache_key, [Encoded(tile[:2], budget_report(tile)) for tile in tiles])
+        return tiles
     
     def generate_from_image(
         self,
         image_data: bytes,
         resize_mode: str = "cover",
         background: str = "transparent",
+        source_id: Optional[str] = None,
     ) -> Tuple[bytes, str]:
         """
         Generate emoji from uploaded image.
@@ -166,12 +510,63 @@ class EmojiGenerator:
             image_data: Raw image bytes
             resize_mode: Resize mode - 'fill', 'cover', or 'contain'
             background: Background color for contain mode
+            source_id: Id of the upload (e.g. Slack file id) to reuse its resized image
             
         Returns:
             Tuple of (image bytes, file extension)
         """
         processor = ImageProcessor(self.config.EMOJI_SIZE)
-        return processor.process_to_bytes(image_data, resize_mode, background)
+        if processor.is_animated(image_data):
+            return self._generate_from_animation(processor, image_data, "none", resize_mode, background)
+        
+        processed_img = self._process_image(processor, image_data, resize_mode, background, source_id)
+        return processor.to_bytes(processed_img)
+    
+    def _generate_from_animation(
+        self,
+        processor: ImageProcessor,
+        image_data: bytes,
+        effect: str,
+        resize_mode: str,
+        background: str,
+    ) -> Tuple[bytes, str]:
+        """Resize an animated upload frame by frame and apply the effect."""
+        from .effects.image_effects import apply_effect_to_frames
+        
+        frames = processor.process_frames(
+            image_data,
+            resize_mode,
+            background,
+            max_frames=self.config.ANIMATED_MAX_FRAMES,
+            max_duration=self.config.ANIMATED_MAX_DURATION,
+        )
+        return apply_effect_to_frames(
+            frames,
+            effect=effect,
+            frame_count=self.config.GIF_FRAME_COUNT,
+            duration=self.config.GIF_DURATION,
+        )
+    
+    def _process_image(
+        self,
+        processor: ImageProcessor,
+        image_data: bytes,
+        resize_mode: str,
+        background: str,
+        source_id: Optional[str],
+    ) -> Image.Image:
+        """Decode and resize an upload, reusing the result for the same upload."""
+        if not source_id:
+            return processor.process(image_data, resize_mode, background)
+        
+        cache_key = (source_id, resize_mode, background, processor.target_size)
+        processed_img = processed_image_cache.get(cache_key)
+        if processed_img is None:
+            processed_img = processor.process(image_data, resize_mode, background)
+            processed_image_cache.put(cache_key, processed_img)
+        
+        # Effects get their own copy of the shared image
+        return processed_img.copy()
     
     def generate_from_image_with_effect(
         self,
@@ -179,6 +574,7 @@ class EmojiGenerator:
         effect: str = "none",
         resize_mode: str = "cover",
         background: str = "transparent",
+        source_id: Optional[str] = None,
     ) -> Tuple[bytes, str]:
         """
         Generate emoji from uploaded image with animation effect.
@@ -188,26 +584,53 @@ class EmojiGenerator:
             effect: Animation effect name
             resize_mode: Resize mode - 'fill', 'cover', or 'contain'
             background: Background color
+            source_id: Id of the upload (e.g. Slack file id) to reuse its resized image
             
         Returns:
             Tuple of (image bytes, file extension)
         """
-        # First process the image
+        # Identical uploads with the same options reuse the finished image
+        cache_key = self.render_cache.make_key(
+            "image",
+            image=hashlib.sha256(image_data).hexdigest(),
+            effect=effect,
+            resize_mode=resize_mode,
+            background=background,
+            size=self.config.EMOJI_SIZE,
+            frame_count=self.config.GIF_FRAME_COUNT,
+            duration=self.config.GIF_DURATION,
+            max_frames=self.config.ANIMATED_MAX_FRAMES,
+            max_duration=self.config.ANIMATED_MAX_DURATION,
+        )
+        cached = self.render_cache.get(cache_key)
+        if cached:
+            return cached[0]
+        
         processor = ImageProcessor(self.config.EMOJI_SIZE)
-        processed_img = processor.process(image_data, resize_mode, background)
+        if processor.is_animated(image_data):
+            # Animated uploads keep their animation under the effect
+            result = self._generate_from_animation(processor, image_data, effect, resize_mode, background)
+            self.render_cache.put(cache_key, [result])
+            return result
+        
+        # First process the image
+        processed_img = self._process_image(processor, image_data, resize_mode, background, source_id)
         
         # If no effect, just return the processed image
         if effect == "none":
-            return processor.to_bytes(processed_img)
+            result = processor.to_bytes(processed_img)
+        else:
+            # Apply animation effect to the processed image
+            from .effects.image_effects import apply_effect_to_image
+            result = apply_effect_to_image(
+                processed_img,
+                effect=effect,
+                frame_count=self.config.GIF_FRAME_COUNT,
+                duration=self.config.GIF_DURATION,
+            )
         
-        # Apply animation effect to the processed image
-        from .effects.image_effects import apply_effect_to_image
-        return apply_effect_to_image(
-            processed_img,
-            effect=effect,
-            frame_count=self.config.GIF_FRAME_COUNT,
-            duration=self.config.GIF_DURATION,
-        )
+        self.render_cache.put(cache_key, [result])
+        return result
     
     def save_to_file(
         self,
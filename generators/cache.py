@@ -0,0 +1,119 @@
+"""
+Small in-process caches shared by the generators.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with hit/miss counters and optional TTL."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int],
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        ttl: Optional[float] = None,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Maximum number of entries kept (None = no limit)
+            max_bytes: Maximum total size of the values kept (None = no limit)
+            sizeof: Size of a value in bytes, required with max_bytes
+            ttl: Seconds an entry stays valid after it is stored (None = forever)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self.ttl = ttl
+        self._expires: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value for key, or default on a miss."""
+        with self._lock:
+            if key in self._entries and self._expired(key):
+                self._remove(key)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries."""
+        size = self._sizeof(value)
+        with self._lock:
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Would evict everything else and still not fit
+                return
+            
+            self.current_bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if self.ttl is not None:
+                self._expires[key] = time.monotonic() + self.ttl
+            
+            while self._over_limit():
+                self._remove(next(iter(self._entries)))
+    
+    def _expired(self, key: Hashable) -> bool:
+        """Check if an entry outlived its TTL (lock held)."""
+        return self.ttl is not None and time.monotonic() >= self._expires[key]
+    
+    def _remove(self, key: Hashable):
+        """Drop one entry (lock held)."""
+        del self._entries[key]
+        self.current_bytes -= self._sizes.pop(key)
+        self._expires.pop(key, None)
+    
+    def _over_limit(self) -> bool:
+        """Check if the cache holds more than its limits (lock held)."""
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.current_bytes > self.max_bytes
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries and not self._expired(key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            total = self.hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+            if self.max_bytes is not None:
+                stats["bytes"] = self.current_bytes
+                stats["max_bytes"] = self.max_bytes
+            return stats
+
+    def clear(self):
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._expires.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
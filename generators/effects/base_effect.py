@@ -1,11 +1,28 @@
 import io
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 from PIL import Image, ImageDraw, ImageFont
 
+from ..text_renderer import measure_text_bbox
+from .frame_pool import map_frames
+from .gif_encoder import FRAME_STEPS, Encoded, encode_within_budget
+from .palette import coverage_palette, index_coverage
+
 
 class BaseEffect(ABC):
-    """Base class for all animation effects."""
+    """
+    Base class for all animation effects.
+    
+    Frames are L-mode coverage images (0 = background, 255 = text) that are
+    colored through a text/background ramp palette when saved. Effects that
+    need other colors may return RGBA or ready-made P-mode frames instead.
+    """
+    
+    # Number of ramp steps between background and text color in the palette
+    palette_steps = 256
+    
+    # Smaller ramps tried when a GIF is over the emoji byte budget
+    budget_palette_steps = (64, 32, 16)
     
     def __init__(
         self,
@@ -24,18 +41,42 @@ class BaseEffect(ABC):
         self.size = size
         self.frame_count = frame_count
         self.duration = duration
+        
+        # Lazily computed text geometry, shared by all frames
+        self._text_bbox = None
+        self._coverage = None
     
     @abstractmethod
     def generate_frames(self) -> List[Image.Image]:
-        """Generate animation frames. Override in subclasses."""
+        """Generate animation frames (see class docstring). Override in subclasses."""
         pass
     
+    def render_frames(
+        self,
+        render_frame: Callable[[int], Image.Image],
+        count: Optional[int] = None,
+    ) -> List[Image.Image]:
+        """
+        Render frames by index on the frame pool, returned in frame order.
+        
+        render_frame may run on several threads at once, so a frame must
+        depend only on its index, never on frames rendered before it.
+        
+        Args:
+            render_frame: Renders the frame with the given index
+            count: Number of frames (defaults to frame_count)
+        """
+        # Text geometry is computed once up front instead of racing per thread
+        self.get_coverage_mask()
+        return map_frames(render_frame, self.frame_count if count is None else count)
+    
     def generate(self) -> Tuple[bytes, str]:
         """
         Generate the final image or GIF.
         
         Returns:
-            Tuple of (image bytes, file extension)
+            Tuple of (image bytes, file extension); GIFs carry their budget
+            report (see gif_encoder.budget_report())
         """
         frames = self.generate_frames()
         
@@ -44,16 +85,28 @@ class BaseEffect(ABC):
             return self._save_as_png(frames[0]), "png"
         else:
             # Multiple frames - return GIF
-            return self._save_as_gif(frames), "gif"
+            image_bytes, report = self._encode_gif(frames)
+            return Encoded((image_bytes, "gif"), report)
     
     def _save_as_png(self, image: Image.Image) -> bytes:
         """Save image as PNG bytes."""
         buffer = io.BytesIO()
         
-        # Check if background is transparent (alpha < 255)
-        is_transparent_bg = self.bg_color[3] < 255 if len(self.bg_color) == 4 else False
+        is_transparent_bg = self.is_transparent_bg()
         
-        if image.mode == "RGBA" and not is_transparent_bg:
+        if image.mode == "L":
+            # Coverage frame: index through the ramp palette, keeping partial alpha
+            lut, palettes, _ = coverage_palette(
+                (self.text_color,), self.bg_color, is_transparent_bg,
+                self.palette_steps, keep_alpha=True,
+            )
+            palette_mode = "RGBA" if is_transparent_bg else "RGB"
+            image = index_coverage(image, lut, palettes[0], palette_mode=palette_mode)
+            
+            # Keep only the palette entries in use so small emojis stay small
+            used = [index for index, count in enumerate(image.histogram()) if count]
+            image = image.remap_palette(used)
+        elif image.mode == "RGBA" and not is_transparent_bg:
             # Opaque background: composite onto solid background to ensure no transparency
             bg = Image.new("RGB", image.size, self.bg_color[:3])
             bg.paste(image, mask=image.split()[3])  # Use alpha as mask
@@ -64,19 +117,38 @@ class BaseEffect(ABC):
     
     def _save_as_gif(self, frames: List[Image.Image]) -> bytes:
         """Save frames as animated GIF bytes."""
-        buffer = io.BytesIO()
+        return self._encode_gif(frames)[0]
+    
+    def _encode_gif(
+        self,
+        frames: List[Image.Image],
+        frame_steps: Sequence[int] = FRAME_STEPS,
+    ) -> Tuple[bytes, Dict[str, object]]:
+        """
+        Encode frames as an animated GIF within the emoji byte budget.
         
-        # Check if background is transparent (alpha < 255)
-        is_transparent_bg = self.bg_color[3] < 255 if len(self.bg_color) == 4 else False
+        Args:
+            frames: Frames from generate_frames()
+            frame_steps: Frame decimation steps the budget search may use
         
-        # Convert RGBA to P mode for GIF
-        converted_frames = []
-        for frame in frames:
+        Returns:
+            Tuple of (GIF bytes, report from encode_within_budget())
+        """
+        is_transparent_bg = self.is_transparent_bg()
+        
+        def to_palette_frame(frame: Image.Image, steps: int) -> Image.Image:
+            """Convert a frame to P mode for GIF."""
+            if frame.mode == "L":
+                # Coverage frames share one ramp palette, so no quantization is needed
+                lut, palettes, transparency = coverage_palette(
+                    (self.text_color,), self.bg_color, is_transparent_bg, steps
+                )
+                return index_coverage(frame, lut, palettes[0], transparency)
             if frame.mode == "RGBA":
                 if is_transparent_bg:
                     # Transparent background: convert with transparency support
                     alpha = frame.split()[3]
-                    frame = frame.convert("RGB").convert("P", palette=Image.ADAPTIVE, colors=255)
+                    frame = frame.convert("RGB").convert("P", palette=Image.ADAPTIVE, colors=min(steps, 255))
                     mask = Image.eval(alpha, lambda a: 255 if a <= 128 else 0)
                     frame.paste(255, mask)
                     frame.info["transparency"] = 255
@@ -85,27 +157,24 @@ class BaseEffect(ABC):
                     # This properly handles anti-aliased text edges
                     bg = Image.new("RGB", frame.size, self.bg_color[:3])
                     bg.paste(frame, mask=frame.split()[3])  # Use alpha as mask
-                    frame = bg.convert("P", palette=Image.ADAPTIVE, colors=256)
-            converted_frames.append(frame)
-        
-        # Build save options
-        save_kwargs = {
-            "format": "GIF",
-            "save_all": True,
-            "append_images": converted_frames[1:],
-            "duration": self.duration,
-            "loop": 0,
-            "optimize": True,
-        }
-        
-        # disposal=2 clears to transparent, which causes issues with opaque backgrounds
-        # Only use disposal=2 for transparent backgrounds
-        if is_transparent_bg:
-            save_kwargs["disposal"] = 2
-        
-        converted_frames[0].save(buffer, **save_kwargs)
+                    frame = bg.convert("P", palette=Image.ADAPTIVE, colors=min(steps, 256))
+            return frame
         
-        return buffer.getvalue()
+        palette_levels = [self.palette_steps] + [
+            steps for steps in self.budget_palette_steps if steps < self.palette_steps
+        ]
+        
+        # Held and repeated frames are converted once and shown longer; only
+        # the changed rectangle of each frame is written, with disposal=2
+        # where transparent pixels have to be cleared. Over the byte budget,
+        # smaller palettes and fewer frames are tried.
+        return encode_within_budget(
+            frames, self.duration, to_palette_frame, palette_levels, frame_steps=frame_steps
+        )
+    
+    def is_transparent_bg(self) -> bool:
+        """Check if background is transparent (alpha < 255)."""
+        return self.bg_color[3] < 255 if len(self.bg_color) == 4 else False
     
     def get_text_bbox(self) -> Tuple[int, int, int, int]:
         """
@@ -114,15 +183,75 @@ class BaseEffect(ABC):
         Returns:
             Tuple of (left, top, right, bottom) offsets
         """
-        temp_img = Image.new("RGBA", (1, 1))
-        draw = ImageDraw.Draw(temp_img)
-        return draw.textbbox((0, 0), self.text, font=self.font)
+        if self._text_bbox is None:
+            self._text_bbox = measure_text_bbox(self.text, self.font)
+        return self._text_bbox
     
     def get_text_size(self) -> Tuple[int, int]:
         """Calculate text dimensions."""
         bbox = self.get_text_bbox()
         return (bbox[2] - bbox[0], bbox[3] - bbox[1])
     
+    def share_text_geometry(self, other: "BaseEffect"):
+        """
+        Reuse another effect's text measurements and coverage mask.
+        
+        Only taken over when both render the same text with the same font at
+        the same canvas size, e.g. one text rendered with several effects.
+        """
+        if (other.text, other.font, other.size) == (self.text, self.font, self.size):
+            self._text_bbox = other.get_text_bbox()
+            self._coverage = other.get_coverage_mask()
+    
+    def get_coverage_mask(self) -> Tuple[Image.Image, Tuple[int, int]]:
+        """
+        Rasterize the text once into an L-mode coverage mask.
+        
+        Frames that only move or recolor the text are composed from this
+        mask with a color fill instead of drawing the glyphs again.
+        
+        Returns:
+            Tuple of (mask, (x, y)) where (x, y) is the mask position
+            in a frame with the text centered and no offset
+        """
+        if self._coverage is None:
+            bbox = self.get_text_bbox()
+            text_width = bbox[2] - bbox[0]
+            text_height = bbox[3] - bbox[1]
+            
+            # Same anchor as a centered draw.text() call
+            x = (self.size - text_width) // 2 - bbox[0]
+            y = (self.size - text_height) // 2 - bbox[1]
+            
+            # Margin for ink that overhangs the layout box (italics, accents)
+            margin = getattr(self.font, "size", 0) // 2 + 2
+            mask = Image.new("L", (text_width + margin * 2, text_height + margin * 2), 0)
+            draw = ImageDraw.Draw(mask)
+            draw.text((margin - bbox[0], margin - bbox[1]), self.text, font=self.font, fill=255)
+            
+            left, top = 0, 0
+            ink_bbox = mask.getbbox()
+            if ink_bbox:
+                left, top = ink_bbox[0], ink_bbox[1]
+                mask = mask.crop(ink_bbox)
+            
+            self._coverage = (mask, (x + bbox[0] - margin + left, y + bbox[1] - margin + top))
+        
+        return self._coverage
+    
+    def create_coverage_frame(self, x_offset: int = 0, y_offset: int = 0) -> Image.Image:
+        """
+        Create a full-size L-mode coverage frame (0 = background, 255 = text).
+        
+        Args:
+            x_offset: Horizontal offset from center
+            y_offset: Vertical offset from center
+        """
+        img = Image.new("L", (self.size, self.size), 0)
+        mask, (x, y) = self.get_coverage_mask()
+        img.paste(mask, (x + x_offset, y + y_offset))
+        return img
+    
     def create_frame(
         self,
         x_offset: int = 0,
@@ -138,18 +267,11 @@ class BaseEffect(ABC):
             color_override: Override text color for this frame
         """
         img = Image.new("RGBA", (self.size, self.size), self.bg_color)
-        draw = ImageDraw.Draw(img)
-        
-        bbox = self.get_text_bbox()
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        
-        # Center text properly by accounting for bbox offsets
-        # bbox[0] is left offset, bbox[1] is top offset
-        x = (self.size - text_width) // 2 - bbox[0] + x_offset
-        y = (self.size - text_height) // 2 - bbox[1] + y_offset
         
+        # Fill the text color through the cached coverage mask; this blends
+        # exactly like draw.text() does, without rasterizing the glyphs again
+        mask, (x, y) = self.get_coverage_mask()
         color = color_override or self.text_color
-        draw.text((x, y), self.text, font=self.font, fill=color)
+        img.paste(color, (x + x_offset, y + y_offset), mask)
         
         return img
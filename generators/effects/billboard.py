@@ -13,7 +13,7 @@ class BillboardEffect(BaseEffect):
         text_len = len(self.text)
         
         if text_len == 0:
-            return [self.create_frame()]
+            return [self.create_coverage_frame()]
         
         # Calculate character positions
         text_width, text_height = self.get_text_size()
@@ -22,13 +22,13 @@ class BillboardEffect(BaseEffect):
         
         # Generate frame for each character appearing
         for i in range(text_len + 1):
-            img = Image.new("RGBA", (self.size, self.size), self.bg_color)
+            img = Image.new("L", (self.size, self.size), 0)
             draw = ImageDraw.Draw(img)
             
             # Draw characters up to index i
             visible_text = self.text[:i]
             if visible_text:
-                draw.text((start_x, start_y), visible_text, font=self.font, fill=self.text_color)
+                draw.text((start_x, start_y), visible_text, font=self.font, fill=255)
             
             frames.append(img)
         
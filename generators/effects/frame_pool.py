@@ -0,0 +1,92 @@
+"""
+Thread pool that renders the frames of a single animation concurrently.
+PIL releases the GIL while it creates, pastes, resamples and transforms
+images, so independent frames of one effect can use otherwise idle cores.
+Frames come back in index order, and every frame must depend only on its
+index (no state shared between frames), so the output is the same with
+any number of workers.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, TypeVar
+
+from config import Config
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers = 0
+_lock = threading.Lock()
+
+# CPUs this process's thread pools are sized for (see set_cpu_share)
+_cpu_share: Optional[int] = None
+
+# Marks the pool's own threads, which render nested calls serially
+_local = threading.local()
+
+
+def set_cpu_share(cpus: int):
+    """
+    Size this process's default thread pools for a share of the host's CPUs.
+    
+    Render pool workers each get cpu_count // workers, so N worker processes
+    with CPU-sized frame, tile and group pools don't run about CPU² threads.
+    
+    Args:
+        cpus: CPUs this process may keep busy (at least 1)
+    """
+    global _cpu_share
+    _cpu_share = max(1, cpus)
+
+
+def cpu_share() -> int:
+    """CPUs this process's thread pools default to (all of them unless set_cpu_share was called)."""
+    return _cpu_share or os.cpu_count() or 1
+
+
+def frame_workers() -> int:
+    """Threads used per animation (Config.FRAME_WORKERS, 0 = cpu_share())."""
+    return Config.FRAME_WORKERS or cpu_share()
+
+
+def map_frames(render: Callable[[int], T], count: int) -> List[T]:
+    """
+    Render frames 0..count-1, concurrently when more than one worker is configured.
+    
+    Args:
+        render: Renders the frame with the given index
+        count: Number of frames
+    
+    Returns:
+        List of render() results in frame order
+    """
+    workers = min(count, frame_workers())
+    if workers <= 1 or getattr(_local, "in_pool", False):
+        return [render(index) for index in range(count)]
+    
+    return list(_get_executor().map(render, range(count)))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Start the frame threads on first use, and again when frame_workers() changed."""
+    global _executor, _executor_workers
+    
+    with _lock:
+        workers = frame_workers()
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                # Frames already handed to the old threads still finish there
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="frame",
+                initializer=_mark_pool_thread,
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def _mark_pool_thread():
+    """Flag a frame thread so frames it renders never wait on the pool itself."""
+    _local.in_pool = True
@@ -0,0 +1,448 @@
+"""
+Delta-frame GIF encoder for emoji animations.
+Each frame is written as the rectangle that changed since the previous one,
+with the disposal method chosen so transparent pixels are still cleared.
+Repeated frames are merged or reuse their earlier conversion and encoding.
+"""
+import hashlib
+import io
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from PIL import Image, ImageChops, GifImagePlugin
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Frame decimation steps tried when a GIF is over the byte budget
+FRAME_STEPS = (1, 2, 3)
+
+# GIF disposal methods
+DISPOSAL_NONE = 1        # Leave the frame in place, the next frame draws on top
+DISPOSAL_BACKGROUND = 2  # Clear the frame rectangle to transparent
+
+Box = Tuple[int, int, int, int]
+
+# Private GifImagePlugin functions write_gif() writes frames with
+_FRAME_WRITER = ("_get_global_header", "_write_frame_data")
+_fallback_logged = False
+
+
+class Encoded(tuple):
+    """
+    Result tuple, e.g. (image bytes, extension), carrying its budget report.
+    
+    It unpacks, compares and pickles like the plain tuple; report is the
+    dict from encode_within_budget(), or None when nothing was budgeted.
+    """
+    
+    def __new__(cls, values, report: Optional[Dict[str, object]] = None):
+        result = super().__new__(cls, values)
+        result.report = report
+        return result
+
+
+def budget_report(result: tuple) -> Optional[Dict[str, object]]:
+    """Get the encode_within_budget() report of a result, if it has one."""
+    return getattr(result, "report", None)
+
+
+def was_reduced(report: Optional[Dict[str, object]]) -> bool:
+    """Check if a budget report shows lowered quality, or a result still over budget."""
+    return bool(report) and (report["attempts"] > 1 or not report["within_budget"])
+
+
+def encode_gif(
+    frames: Sequence[Image.Image],
+    duration: Union[int, Sequence[int]],
+    loop: int = 0,
+) -> bytes:
+    """
+    Encode P-mode frames as an animated GIF with sub-rectangle frames.
+    
+    Args:
+        frames: P-mode frames, transparent index in frame.info["transparency"]
+        duration: Duration per frame in milliseconds (single value or per frame)
+        loop: Loop count (0 = forever)
+    
+    Returns:
+        GIF bytes
+    """
+    durations = _expand_durations(duration, len(frames))
+    plan = plan_frames(frames, durations)
+    return write_gif(plan, loop)
+
+
+def encode_within_budget(
+    frames: Sequence[Image.Image],
+    duration: Union[int, Sequence[int]],
+    convert: Callable[[Image.Image, int], Image.Image],
+    palette_levels: Sequence[int],
+    max_bytes: Optional[int] = None,
+    frame_steps: Sequence[int] = FRAME_STEPS,
+) -> Tuple[bytes, Dict[str, object]]:
+    """
+    Encode frames as a GIF that fits a byte budget.
+    
+    Settings are tried from best to lowest quality: every palette level with
+    all frames, then again keeping every 2nd frame, and so on. The first
+    attempt is the regular full-quality encoding. Each distinct frame is
+    converted once per palette level and reused by every decimation step.
+    
+    Args:
+        frames: Source frames
+        duration: Duration per frame in milliseconds (single value or per frame)
+        convert: Conversion of a frame to P mode with a given palette level
+        palette_levels: Palette levels to try, largest first
+        max_bytes: Byte budget (defaults to Config.EMOJI_MAX_KB)
+        frame_steps: Frame decimation steps to try, smallest first
+    
+    Returns:
+        Tuple of (GIF bytes, report) where the report holds the final "bytes",
+        "palette_level", "frame_step" and "frames", the number of "attempts"
+        and whether the result is "within_budget". If nothing fits, the
+        smallest attempt is returned.
+    """
+    if max_bytes is None:
+        max_bytes = Config.EMOJI_MAX_KB * 1024
+    durations = _expand_durations(duration, len(frames))
+    conversions = {level: {} for level in palette_levels}
+    best = None
+    attempts = 0
+    
+    for step in frame_steps:
+        step_frames, step_durations = decimate_frames(frames, durations, step)
+        for level in palette_levels:
+            attempts += 1
+            converted_frames, merged_durations = merge_frames(
+                step_frames,
+                step_durations,
+                lambda frame: convert(frame, level),
+                converted=conversions[level],
+            )
+            data = encode_gif(converted_frames, merged_durations)
+            report = {
+                "bytes": len(data),
+                "palette_level": level,
+                "frame_step": step,
+                "frames": len(converted_frames),
+                "attempts": attempts,
+                "within_budget": len(data) <= max_bytes,
+            }
+            if best is None or len(data) < len(best[0]):
+                best = (data, report)
+            if report["within_budget"]:
+                if attempts > 1:
+                    logger.info(f"GIF reduced to fit {max_bytes} bytes: {report}")
+                return data, report
+    
+    best[1]["attempts"] = attempts
+    logger.warning(f"GIF over the {max_bytes} byte budget at the lowest settings: {best[1]}")
+    return best
+
+
+def decimate_frames(
+    frames: Sequence[Image.Image],
+    durations: Sequence[int],
+    step: int,
+) -> Tuple[List[Image.Image], List[int]]:
+    """
+    Keep every step-th frame, each showing for the time of the frames it replaces.
+    
+    Args:
+        frames: Source frames
+        durations: Duration of each frame in milliseconds
+        step: Keep one frame out of this many
+    
+    Returns:
+        Tuple of (frames, durations)
+    """
+    if step <= 1:
+        return list(frames), list(durations)
+    
+    kept_frames = list(frames[::step])
+    kept_durations = [
+        sum(durations[index:index + step])
+        for index in range(0, len(frames), step)
+    ]
+    return kept_frames, kept_durations
+
+
+def merge_frames(
+    frames: Sequence[Image.Image],
+    duration: Union[int, Sequence[int]],
+    convert: Optional[Callable[[Image.Image], Image.Image]] = None,
+    converted: Optional[dict] = None,
+) -> Tuple[List[Image.Image], List[int]]:
+    """
+    Collapse consecutive duplicate frames and convert each distinct frame once.
+    
+    Consecutive duplicates become one frame showing for their summed duration.
+    Frames that come back later (held or pulsing animations) reuse the first
+    conversion, so the encoder sees the same image object again.
+    
+    Args:
+        frames: Source frames
+        duration: Duration per frame in milliseconds (single value or per frame)
+        convert: Conversion applied to each distinct frame (e.g. to P mode)
+        converted: Conversions by frame key, shared between calls that use
+            the same convert (filled in as frames are converted)
+    
+    Returns:
+        Tuple of (frames, durations)
+    """
+    durations = _expand_durations(duration, len(frames))
+    merged_frames = []
+    merged_durations = []
+    if converted is None:
+        converted = {}
+    previous_key = None
+    
+    for frame, frame_duration in zip(frames, durations):
+        key = frame_key(frame)
+        if key == previous_key:
+            merged_durations[-1] += frame_duration
+            continue
+        
+        if key not in converted:
+            converted[key] = convert(frame) if convert else frame
+        merged_frames.append(converted[key])
+        merged_durations.append(frame_duration)
+        previous_key = key
+    
+    return merged_frames, merged_durations
+
+
+def frame_key(frame: Image.Image) -> bytes:
+    """
+    Hash a frame's pixels, palette and transparency.
+    
+    Args:
+        frame: Image to hash
+    
+    Returns:
+        Digest that is equal for identical frames
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{frame.mode}{frame.size}{frame.info.get('transparency')}".encode())
+    digest.update(frame.tobytes())
+    if frame.mode == "P":
+        digest.update(_palette_bytes(frame))
+    return digest.digest()
+
+
+def plan_frames(
+    frames: Sequence[Image.Image],
+    durations: Sequence[int],
+) -> List[dict]:
+    """
+    Decide the rectangle, disposal and duration of each written frame.
+    
+    The encoder tracks what the viewer shows after every frame. A frame is
+    written as the bounding box of the pixels that differ from that canvas
+    and left in place (disposal 1). That is only possible while no pixel has
+    to turn transparent again, because a transparent pixel in a GIF frame
+    shows whatever is underneath. When one does, the previous frame is
+    switched to disposal 2 with its rectangle grown to cover everything it
+    left on screen, so the canvas is blank and the next frame starts from
+    the background. Identical frames are folded into the previous frame's
+    duration.
+    
+    Args:
+        frames: P-mode frames
+        durations: Duration of each frame in milliseconds
+    
+    Returns:
+        List of dicts with "frame", "box", "disposal" and "duration"
+    """
+    plan = []
+    canvas = None
+    first = None
+    full_box = (0, 0) + frames[0].size
+    composited = {}
+    
+    for frame, frame_duration in zip(frames, durations):
+        if id(frame) not in composited:
+            composited[id(frame)] = frame.convert("RGBA")
+        rgba = composited[id(frame)]
+        
+        if canvas is None:
+            plan.append(_entry(frame, full_box, frame_duration))
+            canvas = first = rgba
+            continue
+        
+        box = ImageChops.difference(canvas, rgba).getbbox(alpha_only=False)
+        if box is None:
+            # Nothing changed: show the previous frame for longer
+            plan[-1]["duration"] += frame_duration
+            continue
+        
+        if _clears_pixels(canvas, rgba):
+            _clear_after(plan[-1], canvas)
+            # Draw everything visible from a blank canvas (at least one pixel
+            # so the cleared canvas still gets its own frame)
+            box = rgba.getbbox() or (0, 0, 1, 1)
+        
+        plan.append(_entry(frame, box, frame_duration))
+        canvas = rgba
+    
+    # The first frame is drawn over the last one when the animation loops
+    if len(plan) > 1 and _clears_pixels(canvas, first):
+        _clear_after(plan[-1], canvas)
+    
+    return plan
+
+
+def write_gif(plan: Sequence[dict], loop: int = 0) -> bytes:
+    """
+    Write planned frames to GIF bytes.
+    
+    The first frame's palette becomes the global color table; frames with a
+    different palette carry their own local table. Palettes are trimmed to
+    the entries the written rectangles actually use.
+    
+    Args:
+        plan: Frame plan from plan_frames()
+        loop: Loop count (0 = forever)
+    
+    Returns:
+        GIF bytes
+    """
+    if not has_frame_writer():
+        return _save_with_pillow(plan, loop)
+    
+    buffer = io.BytesIO()
+    
+    crops = [entry["frame"].crop(entry["box"]) for entry in plan]
+    crops = _trim_palettes(crops)
+    
+    first = crops[0]
+    header_info = {"loop": loop, "duration": plan[0]["duration"]}
+    if "transparency" in first.info:
+        header_info["transparency"] = first.info["transparency"]
+    for chunk in GifImagePlugin._get_global_header(first, header_info):
+        buffer.write(chunk)
+    
+    global_palette = _palette_bytes(first)
+    encoded = {}
+    for entry, crop in zip(plan, crops):
+        params = {
+            "duration": entry["duration"],
+            "disposal": entry["disposal"],
+        }
+        if "transparency" in crop.info:
+            params["transparency"] = crop.info["transparency"]
+        if _palette_bytes(crop) != global_palette:
+            params["include_color_table"] = True
+        
+        # A frame that comes back in the same spot is LZW-encoded only once
+        key = (frame_key(crop), entry["box"], tuple(sorted(params.items())))
+        if key not in encoded:
+            frame_buffer = io.BytesIO()
+            GifImagePlugin._write_frame_data(frame_buffer, crop, entry["box"][:2], params)
+            encoded[key] = frame_buffer.getvalue()
+        buffer.write(encoded[key])
+    
+    buffer.write(b";")  # end of file
+    return buffer.getvalue()
+
+
+def has_frame_writer() -> bool:
+    """Check if this Pillow has the private GIF writers write_gif() uses."""
+    return all(hasattr(GifImagePlugin, name) for name in _FRAME_WRITER)
+
+
+def _save_with_pillow(plan: Sequence[dict], loop: int) -> bytes:
+    """Save planned frames whole with Image.save(), clearing after each frame."""
+    global _fallback_logged
+    
+    if not _fallback_logged:
+        logger.warning("GifImagePlugin frame writers missing, saving GIFs through Image.save()")
+        _fallback_logged = True
+    
+    frames = [entry["frame"] for entry in plan]
+    buffer = io.BytesIO()
+    frames[0].save(
+        buffer,
+        format="GIF",
+        save_all=True,
+        append_images=frames[1:],
+        duration=[entry["duration"] for entry in plan],
+        disposal=DISPOSAL_BACKGROUND,
+        loop=loop,
+    )
+    return buffer.getvalue()
+
+
+def _entry(frame: Image.Image, box: Box, duration: int) -> dict:
+    """Create a plan entry."""
+    return {
+        "frame": frame,
+        "box": box,
+        "disposal": DISPOSAL_NONE,
+        "duration": duration,
+    }
+
+
+def _clear_after(entry: dict, canvas: Image.Image):
+    """Restore everything visible to the background once the entry is shown."""
+    entry["disposal"] = DISPOSAL_BACKGROUND
+    entry["box"] = _union(entry["box"], canvas.getbbox())
+
+
+def _clears_pixels(canvas: Image.Image, rgba: Image.Image) -> bool:
+    """Check if any visible canvas pixel is transparent in the next frame."""
+    if rgba.getextrema()[3][0] == 255:
+        return False
+    cleared = ImageChops.subtract(canvas.getchannel("A"), rgba.getchannel("A"))
+    return cleared.getbbox() is not None
+
+
+def _union(box: Box, other: Optional[Box]) -> Box:
+    """Get the bounding box of two boxes."""
+    if other is None:
+        return box
+    return (
+        min(box[0], other[0]),
+        min(box[1], other[1]),
+        max(box[2], other[2]),
+        max(box[3], other[3]),
+    )
+
+
+def _palette_bytes(frame: Image.Image) -> bytes:
+    """Get the RGB palette bytes of a P-mode frame (RGBA palettes included)."""
+    return bytes(frame.getpalette("RGB") or b"")
+
+
+def _trim_palettes(crops: List[Image.Image]) -> List[Image.Image]:
+    """
+    Remap frames to the palette entries they use.
+    
+    Frames sharing a palette are trimmed together so they keep sharing it.
+    """
+    groups = {}
+    for index, crop in enumerate(crops):
+        key = (_palette_bytes(crop), crop.info.get("transparency"))
+        groups.setdefault(key, []).append(index)
+    
+    trimmed = list(crops)
+    for indices in groups.values():
+        counts = [0] * 256
+        for index in indices:
+            for color, count in enumerate(crops[index].histogram()):
+                counts[color] += count
+        used = [color for color, count in enumerate(counts) if count]
+        # Full 256 entries so indices past a short palette stay addressable
+        source_palette = _palette_bytes(crops[indices[0]]).ljust(768, b"\0")
+        for index in indices:
+            trimmed[index] = crops[index].remap_palette(used, source_palette)
+    
+    return trimmed
+
+
+def _expand_durations(duration: Union[int, Sequence[int]], count: int) -> List[int]:
+    """Get a duration for every frame."""
+    if isinstance(duration, (list, tuple)):
+        return list(duration)
+    return [duration] * count
@@ -1,56 +1,77 @@
 from typing import List
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import os
 
 from .base_effect import BaseEffect
+from ..font_registry import font_registry
 from config import Config
 
 
 class GrowEffect(BaseEffect):
     """Growing effect - text starts small and grows larger."""
     
+    # Smallest font size of the first frame
+    min_font_size = 8
+    
     def generate_frames(self) -> List[Image.Image]:
-        """Generate frames with progressively larger text."""
-        frames = []
+        """
+        Generate frames with progressively larger text.
+        
+        The text grows up to the font size the generator already solved for
+        the canvas. Frames are drawn at their own font size, or resampled from
+        a single rendering when Config.GROW_RESAMPLE_FRAMES is enabled.
+        """
+        return self.render_frames(self._render_frame)
+    
+    def _render_frame(self, index: int) -> Image.Image:
+        """Render one frame at its point of the growth curve."""
+        max_size = self._get_max_font_size()
+        
+        # Calculate font size for this frame (ease-out effect)
+        progress = index / (self.frame_count - 1) if self.frame_count > 1 else 1
+        # Ease-out cubic for natural feel
+        eased_progress = 1 - pow(1 - progress, 3)
+        
+        current_size = int(self.min_font_size + (max_size - self.min_font_size) * eased_progress)
+        
+        if current_size >= max_size:
+            return self.create_coverage_frame()
+        if Config.GROW_RESAMPLE_FRAMES:
+            return self._create_resampled_frame(current_size / max_size)
+        return self._create_sized_frame(current_size)
+    
+    def _create_sized_frame(self, font_size: int) -> Image.Image:
+        """Draw the text centered at a given font size."""
+        # Get font at current size from the shared registry
+        sized_font = font_registry.get_font_by_path(self._get_font_path(), font_size)
         
-        # Get font file path for resizing
-        font_path = self._get_font_path()
+        # Create frame
+        img = Image.new("L", (self.size, self.size), 0)
+        draw = ImageDraw.Draw(img)
         
-        # Define size range
-        min_size = 8
-        max_size = self._calculate_max_font_size()
+        # Calculate centered position
+        bbox = draw.textbbox((0, 0), self.text, font=sized_font)
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
         
-        for i in range(self.frame_count):
-            # Calculate font size for this frame (ease-out effect)
-            progress = i / (self.frame_count - 1) if self.frame_count > 1 else 1
-            # Ease-out cubic for natural feel
-            eased_progress = 1 - pow(1 - progress, 3)
-            
-            current_size = int(min_size + (max_size - min_size) * eased_progress)
-            
-            # Create font at current size
-            try:
-                sized_font = ImageFont.truetype(font_path, current_size)
-            except (OSError, IOError):
-                sized_font = ImageFont.load_default()
-            
-            # Create frame
-            img = Image.new("RGBA", (self.size, self.size), self.bg_color)
-            draw = ImageDraw.Draw(img)
-            
-            # Calculate centered position
-            bbox = draw.textbbox((0, 0), self.text, font=sized_font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-            
-            # Subtract bbox offsets to properly center the actual text
-            x = (self.size - text_width) // 2 - bbox[0]
-            y = (self.size - text_height) // 2 - bbox[1]
-            
-            draw.text((x, y), self.text, font=sized_font, fill=self.text_color)
-            frames.append(img)
+        # Subtract bbox offsets to properly center the actual text
+        x = (self.size - text_width) // 2 - bbox[0]
+        y = (self.size - text_height) // 2 - bbox[1]
         
-        return frames
+        draw.text((x, y), self.text, font=sized_font, fill=255)
+        return img
+    
+    def _create_resampled_frame(self, scale: float) -> Image.Image:
+        """Scale the full-size coverage mask around the canvas center."""
+        mask, (x, y) = self.get_coverage_mask()
+        width = max(1, round(mask.width * scale))
+        height = max(1, round(mask.height * scale))
+        scaled = mask.resize((width, height), Image.Resampling.LANCZOS)
+        
+        center = self.size / 2
+        img = Image.new("L", (self.size, self.size), 0)
+        img.paste(scaled, (round(center + (x - center) * scale), round(center + (y - center) * scale)))
+        return img
     
     def _get_font_path(self) -> str:
         """Get the path to the font file."""
@@ -61,35 +82,6 @@ class GrowEffect(BaseEffect):
         # Fallback to default font
         return os.path.join(Config.FONTS_DIR, Config.DEFAULT_FONT)
     
-    def _calculate_max_font_size(self) -> int:
-        """Calculate maximum font size that fits in canvas."""
-        # Start with a reasonable max and adjust
-        padding = 10
-        target_size = self.size - (padding * 2)
-        
-        font_path = self._get_font_path()
-        
-        # Binary search for optimal size
-        min_font = 8
-        max_font = 128
-        optimal_size = min_font
-        
-        while min_font <= max_font:
-            mid = (min_font + max_font) // 2
-            try:
-                test_font = ImageFont.truetype(font_path, mid)
-                temp_img = Image.new("RGBA", (1, 1))
-                draw = ImageDraw.Draw(temp_img)
-                bbox = draw.textbbox((0, 0), self.text, font=test_font)
-                width = bbox[2] - bbox[0]
-                height = bbox[3] - bbox[1]
-                
-                if width <= target_size and height <= target_size:
-                    optimal_size = mid
-                    min_font = mid + 1
-                else:
-                    max_font = mid - 1
-            except:
-                max_font = mid - 1
-        
-        return optimal_size
+    def _get_max_font_size(self) -> int:
+        """Get the font size of the last frame (the size solved for the canvas)."""
+        return max(getattr(self.font, "size", Config.DEFAULT_FONT_SIZE), self.min_font_size)
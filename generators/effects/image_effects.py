@@ -4,9 +4,15 @@ Applies animation effects to uploaded images.
 """
 import io
 import math
-from typing import Tuple, List
+from typing import Iterable, List, Tuple, Union
 from PIL import Image
 
+from .frame_pool import map_frames
+from .gif_encoder import Encoded, encode_within_budget
+
+# Colors per frame tried when a GIF is over the emoji byte budget
+PALETTE_LEVELS = (255, 128, 64, 32)
+
 
 def apply_effect_to_image(
     img: Image.Image,
@@ -33,169 +39,224 @@ def apply_effect_to_image(
         buffer.seek(0)
         return buffer.read(), "png"
     
+    return _create_gif(effect_frames(img, effect, frame_count), duration)
+
+
+def effect_frames(img: Image.Image, effect: str, frame_count: int = 12) -> List[Image.Image]:
+    """
+    Render the frames of an effect over one image.
+    
+    Args:
+        img: PIL Image (processed to emoji size)
+        effect: Effect name
+        frame_count: Number of animation frames
+    
+    Returns:
+        List of RGBA frames
+    """
     effect_func = EFFECT_FUNCTIONS.get(effect, _effect_none)
-    frames = effect_func(img, frame_count)
-    
-    return _create_gif(frames, duration)
-
-
-def _create_gif(frames: List[Image.Image], duration: int) -> Tuple[bytes, str]:
-    """Create animated GIF from frames."""
-    buffer = io.BytesIO()
-    
-    # Convert frames to P mode with transparency for GIF
-    processed_frames = []
-    for frame in frames:
-        if frame.mode == "RGBA":
-            # Convert RGBA to P with transparency
-            alpha = frame.split()[3]
-            p_frame = frame.convert("P", palette=Image.Palette.ADAPTIVE, colors=255)
-            mask = Image.eval(alpha, lambda a: 255 if a <= 128 else 0)
-            p_frame.paste(255, mask)
-            processed_frames.append(p_frame)
-        else:
-            processed_frames.append(frame.convert("P", palette=Image.Palette.ADAPTIVE))
-    
-    processed_frames[0].save(
-        buffer,
-        format="GIF",
-        save_all=True,
-        append_images=processed_frames[1:],
-        duration=duration,
-        loop=0,
-        disposal=2,
-        transparency=255,
-    )
+    return map_frames(lambda index: effect_func(img, index, frame_count), frame_count)
+
+
+def apply_effect_to_frames(
+    frames: Iterable[Tuple[Image.Image, int]],
+    effect: str,
+    frame_count: int = 12,
+    duration: int = 100,
+) -> Tuple[bytes, str]:
+    """
+    Apply animation effect to an animated image.
+    
+    The source animation keeps its own timing. Frames longer than duration
+    are shown as several steps so the effect keeps moving, and the effect
+    runs a whole number of its frame_count * duration cycles per loop.
     
-    buffer.seek(0)
-    return buffer.read(), "gif"
+    Args:
+        frames: (frame, duration in ms) pairs processed to emoji size
+        effect: Effect name ("none" keeps the source animation)
+        frame_count: Number of frames in one effect cycle
+        duration: Duration of one effect frame in milliseconds
+    
+    Returns:
+        Tuple of (image bytes, file extension)
+    """
+    frames = list(frames)
+    if effect == "none" or effect not in EFFECT_FUNCTIONS:
+        output = frames
+    else:
+        effect_func = EFFECT_FUNCTIONS[effect]
+        total = sum(frame_duration for _, frame_duration in frames)
+        cycles = max(1, round(total / (frame_count * duration)))
+        
+        # (source frame, effect index, duration) of each output frame
+        steps_out = []
+        elapsed = 0
+        for frame, frame_duration in frames:
+            steps = max(1, round(frame_duration / duration))
+            # Step boundaries on whole 10ms, the GIF delay unit
+            bounds = [elapsed + frame_duration * step // steps // 10 * 10 for step in range(steps)]
+            bounds.append(elapsed + frame_duration)
+            for start, end in zip(bounds, bounds[1:]):
+                index = round(start / total * cycles * frame_count) % frame_count
+                steps_out.append((frame, index, end - start))
+            elapsed += frame_duration
+        
+        rendered = map_frames(
+            lambda step: effect_func(steps_out[step][0], steps_out[step][1], frame_count),
+            len(steps_out),
+        )
+        output = [(image, step[2]) for image, step in zip(rendered, steps_out)]
+    
+    if len(output) == 1:
+        # Single frame, return as PNG
+        buffer = io.BytesIO()
+        output[0][0].save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue(), "png"
+    
+    return _create_gif(
+        [frame for frame, _ in output],
+        [frame_duration for _, frame_duration in output],
+    )
 
 
-def _effect_none(img: Image.Image, frame_count: int) -> List[Image.Image]:
-    """No animation - single frame."""
-    return [img]
+def _create_gif(
+    frames: List[Image.Image],
+    duration: Union[int, List[int]],
+) -> Tuple[bytes, str]:
+    """Create animated GIF from frames, within the emoji byte budget."""
+    # Repeated frames (pulses, holds) are quantized once and shown longer;
+    # over the budget, fewer colors and frames are tried
+    image_bytes, report = encode_within_budget(frames, duration, _to_palette_frame, PALETTE_LEVELS)
+    return Encoded((image_bytes, "gif"), report)
+
+
+def _to_palette_frame(frame: Image.Image, colors: int = 255) -> Image.Image:
+    """Convert a frame to P mode with transparency for GIF."""
+    if frame.mode == "RGBA":
+        # Convert RGBA to P with transparency
+        alpha = frame.split()[3]
+        p_frame = frame.convert("P", palette=Image.Palette.ADAPTIVE, colors=colors)
+        mask = Image.eval(alpha, lambda a: 255 if a <= 128 else 0)
+        p_frame.paste(255, mask)
+    else:
+        p_frame = frame.convert("P", palette=Image.Palette.ADAPTIVE, colors=colors)
+    p_frame.info["transparency"] = 255
+    return p_frame
+
 
+def _effect_none(img: Image.Image, index: int, frame_count: int) -> Image.Image:
+    """No animation - the image itself."""
+    return img
 
-def _effect_rotate(img: Image.Image, frame_count: int) -> List[Image.Image]:
+
+def _effect_rotate(img: Image.Image, index: int, frame_count: int) -> Image.Image:
     """Rotate image 360 degrees."""
-    frames = []
-    for i in range(frame_count):
-        angle = (360 / frame_count) * i
-        # Rotate around center
-        rotated = img.rotate(-angle, resample=Image.Resampling.BICUBIC, expand=False)
-        frames.append(rotated)
-    return frames
+    angle = (360 / frame_count) * index
+    # Rotate around center
+    return img.rotate(-angle, resample=Image.Resampling.BICUBIC, expand=False)
 
 
-def _effect_shake(img: Image.Image, frame_count: int) -> List[Image.Image]:
+def _effect_shake(img: Image.Image, index: int, frame_count: int) -> Image.Image:
     """Shake image left and right."""
-    frames = []
     size = img.size[0]
     max_offset = size // 10  # 10% of size
     
-    for i in range(frame_count):
-        # Sine wave movement
-        offset = int(max_offset * math.sin(2 * math.pi * i / frame_count))
-        
-        # Create new canvas and paste shifted image
-        canvas = Image.new("RGBA", img.size, (0, 0, 0, 0))
-        canvas.paste(img, (offset, 0), img)
-        frames.append(canvas)
+    # Sine wave movement
+    offset = int(max_offset * math.sin(2 * math.pi * index / frame_count))
     
-    return frames
+    # Create new canvas and paste shifted image
+    canvas = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    canvas.paste(img, (offset, 0), img)
+    return canvas
 
 
-def _effect_party(img: Image.Image, frame_count: int) -> List[Image.Image]:
+def _effect_party(img: Image.Image, index: int, frame_count: int) -> Image.Image:
     """Rainbow color cycling effect."""
-    frames = []
+    hue_shift = int((360 / frame_count) * index)
     
-    for i in range(frame_count):
-        hue_shift = int((360 / frame_count) * i)
-        
-        # Convert to HSV, shift hue, convert back
-        if img.mode != "RGBA":
-            rgba_img = img.convert("RGBA")
-        else:
-            rgba_img = img.copy()
-        
-        # Simple color overlay with hue shift
-        r, g, b, a = rgba_img.split()
-        
-        # Create hue color
-        hue_color = _hue_to_rgb(hue_shift)
-        
-        # Blend with original (tint effect)
-        from PIL import ImageEnhance
-        
-        # Create a colored overlay
-        overlay = Image.new("RGBA", img.size, (*hue_color, 128))
-        
-        # Composite with original
-        result = Image.alpha_composite(rgba_img, overlay)
-        
-        # Restore original alpha
-        result.putalpha(a)
-        frames.append(result)
+    # Convert to HSV, shift hue, convert back
+    if img.mode != "RGBA":
+        rgba_img = img.convert("RGBA")
+    else:
+        rgba_img = img.copy()
+    
+    # Simple color overlay with hue shift
+    r, g, b, a = rgba_img.split()
+    
+    # Create hue color
+    hue_color = _hue_to_rgb(hue_shift)
     
-    return frames
+    # Create a colored overlay
+    overlay = Image.new("RGBA", img.size, (*hue_color, 128))
+    
+    # Composite with original
+    result = Image.alpha_composite(rgba_img, overlay)
+    
+    # Restore original alpha
+    result.putalpha(a)
+    return result
 
 
-def _effect_wave(img: Image.Image, frame_count: int) -> List[Image.Image]:
+def _effect_wave(img: Image.Image, index: int, frame_count: int) -> Image.Image:
     """Wave distortion effect."""
-    frames = []
     size = img.size[0]
     amplitude = size // 16  # Wave amplitude
+    phase = (2 * math.pi * index) / frame_count
     
-    for i in range(frame_count):
-        phase = (2 * math.pi * i) / frame_count
-        
-        # Create distorted image
-        result = Image.new("RGBA", img.size, (0, 0, 0, 0))
-        
-        for y in range(size):
-            # Calculate x offset based on sine wave
-            offset = int(amplitude * math.sin(2 * math.pi * y / size + phase))
-            
-            # Copy row with offset
-            row = img.crop((0, y, size, y + 1))
-            
-            # Wrap around
-            if offset != 0:
-                result.paste(row, (offset, y), row)
-        
-        frames.append(result)
+    # Calculate x offset of each row based on sine wave
+    offsets = [
+        int(amplitude * math.sin(2 * math.pi * y / size + phase))
+        for y in range(size)
+    ]
+    
+    # Shift all rows in one mesh transform, one quad per run of rows with
+    # the same offset (rows that stay in place are left empty)
+    mesh = []
+    top = 0
+    while top < size:
+        bottom = top + 1
+        while bottom < size and offsets[bottom] == offsets[top]:
+            bottom += 1
+        offset = offsets[top]
+        if offset != 0:
+            mesh.append((
+                (0, top, size, bottom),
+                (-offset, top, -offset, bottom, size - offset, bottom, size - offset, top),
+            ))
+        top = bottom
     
-    return frames
+    shifted = img.transform(img.size, Image.Transform.MESH, mesh, Image.Resampling.NEAREST)
+    
+    # Paste with its own alpha like the per-row paste did
+    result = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    result.paste(shifted, (0, 0), shifted)
+    return result
 
 
-def _effect_grow(img: Image.Image, frame_count: int) -> List[Image.Image]:
+def _effect_grow(img: Image.Image, index: int, frame_count: int) -> Image.Image:
     """Pulsing size effect."""
-    frames = []
     size = img.size[0]
     min_scale = 0.7
     max_scale = 1.0
     
-    for i in range(frame_count):
-        # Sine wave for smooth pulsing
-        t = (math.sin(2 * math.pi * i / frame_count) + 1) / 2  # 0 to 1
-        scale = min_scale + (max_scale - min_scale) * t
-        
-        new_size = int(size * scale)
-        
-        # Resize image
-        resized = img.resize(
-            (new_size, new_size),
-            Image.Resampling.LANCZOS
-        )
-        
-        # Center on canvas
-        canvas = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-        offset = (size - new_size) // 2
-        canvas.paste(resized, (offset, offset), resized)
-        
-        frames.append(canvas)
+    # Sine wave for smooth pulsing
+    t = (math.sin(2 * math.pi * index / frame_count) + 1) / 2  # 0 to 1
+    scale = min_scale + (max_scale - min_scale) * t
+    
+    new_size = int(size * scale)
+    
+    # Resize image
+    resized = img.resize(
+        (new_size, new_size),
+        Image.Resampling.LANCZOS
+    )
+    
+    # Center on canvas
+    canvas = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    offset = (size - new_size) // 2
+    canvas.paste(resized, (offset, offset), resized)
     
-    return frames
+    return canvas
 
 
 def _hue_to_rgb(hue: int) -> Tuple[int, int, int]:
@@ -9,4 +9,4 @@ class NoneEffect(BaseEffect):
     
     def generate_frames(self) -> List[Image.Image]:
         """Generate a single static frame."""
-        return [self.create_frame()]
+        return [self.create_coverage_frame()]
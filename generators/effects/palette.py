@@ -0,0 +1,162 @@
+"""
+Palette helpers for text frames.
+Text frames only contain blends between the text color and the background,
+so they can be indexed straight from the glyph coverage instead of being
+quantized pixel by pixel.
+"""
+from typing import List, Optional, Sequence, Tuple
+from PIL import Image
+
+from ..cache import LRUCache
+
+# Every coverage level, 0 (background) to 255 (solid text)
+_COVERAGE_LEVELS = Image.frombytes("L", (256, 1), bytes(range(256)))
+
+# GIF frames keep pixels with alpha above this value (matches _save_as_gif)
+ALPHA_THRESHOLD = 128
+
+# Built palettes keyed by colors and ramp settings, shared across requests
+palette_cache = LRUCache(max_entries=1024)
+
+
+def blend_levels(
+    text_color: Tuple[int, int, int, int],
+    bg_color: Tuple[int, int, int, int],
+    transparent: bool,
+    keep_alpha: bool = False,
+) -> List[Optional[tuple]]:
+    """
+    Get the output color of each coverage level for one text color.
+    
+    Levels are blended by PIL itself so they match frames drawn with
+    draw.text() exactly.
+    
+    Args:
+        text_color: RGBA text color
+        bg_color: RGBA background color
+        transparent: Whether the background is written as transparent
+        keep_alpha: Keep partial alpha (PNG) instead of a GIF alpha cutoff
+    
+    Returns:
+        List of 256 colors (RGBA if keep_alpha on a transparent background,
+        otherwise RGB), None where a GIF pixel becomes transparent
+    """
+    ramp = Image.new("RGBA", _COVERAGE_LEVELS.size, bg_color)
+    ramp.paste(text_color, (0, 0), _COVERAGE_LEVELS)
+    
+    if transparent:
+        if keep_alpha:
+            return list(ramp.getdata())
+        return [
+            None if a <= ALPHA_THRESHOLD else (r, g, b)
+            for r, g, b, a in ramp.getdata()
+        ]
+    
+    # Opaque background: composite onto the solid background like frames are
+    flat = Image.new("RGB", ramp.size, bg_color[:3])
+    flat.paste(ramp, mask=ramp.split()[3])
+    return list(flat.getdata())
+
+
+def ramp_levels(steps: int) -> List[int]:
+    """
+    Snap the 256 coverage levels onto an evenly spaced ramp.
+    
+    Args:
+        steps: Number of ramp steps (256 keeps every level)
+    
+    Returns:
+        List mapping each coverage level to its ramp level
+    """
+    if steps >= 256:
+        return list(range(256))
+    
+    steps = max(steps, 2)
+    return [
+        round(round(level * (steps - 1) / 255) * 255 / (steps - 1))
+        for level in range(256)
+    ]
+
+
+def coverage_palette(
+    text_colors: Sequence[Tuple[int, int, int, int]],
+    bg_color: Tuple[int, int, int, int],
+    transparent: bool,
+    steps: int = 256,
+    keep_alpha: bool = False,
+) -> Tuple[Tuple[int, ...], Tuple[bytes, ...], Optional[int]]:
+    """
+    Build a coverage lookup table shared by one palette per text color.
+    
+    Coverage levels that look the same under every text color share an index,
+    so frames that only change the text color can reuse the same indexed
+    pixels and differ only by palette. Results are cached process-wide.
+    
+    Args:
+        text_colors: RGBA text colors, one palette is built for each
+        bg_color: RGBA background color
+        transparent: Whether the background is written as transparent
+        steps: Number of ramp steps between background and text
+        keep_alpha: Build RGBA palettes with partial alpha (PNG)
+    
+    Returns:
+        Tuple of (256-entry coverage LUT, palette bytes per text color,
+        transparent index or None)
+    """
+    cache_key = (tuple(text_colors), tuple(bg_color), transparent, steps, keep_alpha)
+    cached = palette_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    levels = [
+        blend_levels(color, bg_color, transparent, keep_alpha)
+        for color in text_colors
+    ]
+    snapped = ramp_levels(steps)
+    
+    lut = []
+    classes = {}
+    for level in range(256):
+        key = tuple(colors[snapped[level]] for colors in levels)
+        if key not in classes:
+            classes[key] = len(classes)
+        lut.append(classes[key])
+    
+    transparency = None
+    palettes = [bytearray() for _ in text_colors]
+    for key in classes:
+        if all(color is None for color in key):
+            transparency = classes[key]
+        for palette, color in zip(palettes, key):
+            palette.extend(color or (0, 0, 0))
+    
+    result = (tuple(lut), tuple(bytes(palette) for palette in palettes), transparency)
+    palette_cache.put(cache_key, result)
+    return result
+
+
+def index_coverage(
+    coverage: Image.Image,
+    lut: Sequence[int],
+    palette: bytes,
+    transparency: Optional[int] = None,
+    palette_mode: str = "RGB",
+) -> Image.Image:
+    """
+    Map an L-mode coverage frame to a palette image.
+    
+    Args:
+        coverage: L-mode coverage frame (0 = background, 255 = text)
+        lut: Coverage lookup table from coverage_palette()
+        palette: Palette bytes from coverage_palette()
+        transparency: Transparent palette index, if any
+        palette_mode: "RGB", or "RGBA" for palettes built with keep_alpha
+    
+    Returns:
+        P-mode image
+    """
+    frame = coverage.point(lut)
+    frame.putpalette(palette, palette_mode)
+    if transparency is not None:
+        frame.info["transparency"] = transparency
+    return frame
@@ -3,29 +3,44 @@ from typing import List, Tuple
 from PIL import Image
 
 from .base_effect import BaseEffect
+from .palette import coverage_palette, index_coverage
 
 
 class PartyEffect(BaseEffect):
     """Party parrot style - rainbow color cycling effect."""
     
     def generate_frames(self) -> List[Image.Image]:
-        """Generate frames with cycling rainbow colors."""
-        frames = []
+        """
+        Generate frames with cycling rainbow colors.
         
-        for i in range(self.frame_count):
-            # Calculate hue for this frame (0-1 range)
-            hue = i / self.frame_count
-            
-            # Convert HSV to RGB
-            r, g, b = colorsys.hsv_to_rgb(hue, 1.0, 1.0)
-            color = (
-                int(r * 255),
-                int(g * 255),
-                int(b * 255),
-                255
-            )
-            
-            frame = self.create_frame(color_override=color)
+        Only the text color changes between frames, so the glyph coverage is
+        indexed once and every frame is the same pixels with its own palette.
+        """
+        colors = [self._frame_color(i) for i in range(self.frame_count)]
+        
+        lut, palettes, transparency = coverage_palette(
+            colors, self.bg_color, self.is_transparent_bg(), self.palette_steps
+        )
+        indexed = index_coverage(self.create_coverage_frame(), lut, palettes[0], transparency)
+        
+        frames = [indexed]
+        for palette in palettes[1:]:
+            frame = indexed.copy()
+            frame.putpalette(palette)
             frames.append(frame)
         
         return frames
+    
+    def _frame_color(self, index: int) -> Tuple[int, int, int, int]:
+        """Get the rainbow text color for a frame."""
+        # Calculate hue for this frame (0-1 range)
+        hue = index / self.frame_count
+        
+        # Convert HSV to RGB
+        r, g, b = colorsys.hsv_to_rgb(hue, 1.0, 1.0)
+        return (
+            int(r * 255),
+            int(g * 255),
+            int(b * 255),
+            255
+        )
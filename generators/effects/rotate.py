@@ -8,25 +8,21 @@ from .base_effect import BaseEffect
 class RotateEffect(BaseEffect):
     """Circular rotation effect - text moves in a circle."""
     
+    # Radius of circular motion
+    radius_x = 10  # Horizontal radius
+    radius_y = 5   # Vertical radius (elliptical motion)
+    
     def generate_frames(self) -> List[Image.Image]:
         """Generate frames with text moving in circular path."""
-        frames = []
-        
-        text_width, text_height = self.get_text_size()
-        
-        # Radius of circular motion
-        radius_x = 10  # Horizontal radius
-        radius_y = 5   # Vertical radius (elliptical motion)
+        return self.render_frames(self._render_frame)
+    
+    def _render_frame(self, index: int) -> Image.Image:
+        """Render one frame at its point of the circle."""
+        # Calculate angle for this frame
+        angle = (2 * math.pi * index) / self.frame_count
         
-        for i in range(self.frame_count):
-            # Calculate angle for this frame
-            angle = (2 * math.pi * i) / self.frame_count
-            
-            # Calculate offset using sin/cos for circular motion
-            x_offset = int(math.sin(angle) * radius_x)
-            y_offset = int(math.cos(angle) * radius_y)
-            
-            frame = self.create_frame(x_offset=x_offset, y_offset=y_offset)
-            frames.append(frame)
+        # Calculate offset using sin/cos for circular motion
+        x_offset = int(math.sin(angle) * self.radius_x)
+        y_offset = int(math.cos(angle) * self.radius_y)
         
-        return frames
+        return self.create_coverage_frame(x_offset=x_offset, y_offset=y_offset)
@@ -1,7 +1,11 @@
-from typing import List, Tuple
-from PIL import Image, ImageDraw
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+from PIL import Image
 
 from .base_effect import BaseEffect
+from .frame_pool import cpu_share
+from .gif_encoder import FRAME_STEPS, Encoded, budget_report
 
 
 class ScrollEffect(BaseEffect):
@@ -22,14 +26,18 @@ class ScrollEffect(BaseEffect):
     
     def generate_frames(self) -> List[Image.Image]:
         """Generate frames with horizontally scrolling text."""
-        frames = []
+        return [self._crop_tile(strip, self.tile_index) for strip in self.generate_strip_frames()]
+    
+    def generate_strip_frames(self) -> List[Image.Image]:
+        """
+        Generate frames of the combined canvas of all tiles.
         
+        The text is rasterized once and pasted at each frame's scroll position;
+        tiles are cropped from the same strip so they stay pixel-synchronized.
+        """
         # Get full bounding box for accurate positioning
-        temp_img = Image.new("RGBA", (1, 1))
-        temp_draw = ImageDraw.Draw(temp_img)
-        bbox = temp_draw.textbbox((0, 0), self.text, font=self.font)
+        bbox = self.get_text_bbox()
         text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
         
         # Total width of all tiles combined
         total_canvas_width = self.size * self.total_tiles
@@ -39,29 +47,30 @@ class ScrollEffect(BaseEffect):
         # End: text completely off left (x = -text_width)
         total_scroll_distance = total_canvas_width + text_width
         
-        # Center text vertically, accounting for bbox top offset
-        # bbox[1] is the top offset - we subtract it to properly center the actual text
-        y = (self.size - text_height) // 2 - bbox[1]
+        # The coverage mask is vertically centered like a draw.text() call at
+        # y = (size - text_height) // 2 - bbox[1]; its x is relative to the
+        # centered draw position, which is converted to the scroll origin
+        mask, (mask_x, mask_y) = self.get_coverage_mask()
+        mask_x -= (self.size - text_width) // 2 - bbox[0]
         
-        for i in range(self.frame_count):
-            img = Image.new("RGBA", (self.size, self.size), self.bg_color)
-            draw = ImageDraw.Draw(img)
+        def render_strip(i: int) -> Image.Image:
+            img = Image.new("L", (total_canvas_width, self.size), 0)
             
             # Use normalized progress (0.0 to 1.0) for consistent calculation across all tiles
-            # This ensures all tiles use exactly the same global_x value
             progress = i / self.frame_count
             
             # global_x: position on the combined canvas (integer for pixel-perfect sync)
             global_x = round(total_canvas_width - (progress * total_scroll_distance))
             
-            # local_x: position relative to this tile
-            # tile 0 shows x: [0, size), tile 1 shows x: [size, size*2), etc.
-            local_x = global_x - (self.tile_index * self.size)
-            
-            draw.text((local_x, y), self.text, font=self.font, fill=self.text_color)
-            frames.append(img)
+            img.paste(mask, (global_x + mask_x, mask_y))
+            return img
         
-        return frames
+        return self.render_frames(render_strip)
+    
+    def _crop_tile(self, strip: Image.Image, tile_index: int) -> Image.Image:
+        """Crop one tile from a strip frame (tile 0 shows x: [0, size), etc.)."""
+        left = tile_index * self.size
+        return strip.crop((left, 0, left + self.size, self.size))
     
     @classmethod
     def generate_all_tiles(
@@ -73,30 +82,67 @@ class ScrollEffect(BaseEffect):
         size: int = 128,
         frame_count: int = 60,
         duration: int = 100,
+        progress: Optional[Callable[[int, int], None]] = None,
     ) -> List[Tuple[bytes, str, int]]:
         """
         Generate all tiles for the scrolling text.
         
+        The strip frames are rendered once and the tiles cut from them are
+        encoded concurrently.
+        
+        Args:
+            progress: Called with (done, total) after each tile is encoded
+        
         Returns:
-            List of (image_bytes, extension, tile_index) tuples
+            List of (image_bytes, extension, tile_index) tuples; GIF tiles
+            carry their budget report
         """
         # Number of tiles based on text length (minimum 2, maximum 10)
         total_tiles = min(max(len(text), 2), 10)
         
-        results = []
-        for tile_idx in range(total_tiles):
-            effect = cls(
-                text=text,
-                font=font,
-                text_color=text_color,
-                bg_color=bg_color,
-                size=size,
-                frame_count=frame_count,
-                duration=duration,
-                tile_index=tile_idx,
-                total_tiles=total_tiles,
-            )
-            image_bytes, ext = effect.generate()
-            results.append((image_bytes, ext, tile_idx))
-        
-        return results
+        effect = cls(
+            text=text,
+            font=font,
+            text_color=text_color,
+            bg_color=bg_color,
+            size=size,
+            frame_count=frame_count,
+            duration=duration,
+            total_tiles=total_tiles,
+        )
+        strips = effect.generate_strip_frames()
+        
+        def encode_tile(tile_idx: int, frame_steps=FRAME_STEPS) -> Tuple[bytes, str, int]:
+            frames = [effect._crop_tile(strip, tile_idx) for strip in strips]
+            if len(frames) == 1:
+                return effect._save_as_png(frames[0]), "png", tile_idx
+            image_bytes, report = effect._encode_gif(frames, frame_steps)
+            return Encoded((image_bytes, "gif", tile_idx), report)
+        
+        def frame_step(tile: Tuple[bytes, str, int]) -> int:
+            report = budget_report(tile)
+            return report["frame_step"] if report else 1
+        
+        encoded = []
+        lock = threading.Lock()
+        
+        def encode_and_report(tile_idx: int) -> Tuple[bytes, str, int]:
+            tile = encode_tile(tile_idx)
+            if progress:
+                with lock:
+                    encoded.append(tile_idx)
+                    progress(len(encoded), total_tiles)
+            return tile
+        
+        workers = min(total_tiles, cpu_share())
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            tiles = list(executor.map(encode_and_report, range(total_tiles)))
+            
+            # Tiles only stay in sync with the same frames, so if one had to
+            # drop frames to fit the byte budget, all of them drop the same
+            step = max(frame_step(tile) for tile in tiles)
+            redo = [tile[2] for tile in tiles if frame_step(tile) != step]
+            for tile in executor.map(lambda idx: encode_tile(idx, (step,)), redo):
+                tiles[tile[2]] = tile
+        
+        return tiles
@@ -8,23 +8,20 @@ from .base_effect import BaseEffect
 class ShakeEffect(BaseEffect):
     """Shaking effect - text vibrates randomly."""
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Set seed for reproducible random shake
-        self._random = random.Random(42)
+    # Seed for a reproducible shake; each frame seeds its own generator from
+    # it, so frames can be rendered in any order
+    seed = 42
+    
+    # Maximum pixels to shake
+    shake_intensity = 4
     
     def generate_frames(self) -> List[Image.Image]:
         """Generate frames with random position offsets."""
-        frames = []
-        
-        shake_intensity = 4  # Maximum pixels to shake
-        
-        for i in range(self.frame_count):
-            # Random offset for shake effect
-            x_offset = self._random.randint(-shake_intensity, shake_intensity)
-            y_offset = self._random.randint(-shake_intensity, shake_intensity)
-            
-            frame = self.create_frame(x_offset=x_offset, y_offset=y_offset)
-            frames.append(frame)
-        
-        return frames
+        return self.render_frames(self._render_frame)
+    
+    def _render_frame(self, index: int) -> Image.Image:
+        """Render one frame at its random offset."""
+        frame_random = random.Random(f"{self.seed}:{index}")
+        x_offset = frame_random.randint(-self.shake_intensity, self.shake_intensity)
+        y_offset = frame_random.randint(-self.shake_intensity, self.shake_intensity)
+        return self.create_coverage_frame(x_offset=x_offset, y_offset=y_offset)
@@ -28,7 +28,7 @@ class TypingEffect(BaseEffect):
             # Get the substring to display
             display_text = self._get_chars(chars_to_show)
             
-            img = Image.new("RGBA", (self.size, self.size), self.bg_color)
+            img = Image.new("L", (self.size, self.size), 0)
             draw = ImageDraw.Draw(img)
             
             # Calculate position (left-aligned for typing effect)
@@ -40,17 +40,17 @@ class TypingEffect(BaseEffect):
             x = (self.size - (full_bbox[2] - full_bbox[0])) // 2 - full_bbox[0]
             y = (self.size - text_height) // 2 - text_bbox[1]
             
-            draw.text((x, y), display_text, font=self.font, fill=self.text_color)
+            draw.text((x, y), display_text, font=self.font, fill=255)
             
             # Add cursor blink
             if i < actual_frames - 1:
                 cursor_x = x + text_width
-                draw.text((cursor_x, y), "|", font=self.font, fill=self.text_color)
+                draw.text((cursor_x, y), "|", font=self.font, fill=255)
             
             frames.append(img)
         
         # Add final frame without cursor
-        final_frame = self.create_frame()
+        final_frame = self.create_coverage_frame()
         frames.append(final_frame)
         
         return frames
@@ -8,45 +8,44 @@ from .base_effect import BaseEffect
 class WaveEffect(BaseEffect):
     """Wave effect - each character moves up and down in a wave pattern."""
     
+    wave_amplitude = 8  # Maximum vertical displacement
+    
     def generate_frames(self) -> List[Image.Image]:
         """Generate frames with wave motion for each character."""
-        frames = []
+        # Calculate starting x position to center text
+        total_width = self._get_total_text_width()
+        start_x = (self.size - total_width) // 2
         
-        wave_amplitude = 8  # Maximum vertical displacement
+        return self.render_frames(lambda frame_idx: self._render_frame(frame_idx, start_x))
+    
+    def _render_frame(self, frame_idx: int, start_x: int) -> Image.Image:
+        """Draw one frame, each character at its wave offset."""
+        img = Image.new("L", (self.size, self.size), 0)
+        draw = ImageDraw.Draw(img)
         
-        for frame_idx in range(self.frame_count):
-            img = Image.new("RGBA", (self.size, self.size), self.bg_color)
-            draw = ImageDraw.Draw(img)
+        # Draw each character with wave offset
+        current_x = start_x
+        for char_idx, char in enumerate(self.text):
+            if char == "\n":
+                continue
+            
+            # Calculate wave phase for this character
+            phase = (2 * math.pi * frame_idx / self.frame_count) + (char_idx * 0.5)
+            y_offset = int(math.sin(phase) * self.wave_amplitude)
             
-            # Calculate starting x position to center text
-            total_width = self._get_total_text_width()
-            start_x = (self.size - total_width) // 2
+            # Get character bounding box
+            char_bbox = draw.textbbox((0, 0), char, font=self.font)
+            char_width = char_bbox[2] - char_bbox[0]
+            char_height = char_bbox[3] - char_bbox[1]
             
-            # Draw each character with wave offset
-            current_x = start_x
-            for char_idx, char in enumerate(self.text):
-                if char == "\n":
-                    continue
-                    
-                # Calculate wave phase for this character
-                phase = (2 * math.pi * frame_idx / self.frame_count) + (char_idx * 0.5)
-                y_offset = int(math.sin(phase) * wave_amplitude)
-                
-                # Get character bounding box
-                char_bbox = draw.textbbox((0, 0), char, font=self.font)
-                char_width = char_bbox[2] - char_bbox[0]
-                char_height = char_bbox[3] - char_bbox[1]
-                
-                # Calculate y position (centered + wave offset)
-                # Subtract char_bbox[1] to account for top offset
-                y = (self.size - char_height) // 2 - char_bbox[1] + y_offset
-                
-                draw.text((current_x, y), char, font=self.font, fill=self.text_color)
-                current_x += char_width
+            # Calculate y position (centered + wave offset)
+            # Subtract char_bbox[1] to account for top offset
+            y = (self.size - char_height) // 2 - char_bbox[1] + y_offset
             
-            frames.append(img)
+            draw.text((current_x, y), char, font=self.font, fill=255)
+            current_x += char_width
         
-        return frames
+        return img
     
     def _get_total_text_width(self) -> int:
         """Calculate total width of text (without newlines)."""
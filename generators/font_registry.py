@@ -0,0 +1,150 @@
+"""
+Process-wide font registry.
+Shares loaded FreeType faces across requests with a bounded LRU cache.
+"""
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from PIL import ImageFont
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class FontRegistry:
+    """Thread-safe LRU cache of fonts keyed by (font path, size)."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Initialize registry.
+
+        Args:
+            max_entries: Maximum number of (font, size) faces kept open
+        """
+        self.max_entries = max_entries or Config.FONT_CACHE_SIZE
+        self._fonts: "OrderedDict[Tuple[str, int], ImageFont.FreeTypeFont]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve_path(self, font_name: str) -> str:
+        """
+        Resolve a font identifier to its file path.
+
+        Args:
+            font_name: Font identifier (e.g., "nanumgothic")
+
+        Returns:
+            Absolute path to the font file (default font if unknown)
+        """
+        font_filename = Config.AVAILABLE_FONTS.get(
+            font_name.lower(),
+            Config.DEFAULT_FONT
+        )
+        return os.path.join(Config.FONTS_DIR, font_filename)
+
+    def get_font(self, font_name: str, size: int) -> ImageFont.FreeTypeFont:
+        """
+        Get a font by identifier.
+
+        Args:
+            font_name: Font identifier (e.g., "nanumgothic")
+            size: Font size in pixels
+
+        Returns:
+            PIL ImageFont object
+        """
+        return self.get_font_by_path(self.resolve_path(font_name), size)
+
+    def get_font_by_path(self, font_path: str, size: int) -> ImageFont.FreeTypeFont:
+        """
+        Get a font by file path.
+
+        Args:
+            font_path: Path to a TrueType/OpenType file
+            size: Font size in pixels
+
+        Returns:
+            PIL ImageFont object (default bitmap font if loading fails)
+        """
+        key = (font_path, size)
+
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                self.hits += 1
+                return font
+            self.misses += 1
+
+        # Load outside the lock so a slow face does not block other lookups
+        font = self._load(font_path, size)
+
+        with self._lock:
+            self._fonts[key] = font
+            self._fonts.move_to_end(key)
+            while len(self._fonts) > self.max_entries:
+                self._fonts.popitem(last=False)
+
+        return font
+
+    def _load(self, font_path: str, size: int) -> ImageFont.FreeTypeFont:
+        """Open a font face from disk."""
+        try:
+            return ImageFont.truetype(font_path, size)
+        except (OSError, IOError):
+            logger.warning(f"Failed to load font {font_path} ({size}px), using default font")
+            return ImageFont.load_default()
+
+    def preload(
+        self,
+        font_names: Optional[Iterable[str]] = None,
+        sizes: Optional[Iterable[int]] = None,
+    ) -> int:
+        """
+        Load fonts ahead of the first request.
+
+        Args:
+            font_names: Font identifiers to load (default: all configured fonts)
+            sizes: Sizes to load for each font (default: configured default size)
+
+        Returns:
+            Number of faces loaded
+        """
+        font_names = list(font_names or Config.AVAILABLE_FONTS.keys())
+        sizes = list(sizes or [Config.DEFAULT_FONT_SIZE])
+
+        loaded = 0
+        for font_name in font_names:
+            for size in sizes:
+                self.get_font(font_name, size)
+                loaded += 1
+
+        logger.info(f"Preloaded {loaded} font faces ({len(font_names)} fonts)")
+        return loaded
+
+    def stats(self) -> Dict[str, float]:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._fonts),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def clear(self):
+        """Drop all cached faces and reset counters."""
+        with self._lock:
+            self._fonts.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Shared registry used by all renderers in this process
+font_registry = FontRegistry()
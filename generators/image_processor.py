@@ -4,8 +4,9 @@ Supports resize modes similar to CSS object-fit: fill, cover, contain.
 """
 import io
 import logging
-from typing import Tuple, Optional
-from PIL import Image
+import math
+from typing import Iterator, Optional, Tuple
+from PIL import Image, ImageSequence
 
 from config import Config
 
@@ -22,6 +23,17 @@ class ResizeMode:
 class ImageProcessor:
     """Handles image resizing and cropping for emoji generation."""
     
+    # Large downscales first reduce() by an integer factor while keeping at
+    # least this many times the output size, then finish with LANCZOS
+    REDUCING_GAP = 3.0
+    
+    # Modes resampled as they are and converted to RGBA afterwards
+    RESAMPLE_MODES = ("RGB", "RGBA", "L")
+    
+    # Animated input: frames shorter than the minimum play at the default (ms)
+    MIN_FRAME_DURATION = 20
+    DEFAULT_FRAME_DURATION = 100
+    
     def __init__(self, target_size: int = None):
         """
         Initialize processor.
@@ -40,6 +52,10 @@ class ImageProcessor:
         """
         Process uploaded image with specified resize mode.
         
+        Only the part of the image that ends up in the emoji is resampled,
+        JPEGs are decoded at a reduced scale when they are much larger than
+        the output, and the RGBA conversion happens after shrinking.
+        
         Args:
             image_data: Raw image bytes
             mode: Resize mode (fill, cover, contain)
@@ -48,15 +64,85 @@ class ImageProcessor:
         Returns:
             Processed PIL Image
         """
-        # Open image
+        # Open image (decoding is deferred until the resize)
         img = Image.open(io.BytesIO(image_data))
         
-        # Convert to RGBA for transparency support
-        if img.mode != "RGBA":
-            img = img.convert("RGBA")
-        
         logger.info(f"Processing image: original size {img.size}, mode={mode}")
         
+        return self._resize(img, mode, background)
+    
+    def process_frames(
+        self,
+        image_data: bytes,
+        mode: str = ResizeMode.COVER,
+        background: str = "transparent",
+        max_frames: Optional[int] = None,
+        max_duration: Optional[int] = None,
+    ) -> Iterator[Tuple[Image.Image, int]]:
+        """
+        Lazily process the frames of an animated GIF, APNG or WebP.
+        
+        Source frames are decoded one at a time and resized right away, so
+        only one full-size frame is held in memory. Animations with more
+        than max_frames frames keep every n-th frame, the dropped frames'
+        time going to the frame before them, and frames starting after
+        max_duration are cut off.
+        
+        Args:
+            image_data: Raw image bytes
+            mode: Resize mode (fill, cover, contain)
+            background: Background color for contain mode
+            max_frames: Frame budget (defaults to Config.ANIMATED_MAX_FRAMES)
+            max_duration: Duration budget in milliseconds
+                (defaults to Config.ANIMATED_MAX_DURATION)
+        
+        Yields:
+            Tuple of (processed frame, duration in milliseconds)
+        """
+        max_frames = max_frames or Config.ANIMATED_MAX_FRAMES
+        max_duration = max_duration or Config.ANIMATED_MAX_DURATION
+        
+        img = Image.open(io.BytesIO(image_data))
+        total = getattr(img, "n_frames", 1)
+        step = max(1, math.ceil(total / max_frames))
+        
+        logger.info(f"Processing animation: original size {img.size}, frames={total}, step={step}, mode={mode}")
+        
+        pending = None
+        elapsed = 0
+        for index, frame in enumerate(ImageSequence.Iterator(img)):
+            if elapsed >= max_duration:
+                break
+            
+            frame_duration = frame.info.get("duration") or 0
+            if frame_duration < self.MIN_FRAME_DURATION:
+                # Browsers show too short frames for 100ms
+                frame_duration = self.DEFAULT_FRAME_DURATION
+            frame_duration = min(frame_duration, max_duration - elapsed)
+            elapsed += frame_duration
+            
+            if index % step:
+                pending[1] += frame_duration
+                continue
+            
+            if pending is not None:
+                yield tuple(pending)
+            pending = [self._resize(frame, mode, background), frame_duration]
+        
+        if pending is not None:
+            yield tuple(pending)
+    
+    @staticmethod
+    def is_animated(image_data: bytes) -> bool:
+        """Check if image bytes hold more than one frame."""
+        try:
+            img = Image.open(io.BytesIO(image_data))
+        except OSError:
+            return False
+        return getattr(img, "is_animated", False)
+    
+    def _resize(self, img: Image.Image, mode: str, background: str) -> Image.Image:
+        """Resize an opened image or frame with the given resize mode."""
         if mode == ResizeMode.FILL:
             return self._resize_fill(img)
         elif mode == ResizeMode.COVER:
@@ -73,10 +159,7 @@ class ImageProcessor:
         Resize image to fill target size (may distort aspect ratio).
         Similar to CSS object-fit: fill.
         """
-        return img.resize(
-            (self.target_size, self.target_size),
-            Image.Resampling.LANCZOS
-        )
+        return self._resample(img, (self.target_size, self.target_size))
     
     def _resize_cover(self, img: Image.Image) -> Image.Image:
         """
@@ -89,10 +172,9 @@ class ImageProcessor:
         # Calculate scale factor to cover the target
         scale = max(target / width, target / height)
         
-        # Scale image
+        # Size of the whole image once scaled
         new_width = int(width * scale)
         new_height = int(height * scale)
-        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
         
         # Calculate crop box (center crop)
         left = (new_width - target) // 2
@@ -100,8 +182,11 @@ class ImageProcessor:
         right = left + target
         bottom = top + target
         
-        # Crop to target size
-        return img.crop((left, top, right, bottom))
+        # Resample only the cropped region, mapped back to source pixels
+        x_scale = width / new_width
+        y_scale = height / new_height
+        box = (left * x_scale, top * y_scale, right * x_scale, bottom * y_scale)
+        return self._resample(img, (target, target), box)
     
     def _resize_contain(
         self,
@@ -120,9 +205,9 @@ class ImageProcessor:
         scale = min(target / width, target / height)
         
         # Scale image
-        new_width = int(width * scale)
-        new_height = int(height * scale)
-        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        new_width = max(1, int(width * scale))
+        new_height = max(1, int(height * scale))
+        img = self._resample(img, (new_width, new_height))
         
         # Create background canvas
         bg_color = self._parse_background(background)
@@ -137,6 +222,51 @@ class ImageProcessor:
         
         return canvas
     
+    def _resample(
+        self,
+        img: Image.Image,
+        size: Tuple[int, int],
+        box: Optional[Tuple[float, float, float, float]] = None,
+    ) -> Image.Image:
+        """
+        Resample a region of a not yet decoded image to an RGBA image.
+        
+        Args:
+            img: Image opened with Image.open()
+            size: Output size
+            box: Source region in original pixel coordinates (default: whole image)
+        
+        Returns:
+            RGBA image of the given size
+        """
+        width, height = img.size
+        box = box or (0, 0, width, height)
+        
+        # JPEG: let the decoder scale down by 1/2 to 1/8 while the whole
+        # image still has REDUCING_GAP times the pixels the output needs
+        scale_x = size[0] / (box[2] - box[0])
+        scale_y = size[1] / (box[3] - box[1])
+        img.draft(None, (
+            math.ceil(width * scale_x * self.REDUCING_GAP),
+            math.ceil(height * scale_y * self.REDUCING_GAP),
+        ))
+        if img.size != (width, height):
+            x_ratio = img.size[0] / width
+            y_ratio = img.size[1] / height
+            box = (box[0] * x_ratio, box[1] * y_ratio, box[2] * x_ratio, box[3] * y_ratio)
+        
+        # Modes that resample like their RGBA conversion are converted after
+        # shrinking; palette images and the like have to be converted first
+        if img.mode not in self.RESAMPLE_MODES:
+            img = img.convert("RGBA")
+        
+        img = img.resize(size, Image.Resampling.LANCZOS, box=box, reducing_gap=self.REDUCING_GAP)
+        
+        # Convert to RGBA for transparency support
+        if img.mode != "RGBA":
+            img = img.convert("RGBA")
+        return img
+    
     def _parse_background(self, background: str) -> Tuple[int, int, int, int]:
         """Parse background color string to RGBA tuple."""
         if background == "transparent":
@@ -0,0 +1,292 @@
+"""
+Content-addressed cache of rendered emoji artifacts.
+Results are keyed by a hash of everything that affects the output, kept in a
+byte-bounded memory LRU and persisted to a size-capped directory on disk.
+The disk directory is shared by every process (e.g. the render workers); each
+one rescans it before evicting, so the cap holds for all of them together.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from .cache import LRUCache
+from .effects.gif_encoder import Encoded, budget_report
+
+logger = logging.getLogger(__name__)
+
+# Bump when rendering changes so old cached artifacts are not served
+RENDERER_VERSION = 4
+
+# (image bytes, file extension) per artifact; scroll renders several tiles.
+# Budget reports of GIF artifacts are kept next to them in REPORTS_FILE.
+Artifacts = List[Tuple[bytes, str]]
+REPORTS_FILE = "reports.json"
+
+# Eviction frees the disk tier down to this share of its limit, and a process
+# rescans the directory after writing this share of the limit itself
+DISK_SLACK = 0.1
+
+
+class RenderCache:
+    """Two-tier (memory + disk) cache of rendered artifacts."""
+    
+    def __init__(
+        self,
+        memory_bytes: Optional[int] = None,
+        disk_dir: Optional[str] = None,
+        disk_bytes: Optional[int] = None,
+    ):
+        """
+        Initialize cache.
+        
+        Args:
+            memory_bytes: Memory tier size limit (defaults to Config.RENDER_CACHE_MEMORY_MB)
+            disk_dir: Disk tier directory (defaults to Config.RENDER_CACHE_DIR)
+            disk_bytes: Disk tier size limit, 0 disables it
+                (defaults to Config.RENDER_CACHE_DISK_MB)
+        """
+        if memory_bytes is None:
+            memory_bytes = Config.RENDER_CACHE_MEMORY_MB * 1024 * 1024
+        if disk_bytes is None:
+            disk_bytes = Config.RENDER_CACHE_DISK_MB * 1024 * 1024
+        
+        self.memory = LRUCache(
+            max_entries=None,
+            max_bytes=memory_bytes,
+            sizeof=lambda artifacts: sum(len(data) for data, _ in artifacts),
+        )
+        self.disk_dir = disk_dir or Config.RENDER_CACHE_DIR
+        self.disk_bytes = disk_bytes
+        
+        # Disk entries (key -> size) in least recently used order, loaded lazily
+        self._disk_index: Optional["OrderedDict[str, int]"] = None
+        self._disk_total = 0
+        self._written_since_scan = 0
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_misses = 0
+    
+    @staticmethod
+    def make_key(kind: str, **params) -> str:
+        """
+        Build a cache key from everything that determines the output.
+        
+        Args:
+            kind: Render type (e.g. "text", "scroll", "image")
+            **params: JSON-serializable render parameters
+        
+        Returns:
+            Hex digest of the canonical parameters
+        """
+        canonical = json.dumps(
+            {"kind": kind, "version": RENDERER_VERSION, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Artifacts]:
+        """
+        Get cached artifacts, checking memory first and then disk.
+        
+        Args:
+            key: Key from make_key()
+        
+        Returns:
+            List of (image bytes, extension), or None on a miss
+        """
+        artifacts = self.memory.get(key)
+        if artifacts is not None:
+            return artifacts
+        
+        if not self.disk_bytes:
+            return None
+        
+        artifacts = self._read_disk(key)
+        with self._lock:
+            if artifacts is None:
+                self.disk_misses += 1
+                return None
+            self.disk_hits += 1
+        
+        self.memory.put(key, artifacts)
+        return artifacts
+    
+    def put(self, key: str, artifacts: Artifacts):
+        """
+        Store artifacts in both tiers.
+        
+        Args:
+            key: Key from make_key()
+            artifacts: List of (image bytes, extension)
+        """
+        artifacts = list(artifacts)
+        self.memory.put(key, artifacts)
+        
+        if self.disk_bytes:
+            try:
+                self._write_disk(key, artifacts)
+            except OSError as e:
+                logger.warning(f"Render cache write failed for {key}: {e}")
+    
+    def stats(self) -> Dict[str, object]:
+        """Return hit/miss counters for both tiers."""
+        memory = self.memory.stats()
+        with self._lock:
+            hits = memory["hits"] + self.disk_hits
+            total = memory["hits"] + memory["misses"]
+            return {
+                "hits": hits,
+                "misses": total - hits,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "memory": memory,
+                "disk": {
+                    "entries": len(self._disk_index or ()),
+                    "bytes": self._disk_total,
+                    "max_bytes": self.disk_bytes,
+                    "hits": self.disk_hits,
+                    "misses": self.disk_misses,
+                },
+            }
+    
+    def clear(self):
+        """Drop all entries from both tiers and reset counters."""
+        self.memory.clear()
+        with self._lock:
+            if os.path.isdir(self.disk_dir):
+                shutil.rmtree(self.disk_dir, ignore_errors=True)
+            self._disk_index = OrderedDict()
+            self._disk_total = 0
+            self._written_since_scan = 0
+            self.disk_hits = 0
+            self.disk_misses = 0
+    
+    def _entry_dir(self, key: str) -> str:
+        """Directory holding the artifacts of one entry."""
+        return os.path.join(self.disk_dir, key)
+    
+    def _load_index(self, rescan: bool = False):
+        """Scan the disk tier, oldest entries first (lock held)."""
+        if self._disk_index is not None and not rescan:
+            return
+        
+        # Entries with the same mtime keep the order this process knows
+        known = {key: rank for rank, key in enumerate(self._disk_index or ())}
+        entries = []
+        if os.path.isdir(self.disk_dir):
+            for key in os.listdir(self.disk_dir):
+                path = self._entry_dir(key)
+                if key.startswith(".") or not os.path.isdir(path):
+                    continue
+                try:
+                    size = self._entry_size(path)
+                    entries.append((os.path.getmtime(path), known.get(key, -1), key, size))
+                except OSError:
+                    # Evicted by another process while scanning
+                    continue
+        
+        self._disk_index = OrderedDict()
+        for _, _, key, size in sorted(entries):
+            self._disk_index[key] = size
+        self._disk_total = sum(self._disk_index.values())
+        self._written_since_scan = 0
+    
+    @staticmethod
+    def _entry_size(path: str) -> int:
+        """Total size of the files of one entry."""
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    
+    def _read_disk(self, key: str) -> Optional[Artifacts]:
+        """Read an entry from disk and mark it recently used."""
+        path = self._entry_dir(key)
+        with self._lock:
+            self._load_index()
+            if key not in self._disk_index:
+                # Possibly written by another process since the last scan
+                try:
+                    self._disk_index[key] = self._entry_size(path)
+                except OSError:
+                    return None
+                self._disk_total += self._disk_index[key]
+            self._disk_index.move_to_end(key)
+        
+        try:
+            names = [name for name in os.listdir(path) if name != REPORTS_FILE]
+            names.sort(key=lambda name: int(name.split(".")[0]))
+            artifacts = []
+            for name in names:
+                with open(os.path.join(path, name), "rb") as f:
+                    artifacts.append((f.read(), name.split(".", 1)[1]))
+            
+            reports_path = os.path.join(path, REPORTS_FILE)
+            if os.path.exists(reports_path):
+                with open(reports_path, encoding="utf-8") as f:
+                    reports = json.load(f)
+                artifacts = [Encoded(artifact, report) for artifact, report in zip(artifacts, reports)]
+            os.utime(path)
+        except (OSError, ValueError, IndexError) as e:
+            logger.warning(f"Render cache read failed for {key}: {e}")
+            return None
+        
+        return artifacts
+    
+    def _write_disk(self, key: str, artifacts: Artifacts):
+        """Write an entry to disk, then evict the oldest entries over the limit."""
+        size = sum(len(data) for data, _ in artifacts)
+        if size > self.disk_bytes:
+            return
+        
+        # Write to a temporary directory and rename, so readers never see
+        # a partially written entry
+        os.makedirs(self.disk_dir, exist_ok=True)
+        temp_path = os.path.join(self.disk_dir, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(temp_path)
+        for index, (data, ext) in enumerate(artifacts):
+            with open(os.path.join(temp_path, f"{index}.{ext}"), "wb") as f:
+                f.write(data)
+        
+        reports = [budget_report(artifact) for artifact in artifacts]
+        if any(reports):
+            with open(os.path.join(temp_path, REPORTS_FILE), "w", encoding="utf-8") as f:
+                json.dump(reports, f)
+        
+        with self._lock:
+            self._load_index()
+            try:
+                os.rename(temp_path, self._entry_dir(key))
+            except OSError:
+                # Already written by another request
+                shutil.rmtree(temp_path, ignore_errors=True)
+                return
+            
+            self._disk_index[key] = size
+            self._disk_total += size
+            self._written_since_scan += size
+            
+            # Other processes write to the same directory: count their
+            # entries too before deciding what to evict
+            if (
+                self._disk_total > self.disk_bytes
+                or self._written_since_scan > self.disk_bytes * DISK_SLACK
+            ):
+                self._load_index(rescan=True)
+            if self._disk_total <= self.disk_bytes:
+                return
+            
+            target = self.disk_bytes * (1 - DISK_SLACK)
+            while self._disk_total > target and self._disk_index:
+                evicted, evicted_size = self._disk_index.popitem(last=False)
+                shutil.rmtree(self._entry_dir(evicted), ignore_errors=True)
+                self._disk_total -= evicted_size
+
+
+# Process-wide cache used by EmojiGenerator
+render_cache = RenderCache()
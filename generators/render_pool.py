@@ -0,0 +1,359 @@
+"""
+Process pool that runs emoji rendering off the Slack listener threads.
+Rendering is CPU-bound PIL work that holds the GIL; in worker processes it no
+longer delays the threads that have to ack Slack within 3 seconds. Jobs wait
+in a bounded queue and are handed to the workers round-robin per user, so one
+user's batch cannot hold everyone else back. Jobs for the same source image or
+text always go to the same worker, whose in-process caches (processed images,
+glyphs) already hold it.
+"""
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# EmojiGenerator of the current worker process
+_worker_generator = None
+
+# Queue carrying ("progress", job token, done, total) and
+# ("stats", pid, cache stats) reports from the workers
+_progress_queue = None
+
+
+class RenderQueueFull(RuntimeError):
+    """Raised when a render job cannot be queued."""
+
+
+def _init_worker(progress_queue, cpus: int):
+    """Set up a worker process: open the fonts once and create its generator."""
+    global _worker_generator, _progress_queue
+    
+    _progress_queue = progress_queue
+    from .base import EmojiGenerator
+    from .effects.frame_pool import set_cpu_share
+    from .font_registry import font_registry
+    from .text_renderer import TextRenderer
+    
+    # The workers split the host's CPUs between their thread pools
+    set_cpu_share(cpus)
+    font_registry.preload(sizes=[Config.DEFAULT_FONT_SIZE, TextRenderer.REFERENCE_FONT_SIZE])
+    _worker_generator = EmojiGenerator()
+
+
+def _affinity_key(method: str, kwargs: dict) -> Optional[str]:
+    """Get the key whose jobs share a worker (None = any worker)."""
+    if kwargs.get("source_id"):
+        # processed_image_cache is keyed by the source file
+        return f"image:{kwargs['source_id']}"
+    if kwargs.get("text"):
+        # Glyph and render caches are keyed by the text and its font
+        return f"text:{kwargs.get('font_name', '')}:{kwargs['text']}"
+    return None
+
+
+def _run_job(method: str, kwargs: dict, token: Optional[str] = None):
+    """Run one EmojiGenerator method in a worker process."""
+    if token:
+        kwargs = dict(kwargs, progress=functools.partial(_report_progress, token))
+    try:
+        return getattr(_worker_generator, method)(**kwargs)
+    finally:
+        # The worker's caches are its own; the parent only sees these reports
+        _progress_queue.put(("stats", os.getpid(), _cache_stats()))
+
+
+def _report_progress(token: str, done: int, total: int):
+    """Send a job's progress to the parent process."""
+    _progress_queue.put(("progress", token, done, total))
+
+
+def _cache_stats() -> Dict[str, Any]:
+    """Get the stats of the caches of the current worker process."""
+    from .base import glyph_cache, processed_image_cache
+    from .effects.palette import palette_cache
+    from .font_registry import font_registry
+    from .render_cache import render_cache
+    
+    return {
+        "fonts": font_registry.stats(),
+        "palettes": palette_cache.stats(),
+        "renders": render_cache.stats(),
+        "glyphs": glyph_cache.stats(),
+        "processed_images": processed_image_cache.stats(),
+    }
+
+
+class RenderPool:
+    """Bounded, per-user fair queue in front of a render process pool."""
+    
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_per_user: Optional[int] = None,
+    ):
+        """
+        Initialize pool. Worker processes start with the first job.
+        
+        Args:
+            workers: Number of worker processes (defaults to Config.RENDER_WORKERS,
+                0 = number of CPUs)
+            max_queue: Jobs queued or running at most (defaults to Config.RENDER_QUEUE_SIZE)
+            max_per_user: Jobs one user may have queued or running
+                (defaults to Config.RENDER_QUEUE_PER_USER)
+        """
+        workers = workers if workers is not None else Config.RENDER_WORKERS
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue or Config.RENDER_QUEUE_SIZE
+        self.max_per_user = max_per_user or Config.RENDER_QUEUE_PER_USER
+        
+        # Waiting jobs per user; users take turns in this order
+        self._queues: "OrderedDict[str, Deque[Tuple[Future, str, dict, Optional[str]]]]" = OrderedDict()
+        self._user_jobs: Dict[str, int] = {}
+        self._jobs = 0
+        self._running = 0
+        # One single-process executor per worker, so jobs can be routed to a worker
+        self._executors: List[Optional[ProcessPoolExecutor]] = [None] * self.workers
+        self._busy = [False] * self.workers
+        self._progress_queue = None
+        self._progress_listener: Optional[threading.Thread] = None
+        self._progress_callbacks: Dict[str, Callable[[int, int], None]] = {}
+        # Latest cache stats reported by each worker process
+        self._worker_stats: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+    
+    def submit(
+        self,
+        user_id: str,
+        method: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+        **kwargs,
+    ) -> Future:
+        """
+        Queue an EmojiGenerator call without waiting for it.
+        
+        Args:
+            user_id: User the job is for (fairness and per-user limit)
+            method: EmojiGenerator method name (e.g. "generate")
+            progress: Receives the method's (done, total) progress reports,
+                called from a background thread of this process
+            **kwargs: Method arguments (must be picklable)
+        
+        Returns:
+            Future resolving to the method's return value
+        
+        Raises:
+            RenderQueueFull: If the queue or the user's share of it is full
+        """
+        future = Future()
+        with self._lock:
+            if self._jobs >= self.max_queue:
+                self.rejected += 1
+                raise RenderQueueFull("생성 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+            if self._user_jobs.get(user_id, 0) >= self.max_per_user:
+                self.rejected += 1
+                raise RenderQueueFull("진행 중인 생성 요청이 많습니다. 완료된 후 다시 시도해주세요.")
+            
+            token = None
+            if progress:
+                token = uuid.uuid4().hex
+                self._progress_callbacks[token] = progress
+            
+            self._queues.setdefault(user_id, deque()).append((future, method, kwargs, token))
+            self._user_jobs[user_id] = self._user_jobs.get(user_id, 0) + 1
+            self._jobs += 1
+            self._dispatch()
+        
+        return future
+    
+    def stats(self) -> Dict[str, int]:
+        """Return queue and worker counters."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queued": self._jobs - self._running,
+                "max_queue": self.max_queue,
+                "users": len(self._user_jobs),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+    
+    def worker_stats(self) -> List[Dict[str, Any]]:
+        """Return each worker process's cache stats as of its last finished job."""
+        with self._lock:
+            return [dict(stats, pid=pid) for pid, stats in sorted(self._worker_stats.items())]
+    
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes (queued jobs are cancelled)."""
+        with self._lock:
+            for user_id, queue in self._queues.items():
+                for future, _, _, token in queue:
+                    future.cancel()
+                    self._finish_job(user_id, token)
+            self._queues.clear()
+            self._worker_stats.clear()
+            executors, self._executors = self._executors, [None] * self.workers
+            progress_queue, self._progress_queue = self._progress_queue, None
+            listener, self._progress_listener = self._progress_listener, None
+        
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=wait)
+        if progress_queue is not None:
+            # Stop the progress listener before the queue is closed
+            progress_queue.put(None)
+            listener.join()
+            progress_queue.close()
+    
+    def _dispatch(self):
+        """
+        Hand queued jobs to free workers, one user at a time (lock held).
+        
+        A user's next job waits while its worker is busy; the other users'
+        jobs are handed out meanwhile.
+        """
+        dispatched = True
+        while dispatched and self._running < self.workers:
+            dispatched = False
+            for user_id, queue in self._queues.items():
+                future, method, kwargs, token = queue[0]
+                worker = self._free_worker(_affinity_key(method, kwargs))
+                if worker is None:
+                    continue
+                
+                queue.popleft()
+                if queue:
+                    # The user's next job waits until everyone else had a turn
+                    self._queues.move_to_end(user_id)
+                else:
+                    del self._queues[user_id]
+                dispatched = True
+                break
+            
+            if not dispatched:
+                return
+            if not future.set_running_or_notify_cancel():
+                self._finish_job(user_id, token)
+                continue
+            
+            self._running += 1
+            self._busy[worker] = True
+            try:
+                job = self._get_executor(worker).submit(_run_job, method, kwargs, token)
+            except Exception as e:
+                # Broken worker (e.g. it was killed): fail the job, start it over
+                logger.error(f"Render pool submit failed: {e}")
+                self._executors[worker] = None
+                self._complete(future, user_id, worker, token, None, e)
+                continue
+            job.add_done_callback(
+                lambda job, future=future, user_id=user_id, worker=worker, token=token: self._complete(
+                    future, user_id, worker, token, job, job.exception()
+                )
+            )
+    
+    def _free_worker(self, key: Optional[str]) -> Optional[int]:
+        """Get the worker a job with this affinity key runs on, if it is free (lock held)."""
+        if key is None:
+            return next((worker for worker, busy in enumerate(self._busy) if not busy), None)
+        worker = zlib.crc32(key.encode("utf-8")) % self.workers
+        return None if self._busy[worker] else worker
+    
+    def _complete(
+        self,
+        future: Future,
+        user_id: str,
+        worker: int,
+        token: Optional[str],
+        job: Optional[Future],
+        error: Optional[BaseException],
+    ):
+        """Pass a finished job's outcome on and start the next job."""
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(job.result())
+        
+        with self._lock:
+            self._running -= 1
+            self._busy[worker] = False
+            if isinstance(error, BrokenProcessPool):
+                # The worker died mid-job; its next job starts a new one
+                self._executors[worker] = None
+            if error is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+            self._finish_job(user_id, token)
+            self._dispatch()
+    
+    def _finish_job(self, user_id: str, token: Optional[str]):
+        """Release a job's place in the queue (lock held)."""
+        self._progress_callbacks.pop(token, None)
+        self._jobs -= 1
+        self._user_jobs[user_id] -= 1
+        if not self._user_jobs[user_id]:
+            del self._user_jobs[user_id]
+    
+    def _get_executor(self, worker: int) -> ProcessPoolExecutor:
+        """Start a worker process on first use (lock held)."""
+        if self._executors[worker] is None:
+            # Spawned workers do not inherit the Slack and Flask threads
+            context = multiprocessing.get_context("spawn")
+            if self._progress_queue is None:
+                self._progress_queue = context.Queue()
+                self._progress_listener = threading.Thread(
+                    target=self._listen_progress, args=(self._progress_queue,), daemon=True
+                )
+                self._progress_listener.start()
+            self._executors[worker] = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._progress_queue, (os.cpu_count() or 1) // self.workers),
+            )
+        return self._executors[worker]
+    
+    def _listen_progress(self, progress_queue):
+        """Hand worker progress reports to the submitters' callbacks and keep their stats."""
+        while True:
+            report = progress_queue.get()
+            if report is None:
+                return
+            
+            if report[0] == "stats":
+                _, pid, stats = report
+                with self._lock:
+                    self._worker_stats[pid] = stats
+                continue
+            
+            _, token, done, total = report
+            with self._lock:
+                callback = self._progress_callbacks.get(token)
+            if callback is None:
+                # Job already finished
+                continue
+            try:
+                callback(done, total)
+            except Exception as e:
+                logger.warning(f"Render progress callback failed: {e}")
+
+
+# Process-wide pool used by the Slack handlers
+render_pool = RenderPool()
@@ -1,19 +1,49 @@
-import os
 import logging
-from typing import Tuple, Optional
+from typing import Optional, Sequence, Tuple
 from PIL import Image, ImageDraw, ImageFont
 
 from config import Config
+from .cache import LRUCache
+from .font_registry import font_registry
 
 logger = logging.getLogger(__name__)
 
+# Shared 1x1 canvas for text measurement (textbbox never writes to it)
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
+# Solved font sizes keyed by (texts, font, mode, canvas, padding)
+_font_size_cache = LRUCache(max_entries=4096)
+
+
+def measure_text_bbox(
+    text: str,
+    font: ImageFont.FreeTypeFont
+) -> Tuple[int, int, int, int]:
+    """
+    Get the bounding box of text drawn at the origin.
+    
+    Args:
+        text: Text to measure
+        font: Font to use
+        
+    Returns:
+        Tuple of (left, top, right, bottom) offsets
+    """
+    return _MEASURE_DRAW.textbbox((0, 0), text, font=font)
+
 
 class TextRenderer:
     """Handles text rendering with fonts and styling."""
     
+    # Font size bounds and the size used to predict fitting sizes
+    MIN_FONT_SIZE = 8
+    MAX_FONT_SIZE = 128
+    REFERENCE_FONT_SIZE = 64
+    SOLVER_WALK_STEPS = 4
+    
     def __init__(self):
         self.config = Config
-        self._font_cache = {}
+        self.font_registry = font_registry
     
     def get_font(self, font_name: str, size: Optional[int] = None) -> ImageFont.FreeTypeFont:
         """
@@ -27,27 +57,9 @@ class TextRenderer:
             PIL ImageFont object
         """
         size = size or self.config.DEFAULT_FONT_SIZE
-        cache_key = (font_name, size)
         
-        if cache_key in self._font_cache:
-            return self._font_cache[cache_key]
-        
-        # Get font filename
-        font_filename = self.config.AVAILABLE_FONTS.get(
-            font_name.lower(),
-            self.config.DEFAULT_FONT
-        )
-        
-        font_path = os.path.join(self.config.FONTS_DIR, font_filename)
-        
-        try:
-            font = ImageFont.truetype(font_path, size)
-        except (OSError, IOError):
-            # Fallback to default font
-            font = ImageFont.load_default()
-        
-        self._font_cache[cache_key] = font
-        return font
+        # Faces are shared process-wide so each (font, size) is opened once
+        return self.font_registry.get_font(font_name, size)
     
     def get_text_size(
         self,
@@ -64,11 +76,7 @@ class TextRenderer:
         Returns:
             Tuple of (width, height)
         """
-        # Create a temporary image for measurement
-        temp_img = Image.new("RGBA", (1, 1))
-        draw = ImageDraw.Draw(temp_img)
-        
-        bbox = draw.textbbox((0, 0), text, font=font)
+        bbox = measure_text_bbox(text, font)
         width = bbox[2] - bbox[0]
         height = bbox[3] - bbox[1]
         
@@ -150,24 +158,9 @@ class TextRenderer:
             Optimal font size
         """
         target_size = max_size - (padding * 2)
-        
-        # Binary search for optimal size
-        min_font = 8
-        max_font = 128
-        optimal_size = min_font
-        
-        while min_font <= max_font:
-            mid = (min_font + max_font) // 2
-            font = self.get_font(font_name, mid)
-            width, height = self.get_text_size(text, font)
-            
-            if width <= target_size and height <= target_size:
-                optimal_size = mid
-                min_font = mid + 1
-            else:
-                max_font = mid - 1
-        
-        return optimal_size
+        return self._solve_font_size(
+            (text,), font_name, target_size, target_size, ("auto", max_size, padding)
+        )
     
     def calculate_font_size_for_height(
         self,
@@ -189,20 +182,125 @@ class TextRenderer:
             Optimal font size
         """
         target_height = max_height - (padding * 2)
+        return self._solve_font_size(
+            (text,), font_name, None, target_height, ("height", max_height, padding)
+        )
+    
+    def calculate_shared_font_size(
+        self,
+        texts: Sequence[str],
+        font_name: str,
+        max_size: int,
+        padding: int = 10,
+    ) -> int:
+        """
+        Calculate one font size at which every text fits the canvas.
+        
+        Used to render several texts (e.g. split characters) at a uniform
+        size. The texts are measured together against the union of their
+        boxes, so this is a single search rather than one per text.
+        
+        Args:
+            texts: Texts rendered separately on canvases of the same size
+            font_name: Font identifier
+            max_size: Maximum canvas size
+            padding: Padding from edges
+            
+        Returns:
+            Largest font size that fits all texts
+        """
+        target_size = max_size - (padding * 2)
+        # Order and duplicates do not change the answer
+        return self._solve_font_size(
+            tuple(sorted(set(texts))), font_name, target_size, target_size, ("auto", max_size, padding)
+        )
+    
+    def _solve_font_size(
+        self,
+        texts: Tuple[str, ...],
+        font_name: str,
+        target_width: Optional[int],
+        target_height: int,
+        mode: tuple,
+    ) -> int:
+        """
+        Find the largest font size at which every text box fits the target.
         
-        min_font = 8
-        max_font = 128
+        Glyph metrics scale almost linearly with the font size, so the text is
+        measured once at a reference size to predict the answer, which is then
+        confirmed by probing the predicted size and its neighbours. Only if the
+        prediction is far off does it fall back to a binary search over the
+        remaining range. Results are memoized process-wide.
+        
+        Args:
+            texts: Texts to render (each one must fit)
+            font_name: Font identifier
+            target_width: Maximum text width (None = height only)
+            target_height: Maximum text height
+            mode: Solver mode and canvas parameters, part of the cache key
+            
+        Returns:
+            Optimal font size
+        """
+        cache_key = (texts, font_name.lower()) + mode
+        cached = _font_size_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        def measure(font_size: int) -> Tuple[int, int]:
+            # Union of the text boxes: the widest width and the tallest height
+            font = self.get_font(font_name, font_size)
+            sizes = [self.get_text_size(text, font) for text in texts]
+            return max(size[0] for size in sizes), max(size[1] for size in sizes)
+        
+        def fits(font_size: int) -> bool:
+            width, height = measure(font_size)
+            if target_width is not None and width > target_width:
+                return False
+            return height <= target_height
+        
+        # Measure once at the reference size and scale linearly
+        ref_width, ref_height = measure(self.REFERENCE_FONT_SIZE)
+        
+        scales = []
+        if ref_height > 0:
+            scales.append(target_height / ref_height)
+        if target_width is not None and ref_width > 0:
+            scales.append(target_width / ref_width)
+        predicted = int(self.REFERENCE_FONT_SIZE * min(scales)) if scales else self.MAX_FONT_SIZE
+        predicted = max(self.MIN_FONT_SIZE, min(self.MAX_FONT_SIZE, predicted))
+        
+        # Confirm the prediction by walking a few sizes from it; hinting
+        # usually puts the answer within a couple of sizes of the estimate
+        min_font = self.MIN_FONT_SIZE
+        max_font = self.MAX_FONT_SIZE
         optimal_size = min_font
         
+        if fits(predicted):
+            optimal_size = predicted
+            size = predicted + 1
+            while size <= min(max_font, predicted + self.SOLVER_WALK_STEPS) and fits(size):
+                optimal_size = size
+                size += 1
+            min_font = size if size > predicted + self.SOLVER_WALK_STEPS else max_font + 1
+        else:
+            size = predicted - 1
+            while size >= max(min_font, predicted - self.SOLVER_WALK_STEPS) and not fits(size):
+                size -= 1
+            if size >= max(min_font, predicted - self.SOLVER_WALK_STEPS):
+                optimal_size = size
+                max_font = min_font - 1
+            else:
+                max_font = size
+        
+        # Prediction was far off: binary search what is left
         while min_font <= max_font:
             mid = (min_font + max_font) // 2
-            font = self.get_font(font_name, mid)
-            _, height = self.get_text_size(text, font)
-            
-            if height <= target_height:
+            if fits(mid):
                 optimal_size = mid
                 min_font = mid + 1
             else:
                 max_font = mid - 1
         
-        return optimal_size
\ No newline at end of file
+        _font_size_cache.put(cache_key, optimal_size)
+        return optimal_size
@@ -1,12 +1,15 @@
 """REST API endpoints."""
 
 import base64
+import json
 import logging
+import queue
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from ddtrace import tracer
 
-from generators import EmojiGenerator
+from config import Config
+from generators import EmojiGenerator, RenderQueueFull, budget_report, render_pool
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +41,7 @@ def api_generate():
             span.set_tag("emoji.effect", effect)
         
         generator = EmojiGenerator()
-        image_bytes, ext = generator.generate(
+        result = generator.generate(
             text=text,
             effect=effect,
             text_color=data.get("text_color", "#000000"),
@@ -46,6 +49,7 @@ def api_generate():
             font_name=data.get("font", "nanumgothic"),
             line_break_at=data.get("line_break_at", 0),
         )
+        image_bytes, ext = result
         
         logger.info(f"[API] 이모지 생성 완료 - format: {ext}, size: {len(image_bytes)} bytes")
         
@@ -57,8 +61,106 @@ def api_generate():
             "success": True,
             "image": image_base64,
             "format": ext,
+            "budget": budget_report(result),
         })
         
     except Exception as e:
         logger.error(f"[API] 이모지 생성 오류: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
+
+
+@api_bp.route("/api/generate/batch", methods=["POST"])
+@tracer.wrap(service="emoji-generator", resource="api.generate_batch")
+def api_generate_batch():
+    """
+    REST API endpoint for generating many emojis in one request.
+    
+    Takes {"items": [...]} (or a bare list) of /api/generate request bodies
+    and streams one NDJSON line per item as soon as it is rendered:
+    {"index", "success", "format", "size", "image", "budget"} or {"index", "success", "error"}.
+    Items are queued on the render pool a few at a time under the client's
+    address; an item the queue rejects gets an error line. Rendering stops
+    when the client disconnects.
+    """
+    data = request.get_json(silent=True)
+    items = data.get("items") if isinstance(data, dict) else data
+    
+    if not isinstance(items, list) or not items:
+        logger.warning("[API] 잘못된 배치 요청 - items 누락")
+        return jsonify({"error": "items must be a non-empty list"}), 400
+    if len(items) > Config.API_BATCH_MAX_ITEMS:
+        logger.warning(f"[API] 배치 크기 초과 - {len(items)}개")
+        return jsonify({"error": f"at most {Config.API_BATCH_MAX_ITEMS} items per batch"}), 400
+    
+    logger.info(f"[API] /api/generate/batch 요청 수신 - IP: {request.remote_addr}, items: {len(items)}")
+    
+    span = tracer.current_span()
+    if span:
+        span.set_tag("emoji.batch_size", len(items))
+    
+    # Items render on the render pool, so API clients queue alongside the Slack users
+    client = f"api:{request.remote_addr}"
+    window = min(Config.API_BATCH_WORKERS or render_pool.max_per_user, render_pool.max_per_user)
+    
+    def line(index, **fields):
+        return json.dumps(dict(index=index, **fields), ensure_ascii=False) + "\n"
+    
+    def stream():
+        finished = queue.Queue()
+        pending = {}
+        next_index = 0
+        try:
+            while True:
+                # Keep at most `window` items queued or rendering
+                while len(pending) < window and next_index < len(items):
+                    index, item = next_index, items[next_index]
+                    next_index += 1
+                    if not isinstance(item, dict):
+                        yield line(index, success=False, error="item must be an object")
+                        continue
+                    try:
+                        future = render_pool.submit(
+                            client,
+                            "generate",
+                            text=item.get("text"),
+                            effect=item.get("effect", "none"),
+                            text_color=item.get("text_color", "#000000"),
+                            background=item.get("background", "transparent"),
+                            font_name=item.get("font", "nanumgothic"),
+                            line_break_at=item.get("line_break_at", 0),
+                        )
+                    except RenderQueueFull as e:
+                        yield line(index, success=False, error=str(e))
+                        continue
+                    pending[future] = index
+                    future.add_done_callback(finished.put)
+                
+                if not pending:
+                    break
+                
+                future = finished.get()
+                index = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"[API] 배치 항목 {index} 생성 실패: {e}")
+                    yield line(index, success=False, error=str(e))
+                    continue
+                
+                image_bytes, ext = result
+                yield line(
+                    index,
+                    success=True,
+                    format=ext,
+                    size=len(image_bytes),
+                    image=base64.b64encode(image_bytes).decode("utf-8"),
+                    budget=budget_report(result),
+                )
+            
+            logger.info(f"[API] 배치 응답 완료 - {len(items)}개")
+        finally:
+            # Client gone (or done): drop the items that have not started rendering
+            for future in pending:
+                future.cancel()
+    
+    return Response(stream_with_context(stream()), mimetype="application/x-ndjson")
@@ -5,6 +5,10 @@ import logging
 from flask import Blueprint, jsonify, request
 
 from config import Config
+from generators import font_registry, render_cache, render_pool
+from generators.base import glyph_cache, processed_image_cache
+from generators.effects.palette import palette_cache
+from utils.download import download_cache
 
 logger = logging.getLogger(__name__)
 
@@ -18,5 +22,19 @@ def health_check():
     return jsonify({
         "status": "healthy",
         "service": Config.DD_SERVICE,
-        "mode": "socket" if Config.USE_SOCKET_MODE else "http"
+        "mode": "socket" if Config.USE_SOCKET_MODE else "http",
+        "caches": {
+            # This process: API renders and Slack downloads
+            "api_process": {
+                "fonts": font_registry.stats(),
+                "palettes": palette_cache.stats(),
+                "renders": render_cache.stats(),
+                "glyphs": glyph_cache.stats(),
+                "processed_images": processed_image_cache.stats(),
+                "downloads": download_cache.stats(),
+            },
+            # Slack renders, one entry per render pool worker process
+            "render_workers": render_pool.worker_stats(),
+        },
+        "render_pool": render_pool.stats(),
     })
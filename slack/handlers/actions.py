@@ -8,10 +8,11 @@ from ddtrace import tracer
 from slack_sdk import WebClient
 
 from config import Config
-from generators import EmojiGenerator
+from generators import split_chars
+from slack.jobs import MAX_SPLIT_CHARS, job_worker
 from slack.views import build_image_emoji_modal
 from slack.emoji_uploader import EmojiUploader
-from utils import upload_with_retry, sanitize_filename
+from utils import upload_with_retry, sanitize_filename, load_artifacts
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,7 @@ def register(app):
             file_id = data["file_id"]
             file_url = data["file_url"]
             channel_id = data["channel_id"]
+            thumbs = data.get("thumbs", [])
         except (json.JSONDecodeError, KeyError) as e:
             logger.error(f"[ACTION] 잘못된 value 형식: {value}, error: {e}")
             return
@@ -41,15 +43,22 @@ def register(app):
         logger.info(f"[ACTION] 이미지 이모지 생성 버튼 클릭 - user: {user_id}, file: {file_id}")
         
         try:
-            modal = build_image_emoji_modal(channel_id, file_id, file_url)
+            modal = build_image_emoji_modal(channel_id, file_id, file_url, thumbs)
             client.views_open(trigger_id=trigger_id, view=modal)
         except Exception as e:
             logger.error(f"[ACTION] 모달 열기 실패: {e}")
 
     @app.action("share_emoji")
     @tracer.wrap(service="emoji-generator", resource="action.share")
-    def handle_share_emoji(ack, body, client):
-        """Handle share emoji button click (legacy)."""
+    def handle_share_emoji(ack, body, client, respond):
+        """
+        Handle share emoji button click.
+        
+        Uploads the artifact stored under the payload's artifact_id (see
+        build_share_blocks). If the artifact is missing (legacy buttons or
+        eviction), a job regenerates it from the payload options and posts
+        it, so the listener never waits for a render.
+        """
         ack()
         
         user_id = body["user"]["id"]
@@ -63,6 +72,7 @@ def register(app):
             font = data.get("font", "nanumgothic")
             background = data.get("background", "transparent")
             text_color = data.get("text_color", "#000000")
+            artifact_id = data.get("artifact_id")
         except (json.JSONDecodeError, KeyError) as e:
             logger.error(f"[SHARE] 잘못된 value 형식: {value}, error: {e}")
             return
@@ -72,19 +82,33 @@ def register(app):
         try:
             bot_client = WebClient(token=Config.SLACK_BOT_TOKEN)
             
-            # Re-generate and send to channel with user's options
-            generator = EmojiGenerator()
+            artifacts = load_artifacts(artifact_id)
+            if artifacts is None:
+                # Re-generate with user's options
+                logger.info(f"[SHARE] 저장된 결과 없음, 다시 생성 - artifact: {artifact_id}")
+                job_id = job_worker.enqueue(
+                    user_id,
+                    body.get("team", {}).get("id"),
+                    channel_id,
+                    "text",
+                    {
+                        "text": text,
+                        "effect": effect,
+                        "text_color": text_color,
+                        "background": background,
+                        "font": font,
+                        "shared": True,
+                    },
+                )
+                if job_id is not None:
+                    respond(replace_original=True, text="⏳ 다시 생성해서 채널에 공유합니다.")
+                return
+            
+            file_base = sanitize_filename(text)
             
             if effect == "scroll":
-                tiles = generator.generate_scroll_tiles(
-                    text=text,
-                    text_color=text_color,
-                    background=background,
-                    font_name=font,
-                )
-                file_base = sanitize_filename(text)
                 file_uploads = []
-                for image_bytes, ext, tile_idx in tiles:
+                for tile_idx, (image_bytes, ext) in enumerate(artifacts):
                     filename = f"{file_base}_{tile_idx + 1}.{ext}"
                     file_uploads.append({
                         "content": image_bytes,
@@ -94,23 +118,12 @@ def register(app):
                     bot_client,
                     file_uploads=file_uploads,
                     channel=channel_id,
-                    initial_comment=f"<@{user_id}>님이 생성한 스크롤 이모지입니다! (총 {len(tiles)}개)",
+                    initial_comment=f"<@{user_id}>님이 생성한 스크롤 이모지입니다! (총 {len(artifacts)}개)",
                 )
             elif effect == "split":
                 # 글자별 생성
-                chars = list(text)
-                file_base = sanitize_filename(text)
                 file_uploads = []
-                for idx, char in enumerate(chars[:20]):
-                    if char.isspace():
-                        continue
-                    image_bytes, ext = generator.generate(
-                        text=char,
-                        effect="none",
-                        text_color=text_color,
-                        background=background,
-                        font_name=font,
-                    )
+                for char, (image_bytes, ext) in zip(split_chars(text, MAX_SPLIT_CHARS), artifacts):
                     filename = f"{file_base}_{char}.{ext}"
                     file_uploads.append({
                         "content": image_bytes,
@@ -123,13 +136,7 @@ def register(app):
                     initial_comment=f"<@{user_id}>님이 생성한 글자별 이모지입니다! (총 {len(file_uploads)}개)",
                 )
             else:
-                image_bytes, ext = generator.generate(
-                    text=text,
-                    effect=effect,
-                    text_color=text_color,
-                    background=background,
-                    font_name=font,
-                )
+                image_bytes, ext = artifacts[0]
                 uploader = EmojiUploader(client)
                 filename = uploader.generate_unique_filename(text, ext, effect)
                 
@@ -141,13 +148,9 @@ def register(app):
                     initial_comment=f"<@{user_id}>님이 생성한 이모지입니다!",
                 )
             
-            # Update original message
-            original_channel = body["channel"]["id"]
-            original_ts = body["message"]["ts"]
-            
-            client.chat_update(
-                channel=original_channel,
-                ts=original_ts,
+            # Update original message (the job's ephemeral share message)
+            respond(
+                replace_original=True,
                 text=f"✅ 채널에 공유되었습니다!",
                 blocks=[
                     {
@@ -161,3 +164,4 @@ def register(app):
             
         except Exception as e:
             logger.error(f"[SHARE] 공유 오류: {e}", exc_info=True)
+
@@ -5,6 +5,8 @@ import logging
 
 from ddtrace import tracer
 
+from utils import image_thumbnails
+
 logger = logging.getLogger(__name__)
 
 
@@ -62,6 +64,7 @@ def register(app):
                                 "value": json.dumps({
                                     "file_id": file_id,
                                     "file_url": file_url,
+                                    "thumbs": image_thumbnails(file_info),
                                     "channel_id": channel_id,
                                 }),
                                 "style": "primary",
@@ -3,33 +3,27 @@
 import json
 import logging
 
-import requests
 from ddtrace import tracer
-from slack_sdk import WebClient
 
-from config import Config
-from database import db
-from database.models import GenerationLog
-from generators import EmojiGenerator
-from slack.emoji_uploader import EmojiUploader
-from utils import upload_with_retry, sanitize_filename
+from slack.jobs import job_worker
+from utils import image_thumbnails
 
 logger = logging.getLogger(__name__)
 
 
-def _log_generation(user_id, team_id, text, effect):
-    """Log generation to database for analytics."""
-    try:
-        log = GenerationLog(
-            user_id=user_id,
-            team_id=team_id,
-            text=text[:100] if text else None,
-            effect=effect,
-        )
-        db.session.add(log)
-        db.session.commit()
-    except Exception as e:
-        logger.warning(f"Failed to log generation: {e}")
+def _enqueue(client, body, channel_id, kind, params):
+    """Queue a generation job; tell the user if that failed."""
+    user_id = body["user"]["id"]
+    job_id = job_worker.enqueue(user_id, body.get("team", {}).get("id"), channel_id, kind, params)
+    if job_id is None:
+        try:
+            client.chat_postEphemeral(
+                channel=channel_id,
+                user=user_id,
+                text="❌ 생성 요청을 접수하지 못했습니다. 잠시 후 다시 시도해주세요."
+            )
+        except:
+            pass
 
 
 def register(app):
@@ -48,6 +42,7 @@ def register(app):
             channel_id = metadata.get("channel_id", "")
             file_id = metadata.get("file_id", "")
             file_url = metadata.get("file_url", "")
+            thumbs = metadata.get("thumbs", [])
         except json.JSONDecodeError:
             logger.error("[MODAL] private_metadata 파싱 실패")
             return
@@ -67,6 +62,7 @@ def register(app):
             file_info = uploaded_files[0]
             file_id = file_info.get("id", "")
             file_url = file_info.get("url_private", "")
+            thumbs = image_thumbnails(file_info)
             logger.info(f"[MODAL] 모달에서 업로드된 파일 사용 - file_id: {file_id}")
         
         if not file_url:
@@ -87,81 +83,16 @@ def register(app):
         if background.lower() != "transparent" and not background.startswith("#"):
             background = "transparent"
         
-        try:
-            # Show loading message
-            try:
-                client.chat_postEphemeral(
-                    channel=channel_id,
-                    user=user_id,
-                    text="⏳ 이미지 처리 중입니다. 잠시만 기다려주세요."
-                )
-            except:
-                pass
-            
-            # Download the image file
-            headers = {"Authorization": f"Bearer {Config.SLACK_BOT_TOKEN}"}
-            response = requests.get(file_url, headers=headers)
-            
-            if response.status_code != 200:
-                raise ValueError(f"이미지 다운로드 실패: {response.status_code}")
-            
-            image_data = response.content
-            
-            # Generate emoji from image
-            generator = EmojiGenerator()
-            
-            if effect == "none":
-                image_bytes, ext = generator.generate_from_image(
-                    image_data=image_data,
-                    resize_mode=resize_mode,
-                    background=background,
-                )
-            else:
-                image_bytes, ext = generator.generate_from_image_with_effect(
-                    image_data=image_data,
-                    effect=effect,
-                    resize_mode=resize_mode,
-                    background=background,
-                )
-            
-            # Upload result
-            bot_client = WebClient(token=Config.SLACK_BOT_TOKEN)
-            
-            # Generate filename
-            mode_suffix = f"_{resize_mode}" if resize_mode != "cover" else ""
-            effect_suffix = f"_{effect}" if effect != "none" else ""
-            filename = f"image_emoji{mode_suffix}{effect_suffix}.{ext}"
-            
-            upload_with_retry(
-                bot_client,
-                content=image_bytes,
-                filename=filename,
-                channel=channel_id,
-                initial_comment=f"<@{user_id}>님이 생성한 이미지 이모지입니다!",
-            )
-            
-            # Suggest emoji name
-            emoji_name = f"custom_{file_id[:8]}" if file_id else "custom_emoji"
-            bot_client.chat_postEphemeral(
-                channel=channel_id,
-                user=user_id,
-                text=f"📋 등록 후 사용할 이름 예시:\n```:{emoji_name}:```"
-            )
-            
-            _log_generation(user_id, body.get("team", {}).get("id"), f"[image:{resize_mode}]", effect)
-            
-        except Exception as e:
-            logger.error(f"[MODAL] 이미지 이모지 생성 오류: {e}", exc_info=True)
-            try:
-                bot_client = WebClient(token=Config.SLACK_BOT_TOKEN)
-                bot_client.chat_postEphemeral(
-                    channel=channel_id,
-                    user=user_id,
-                    text=f"❌ 이미지 이모지 생성 중 오류가 발생했습니다: {str(e)}"
-                )
-            except:
-                pass
-
+        # Download, render and upload run in the job worker
+        _enqueue(client, body, channel_id, "image", {
+            "file_id": file_id,
+            "file_url": file_url,
+            "thumbs": thumbs,
+            "resize_mode": resize_mode,
+            "background": background,
+            "effect": effect,
+        })
+    
     @app.view("emoji_create_modal")
     @tracer.wrap(service="emoji-generator", resource="modal.create")
     def handle_emoji_modal_submit(ack, body, client, view):
@@ -199,151 +130,16 @@ def register(app):
         if background.lower() != "transparent" and not background.startswith("#"):
             background = "transparent"
         
-        try:
-            # Show loading message
-            try:
-                client.chat_postEphemeral(
-                    channel=channel_id,
-                    user=user_id,
-                    text="⏳ 생성 중입니다. 시간이 다소 소요될 수 있으니 잠시만 기다려주세요."
-                )
-            except:
-                pass
-            
-            generator = EmojiGenerator()
-            bot_client = WebClient(token=Config.SLACK_BOT_TOKEN)
-            
-            if effect == "scroll":
-                tiles = generator.generate_scroll_tiles(
-                    text=text,
-                    text_color=text_color,
-                    background=background,
-                    font_name=font,
-                )
-                
-                if not tiles:
-                    raise ValueError("스크롤 타일 생성 실패")
-                
-                # Generate all files first
-                file_base = sanitize_filename(text)
-                file_uploads = []
-                suggested_names = []
-                for image_bytes, ext, tile_idx in tiles:
-                    name = f"{file_base}_{tile_idx + 1}"
-                    suggested_names.append(name)
-                    filename = f"{name}.{ext}"
-                    file_uploads.append({
-                        "content": image_bytes,
-                        "filename": filename,
-                    })
-                
-                # Upload all at once with retry
-                upload_with_retry(
-                    bot_client,
-                    file_uploads=file_uploads,
-                    channel=channel_id,
-                    initial_comment=f"<@{user_id}>님이 생성한 스크롤 이모지입니다! (총 {len(tiles)}개)",
-                )
-                
-                # Show suggested names
-                emoji_display = " ".join([f":{name}:" for name in suggested_names])
-                bot_client.chat_postEphemeral(
-                    channel=channel_id,
-                    user=user_id,
-                    text=f"📋 등록 후 사용할 이름:\n```{emoji_display}```"
-                )
-                
-            elif effect == "split":
-                chars = list(text)
-                
-                if not chars:
-                    raise ValueError("텍스트가 비어있습니다")
-                
-                MAX_SPLIT_CHARS = 20
-                if len(chars) > MAX_SPLIT_CHARS:
-                    chars = chars[:MAX_SPLIT_CHARS]
-                
-                file_base = sanitize_filename(text)
-                file_uploads = []
-                suggested_names = []
-                
-                for idx, char in enumerate(chars):
-                    if char.isspace():
-                        continue
-                    
-                    image_bytes, ext = generator.generate(
-                        text=char,
-                        effect="none",
-                        text_color=text_color,
-                        background=background,
-                        font_name=font,
-                    )
-                    
-                    name = f"{file_base}_{char}"
-                    suggested_names.append(name)
-                    filename = f"{name}.{ext}"
-                    file_uploads.append({
-                        "content": image_bytes,
-                        "filename": filename,
-                    })
-                
-                upload_with_retry(
-                    bot_client,
-                    file_uploads=file_uploads,
-                    channel=channel_id,
-                    initial_comment=f"<@{user_id}>님이 생성한 글자별 이모지입니다! (총 {len(file_uploads)}개)",
-                )
-                
-                emoji_display = " ".join([f":{name}:" for name in suggested_names])
-                bot_client.chat_postEphemeral(
-                    channel=channel_id,
-                    user=user_id,
-                    text=f"📋 등록 후 사용할 이름:\n```{emoji_display}```"
-                )
-                
-            else:
-                image_bytes, ext = generator.generate(
-                    text=text,
-                    effect=effect,
-                    text_color=text_color,
-                    background=background,
-                    font_name=font,
-                )
-                
-                file_base = sanitize_filename(text)
-                if effect != "none":
-                    emoji_name = f"{file_base}_{effect}"
-                else:
-                    emoji_name = file_base
-                
-                filename = f"{emoji_name}.{ext}"
-                upload_with_retry(
-                    bot_client,
-                    content=image_bytes,
-                    filename=filename,
-                    channel=channel_id,
-                    initial_comment=f"<@{user_id}>님이 생성한 이모지입니다!",
-                )
-                
-                bot_client.chat_postEphemeral(
-                    channel=channel_id,
-                    user=user_id,
-                    text=f"📋 등록 후 사용할 이름:\n```:{emoji_name}:```"
-                )
-            
-            _log_generation(user_id, body.get("team", {}).get("id"), text, effect)
-            
-        except Exception as e:
-            logger.error(f"[MODAL] 이모지 생성 오류: {e}", exc_info=True)
-            try:
-                bot_client.chat_postEphemeral(
-                    channel=channel_id,
-                    user=user_id,
-                    text=f"❌ 이모지 생성 중 오류가 발생했습니다: {str(e)}"
-                )
-            except:
-                pass
-
+        # Rendering and upload run in the job worker, which reports progress
+        _enqueue(client, body, channel_id, "text", {
+            "text": text,
+            "effect": effect,
+            "font": font,
+            "text_color": text_color,
+            "background": background,
+            "suggest_names": True,
+        })
+    
     @app.view("slash_emoji_modal")
     @tracer.wrap(service="emoji-generator", resource="modal.create")
     def handle_slash_modal_submit(ack, body, client, view):
@@ -368,103 +164,10 @@ def register(app):
         if background.lower() != "transparent" and not background.startswith("#"):
             background = "transparent"
         
-        try:
-            generator = EmojiGenerator()
-            bot_client = WebClient(token=Config.SLACK_BOT_TOKEN)
-            
-            if effect == "scroll":
-                tiles = generator.generate_scroll_tiles(
-                    text=text,
-                    text_color=text_color,
-                    background=background,
-                    font_name=font,
-                )
-                
-                if not tiles:
-                    raise ValueError("스크롤 타일 생성 실패")
-                
-                # Generate all files first
-                file_base = sanitize_filename(text)
-                file_uploads = []
-                for image_bytes, ext, tile_idx in tiles:
-                    filename = f"{file_base}_{tile_idx + 1}.{ext}"
-                    file_uploads.append({
-                        "content": image_bytes,
-                        "filename": filename,
-                    })
-                
-                # Upload all at once with retry
-                upload_with_retry(
-                    bot_client,
-                    file_uploads=file_uploads,
-                    channel=channel_id,
-                    initial_comment=f"<@{user_id}>님이 생성한 스크롤 이모지입니다! (총 {len(tiles)}개)",
-                )
-            elif effect == "split":
-                # 글자별 생성: 각 글자마다 개별 이모지 생성
-                chars = list(text)
-                
-                if not chars:
-                    raise ValueError("텍스트가 비어있습니다")
-                
-                MAX_SPLIT_CHARS = 20
-                if len(chars) > MAX_SPLIT_CHARS:
-                    chars = chars[:MAX_SPLIT_CHARS]
-                
-                # Generate all files first
-                file_base = sanitize_filename(text)
-                file_uploads = []
-                for idx, char in enumerate(chars):
-                    if char.isspace():
-                        continue
-                    
-                    image_bytes, ext = generator.generate(
-                        text=char,
-                        effect="none",
-                        text_color=text_color,
-                        background=background,
-                        font_name=font,
-                    )
-                    
-                    filename = f"{file_base}_{char}.{ext}"
-                    file_uploads.append({
-                        "content": image_bytes,
-                        "filename": filename,
-                    })
-                
-                # Upload all at once with retry
-                upload_with_retry(
-                    bot_client,
-                    file_uploads=file_uploads,
-                    channel=channel_id,
-                    initial_comment=f"<@{user_id}>님이 생성한 글자별 이모지입니다! (총 {len(file_uploads)}개)",
-                )
-            else:
-                image_bytes, ext = generator.generate(
-                    text=text,
-                    effect=effect,
-                    text_color=text_color,
-                    background=background,
-                    font_name=font,
-                )
-                
-                uploader = EmojiUploader(client)
-                filename = uploader.generate_unique_filename(text, ext, effect)
-                
-                upload_with_retry(
-                    bot_client,
-                    content=image_bytes,
-                    filename=filename,
-                    channel=channel_id,
-                    initial_comment=f"<@{user_id}>님이 생성한 이모지입니다!",
-                )
-            
-            _log_generation(user_id, body.get("team", {}).get("id"), text, effect)
-            
-        except Exception as e:
-            logger.error(f"[MODAL] 이모지 생성 오류: {e}", exc_info=True)
-            bot_client.chat_postEphemeral(
-                channel=channel_id,
-                user=user_id,
-                text=f"이모지 생성 중 오류가 발생했습니다: {str(e)}"
-            )
+        _enqueue(client, body, channel_id, "text", {
+            "text": text,
+            "effect": effect,
+            "font": font,
+            "text_color": text_color,
+            "background": background,
+        })
@@ -0,0 +1,561 @@
+"""
+Background worker for emoji generation jobs.
+Modal submissions only queue a job; worker threads claim it from the
+database, render it in the render pool and keep a single channel message
+up to date with its progress. Because jobs live in the database, a restart
+picks queued jobs up again, and jobs cut off mid-run are retried or failed
+once their heartbeat goes stale.
+"""
+import concurrent.futures
+import contextlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Optional, Sequence, Tuple
+
+from slack_sdk import WebClient
+
+from config import Config
+from database import db, JobStore
+from database.models import GenerationJob, GenerationLog
+from generators import RenderQueueFull, budget_report, render_pool, was_reduced
+from slack.emoji_uploader import EmojiUploader
+from slack.views import build_share_blocks
+from utils import (
+    upload_with_retry,
+    sanitize_filename,
+    download_slack_file,
+    select_image_url,
+    store_artifacts,
+)
+
+logger = logging.getLogger(__name__)
+
+# Progress text per generator method, filled with the reported (done, total)
+PROGRESS_LABELS = {
+    "generate_scroll_tiles": "타일 {done}/{total} 인코딩 완료",
+    "generate_split": "글자 {done}/{total} 렌더링 완료",
+}
+
+MAX_SPLIT_CHARS = 20
+
+
+class JobLost(RuntimeError):
+    """Raised when a running job was taken from its worker (e.g. recovered as stale)."""
+
+
+class JobWorker:
+    """Runs queued generation jobs on background threads."""
+    
+    def __init__(self):
+        """Initialize worker. Call init_app() and start() before use."""
+        self.app = None
+        self.store = JobStore()
+        self._client: Optional[WebClient] = None
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._recover_lock = threading.Lock()
+        self._last_recovery = 0.0
+        self._runners = {
+            "text": self._run_text,
+            "image": self._run_image,
+            "workflow": self._run_workflow,
+        }
+    
+    def init_app(self, app):
+        """Bind the Flask app whose database the jobs are stored in."""
+        self.app = app
+    
+    @property
+    def client(self) -> WebClient:
+        """Bot client used for progress messages and uploads."""
+        if self._client is None:
+            self._client = WebClient(token=Config.SLACK_BOT_TOKEN)
+        return self._client
+    
+    def start(self, concurrency: Optional[int] = None):
+        """
+        Start the worker threads.
+        
+        Args:
+            concurrency: Jobs run at the same time (defaults to Config.JOB_CONCURRENCY)
+        """
+        if self._threads:
+            return
+        
+        concurrency = concurrency or Config.JOB_CONCURRENCY
+        host = f"{socket.gethostname()}:{os.getpid()}"
+        for index in range(concurrency):
+            thread = threading.Thread(
+                target=self._loop, args=(f"{host}:{index}",), daemon=True, name=f"job-worker-{index}"
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Job worker started with {concurrency} threads")
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker threads after their current job."""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._stopping.clear()
+    
+    def enqueue(
+        self,
+        user_id: str,
+        team_id: Optional[str],
+        channel_id: str,
+        kind: str,
+        params: dict,
+    ) -> Optional[int]:
+        """
+        Post a progress message and queue a generation job.
+        
+        Args:
+            user_id: Slack user ID the job is for
+            team_id: Slack team/workspace ID
+            channel_id: Channel the results are posted to ("" for workflow jobs,
+                which have no progress message)
+            kind: Job type ("text", "image" or "workflow")
+            params: Runner parameters (JSON serializable)
+        
+        Returns:
+            Job ID or None if the job could not be queued
+        """
+        message_ts = None
+        if channel_id:
+            try:
+                response = self.client.chat_postMessage(
+                    channel=channel_id,
+                    text=f"⏳ <@{user_id}>님의 이모지 생성 대기 중입니다.",
+                )
+                message_ts = response.get("ts")
+            except Exception as e:
+                logger.warning(f"[JOB] 진행 메시지 전송 실패: {e}")
+        
+        with self.app.app_context():
+            job_id = self.store.create(user_id, team_id, channel_id, kind, params, message_ts)
+        
+        if job_id is None:
+            self._update_message(channel_id, message_ts, "❌ 생성 요청을 접수하지 못했습니다. 다시 시도해주세요.")
+            return None
+        
+        self._wakeup.set()
+        return job_id
+    
+    def _loop(self, worker_id: str):
+        """Claim and run jobs until stopped."""
+        while not self._stopping.is_set():
+            try:
+                with self.app.app_context():
+                    self._recover()
+                    job = self.store.claim(worker_id)
+                    if job is not None:
+                        self._run(job)
+                        continue
+            except Exception as e:
+                logger.error(f"[JOB] 워커 오류: {e}", exc_info=True)
+            
+            if self._wakeup.wait(Config.JOB_POLL_SECONDS):
+                self._wakeup.clear()
+    
+    def _recover(self):
+        """Requeue or fail jobs of workers that died (at most every half stale period)."""
+        if not self._recover_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.monotonic()
+            if self._last_recovery and now - self._last_recovery < Config.JOB_STALE_SECONDS / 2:
+                return
+            self._last_recovery = now
+            
+            for job in self.store.recover_stale(Config.JOB_STALE_SECONDS, Config.JOB_MAX_ATTEMPTS):
+                self._update_message(
+                    job.channel_id, job.message_ts,
+                    f"❌ <@{job.user_id}>님의 이모지 생성이 중단되었습니다. 다시 시도해주세요.",
+                )
+        finally:
+            self._recover_lock.release()
+    
+    def _run(self, job: GenerationJob):
+        """Run one claimed job and report its outcome."""
+        logger.info(f"[JOB] {job.kind} 작업 {job.id} 시작 - user: {job.user_id}, 시도: {job.attempts}")
+        
+        # Every commit expires the job, and a reloaded worker_id names whoever
+        # holds the row now; updates are conditional on the claiming worker
+        job.claimed_by = job.worker_id
+        
+        try:
+            params = json.loads(job.params)
+            runner = self._runners[job.kind]
+            self._report(job, "생성 중입니다.")
+            file_count, note = runner(job, params)
+        except JobLost as e:
+            # Requeued or failed by recovery; whoever holds the job now reports it
+            logger.warning(f"[JOB] 작업 {job.id} 중단: {e}")
+            return
+        except Exception as e:
+            logger.error(f"[JOB] 작업 {job.id} 오류: {e}", exc_info=True)
+            error = f"이모지 생성 중 오류가 발생했습니다: {str(e)}"
+            if not self.store.fail(job.id, error, job.claimed_by):
+                logger.warning(f"[JOB] 작업 {job.id} 중단: 다른 워커가 이어받은 작업입니다")
+                return
+            self._update_message(job.channel_id, job.message_ts, f"❌ <@{job.user_id}>님의 {error}")
+            return
+        
+        if not self.store.finish(job.id, job.claimed_by):
+            logger.warning(f"[JOB] 작업 {job.id} 중단: 다른 워커가 이어받은 작업입니다")
+            return
+        self._update_message(
+            job.channel_id, job.message_ts, f"✅ <@{job.user_id}>님의 이모지 생성 완료! (총 {file_count}개){note}"
+        )
+        logger.info(f"[JOB] 작업 {job.id} 완료")
+    
+    def _run_text(self, job: GenerationJob, params: dict) -> Tuple[int, str]:
+        """Render and post a text emoji job; returns the files posted and a budget note."""
+        text = params["text"]
+        effect = params["effect"]
+        style = {
+            "text_color": params["text_color"],
+            "background": params["background"],
+            "font_name": params["font"],
+        }
+        # The emoji modal also suggests the names to register the files under
+        suggest_names = params.get("suggest_names", False)
+        # Jobs queued by a share button already had their share prompt
+        shared = params.get("shared", False)
+        file_base = sanitize_filename(text)
+        
+        if effect in ("scroll", "split"):
+            if effect == "scroll":
+                tiles = self._render(job, "generate_scroll_tiles", text=text, **style)
+                if not tiles:
+                    raise ValueError("스크롤 타일 생성 실패")
+                named = [(f"{file_base}_{tile_idx + 1}", image_bytes, ext) for image_bytes, ext, tile_idx in tiles]
+                results = tiles
+                comment = f"<@{job.user_id}>님이 생성한 스크롤 이모지입니다! (총 {len(tiles)}개)"
+            else:
+                chars = list(text)
+                if not chars:
+                    raise ValueError("텍스트가 비어있습니다")
+                
+                # Characters already rendered for anyone come from the glyph cache
+                glyphs = self._render(
+                    job, "generate_split",
+                    text="".join(chars[:MAX_SPLIT_CHARS]), max_chars=MAX_SPLIT_CHARS, **style
+                )
+                named = [(f"{file_base}_{char}", image_bytes, ext) for char, image_bytes, ext in glyphs]
+                results = glyphs
+                comment = f"<@{job.user_id}>님이 생성한 글자별 이모지입니다! (총 {len(named)}개)"
+            
+            # Kept for the share button, so sharing uploads the same files
+            artifact_id = store_artifacts([(image_bytes, ext) for _, image_bytes, ext in named])
+            
+            with self._heartbeat(job, f"{len(named)}개 파일 업로드 중"):
+                upload_with_retry(
+                    self.client,
+                    file_uploads=[
+                        {"content": image_bytes, "filename": f"{name}.{ext}"}
+                        for name, image_bytes, ext in named
+                    ],
+                    channel=job.channel_id,
+                    initial_comment=comment,
+                )
+            self._mark_uploaded(job)
+            names = [name for name, _, _ in named]
+        else:
+            result = self._render(job, "generate", text=text, effect=effect, **style)
+            image_bytes, ext = result
+            results = [result]
+            artifact_id = store_artifacts([(image_bytes, ext)])
+            
+            if suggest_names:
+                emoji_name = f"{file_base}_{effect}" if effect != "none" else file_base
+                filename = f"{emoji_name}.{ext}"
+            else:
+                filename = EmojiUploader(self.client).generate_unique_filename(text, ext, effect)
+            
+            with self._heartbeat(job, "업로드 중"):
+                upload_with_retry(
+                    self.client,
+                    content=image_bytes,
+                    filename=filename,
+                    channel=job.channel_id,
+                    initial_comment=f"<@{job.user_id}>님이 생성한 이모지입니다!",
+                )
+            self._mark_uploaded(job)
+            names = [filename.rsplit(".", 1)[0]]
+        
+        if suggest_names:
+            emoji_display = " ".join([f":{name}:" for name in names])
+            message = f"📋 등록 후 사용할 이름:\n```{emoji_display}```"
+        else:
+            message = "📢 생성한 이모지를 채널에 다시 공유할 수 있습니다."
+        if not shared:
+            self._post_ephemeral(
+                job,
+                message,
+                blocks=[
+                    {"type": "section", "text": {"type": "mrkdwn", "text": message}},
+                    *build_share_blocks(
+                        job.channel_id, artifact_id, text, effect,
+                        params["font"], params["background"], params["text_color"],
+                    ),
+                ],
+            )
+        
+        _log_generation(job.user_id, job.team_id, text, effect)
+        return len(names), _budget_note(results)
+    
+    def _run_image(self, job: GenerationJob, params: dict) -> Tuple[int, str]:
+        """Render and post an image emoji job; returns the files posted and a budget note."""
+        file_id = params["file_id"]
+        resize_mode = params["resize_mode"]
+        background = params["background"]
+        effect = params["effect"]
+        
+        # Download the smallest thumbnail that covers the emoji size
+        # (cached per file for re-submits)
+        download_url = select_image_url(params["file_url"], params.get("thumbs", []), resize_mode)
+        with self._heartbeat(job, "이미지 다운로드 중"):
+            image_data = download_slack_file(file_id, download_url)
+        
+        options = {
+            "image_data": image_data,
+            "resize_mode": resize_mode,
+            "background": background,
+            "source_id": file_id,
+        }
+        if effect == "none":
+            result = self._render(job, "generate_from_image", **options)
+        else:
+            result = self._render(job, "generate_from_image_with_effect", effect=effect, **options)
+        image_bytes, ext = result
+        
+        mode_suffix = f"_{resize_mode}" if resize_mode != "cover" else ""
+        effect_suffix = f"_{effect}" if effect != "none" else ""
+        filename = f"image_emoji{mode_suffix}{effect_suffix}.{ext}"
+        
+        with self._heartbeat(job, "업로드 중"):
+            upload_with_retry(
+                self.client,
+                content=image_bytes,
+                filename=filename,
+                channel=job.channel_id,
+                initial_comment=f"<@{job.user_id}>님이 생성한 이미지 이모지입니다!",
+            )
+        self._mark_uploaded(job)
+        
+        # Suggest emoji name
+        emoji_name = f"custom_{file_id[:8]}" if file_id else "custom_emoji"
+        self._post_ephemeral(job, f"📋 등록 후 사용할 이름 예시:\n```:{emoji_name}:```")
+        
+        _log_generation(job.user_id, job.team_id, f"[image:{resize_mode}]", effect)
+        return 1, _budget_note([result])
+    
+    def _run_workflow(self, job: GenerationJob, params: dict) -> Tuple[int, str]:
+        """Render a workflow step's emoji and complete the step with the uploaded file."""
+        execute_id = params["workflow_step_execute_id"]
+        text = params["text"]
+        effect = params["effect"]
+        
+        try:
+            result = self._render(
+                job, "generate",
+                text=text,
+                effect=effect,
+                text_color=params["text_color"],
+                background=params["background"],
+                font_name=params["font"],
+                line_break_at=params["line_break_at"],
+            )
+            image_bytes, ext = result
+            
+            # Create unique filename to avoid conflicts
+            filename = EmojiUploader(self.client).generate_unique_filename(text, ext, effect)
+            
+            with self._heartbeat(job, "업로드 중"):
+                response = upload_with_retry(
+                    self.client,
+                    content=image_bytes,
+                    filename=filename,
+                    title=f"{text} ({effect})",
+                )
+            self._mark_uploaded(job)
+        except JobLost:
+            # The step is completed by the job's next run
+            raise
+        except Exception as e:
+            try:
+                self.client.workflows_stepFailed(
+                    workflow_step_execute_id=execute_id,
+                    error={"message": f"이모지 생성 중 오류가 발생했습니다: {str(e)}"},
+                )
+            except Exception as notify_error:
+                logger.warning(f"[JOB] 워크플로 실패 알림 실패: {notify_error}")
+            raise
+        
+        file_info = response.get("file", {})
+        self.client.workflows_stepCompleted(
+            workflow_step_execute_id=execute_id,
+            outputs={
+                "emoji_url": file_info.get("url_private", ""),
+                "emoji_filename": filename,
+            },
+        )
+        return 1, _budget_note([result])
+    
+    def _render(self, job: GenerationJob, method: str, **kwargs):
+        """
+        Run a generator method in the render pool while reporting progress.
+        
+        The job's heartbeat is refreshed every Config.JOB_PROGRESS_SECONDS
+        while it waits; the message is only edited when the text changes.
+        
+        Args:
+            job: Running job
+            method: EmojiGenerator method name
+            **kwargs: Method arguments
+        
+        Returns:
+            The method's return value
+        """
+        latest = {}
+        progress = None
+        if method in PROGRESS_LABELS:
+            progress = lambda done, total: latest.update(done=done, total=total)
+        
+        while True:
+            try:
+                future = render_pool.submit(job.user_id, method, progress=progress, **kwargs)
+                break
+            except RenderQueueFull:
+                # Wait for a free slot instead of failing the job
+                self._report(job, "생성 대기 중입니다.")
+                if self._stopping.wait(Config.JOB_POLL_SECONDS):
+                    raise
+        
+        while True:
+            try:
+                return future.result(timeout=Config.JOB_PROGRESS_SECONDS)
+            except concurrent.futures.TimeoutError:
+                pass
+            
+            if latest:
+                self._report(job, PROGRESS_LABELS[method].format(**latest))
+            else:
+                self._report(job, "렌더링 중")
+    
+    def _report(self, job: GenerationJob, progress: str):
+        """
+        Store a job's progress and show it in its message if it changed.
+        
+        Raises:
+            JobLost: If the job is no longer running under this worker
+        """
+        changed = progress != job.progress
+        if not self.store.update_progress(job.id, progress, job.claimed_by):
+            raise JobLost(f"작업 {job.id}이(가) 더 이상 이 워커에서 실행 중이 아닙니다")
+        if changed:
+            self._update_message(job.channel_id, job.message_ts, f"⏳ <@{job.user_id}>님의 이모지 {progress}")
+    
+    @contextlib.contextmanager
+    def _heartbeat(self, job: GenerationJob, progress: str):
+        """
+        Report progress, then keep the job's heartbeat fresh while the block runs.
+        
+        Downloads and uploads can outlast Config.JOB_STALE_SECONDS; without
+        heartbeats the job would be recovered and its files posted twice.
+        
+        Raises:
+            JobLost: If the job was taken from this worker meanwhile
+        """
+        self._report(job, progress)
+        # Read in this thread; the ORM object belongs to its session
+        job_id, worker_id = job.id, job.claimed_by
+        done = threading.Event()
+        lost = threading.Event()
+        
+        def beat():
+            with self.app.app_context():
+                while not done.wait(Config.JOB_PROGRESS_SECONDS):
+                    if not self.store.update_progress(job_id, progress, worker_id):
+                        lost.set()
+                        return
+        
+        thread = threading.Thread(target=beat, daemon=True, name=f"job-heartbeat-{job_id}")
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+        if lost.is_set():
+            raise JobLost(f"작업 {job.id}이(가) 더 이상 이 워커에서 실행 중이 아닙니다")
+    
+    def _mark_uploaded(self, job: GenerationJob):
+        """
+        Record that a job's files were posted.
+        
+        Raises:
+            JobLost: If the job is no longer running under this worker
+        """
+        if not self.store.mark_uploaded(job.id, job.claimed_by):
+            raise JobLost(f"작업 {job.id}의 업로드를 기록하지 못했습니다")
+    
+    def _update_message(self, channel_id: str, message_ts: Optional[str], text: str):
+        """Edit a job's progress message, if it has one."""
+        if not message_ts:
+            return
+        try:
+            self.client.chat_update(channel=channel_id, ts=message_ts, text=text)
+        except Exception as e:
+            logger.warning(f"[JOB] 진행 메시지 업데이트 실패: {e}")
+    
+    def _post_ephemeral(self, job: GenerationJob, text: str, blocks: Optional[list] = None):
+        """Show a message only to the job's user."""
+        try:
+            self.client.chat_postEphemeral(channel=job.channel_id, user=job.user_id, text=text, blocks=blocks)
+        except Exception as e:
+            logger.warning(f"[JOB] 메시지 전송 실패: {e}")
+
+
+def _budget_note(results: Sequence[tuple]) -> str:
+    """Tell the user how results were reduced to fit the emoji size limit, if they were."""
+    reports = [budget_report(result) for result in results]
+    reduced = [report for report in reports if was_reduced(report)]
+    if not reduced:
+        return ""
+    
+    if any(not report["within_budget"] for report in reduced):
+        return f"\n⚠️ 최저 품질로도 {Config.EMOJI_MAX_KB}KB를 넘어 등록되지 않을 수 있습니다."
+    colors = min(report["palette_level"] for report in reduced)
+    step = max(report["frame_step"] for report in reduced)
+    frames = f", 프레임 1/{step}" if step > 1 else ""
+    return f"\n⚠️ {Config.EMOJI_MAX_KB}KB 제한에 맞추기 위해 품질을 낮췄습니다 (색상 {colors}개{frames})."
+
+
+def _log_generation(user_id, team_id, text, effect):
+    """Log generation to database for analytics."""
+    try:
+        log = GenerationLog(
+            user_id=user_id,
+            team_id=team_id or "",
+            text=text[:100] if text else None,
+            effect=effect,
+        )
+        db.session.add(log)
+        db.session.commit()
+    except Exception as e:
+        logger.warning(f"Failed to log generation: {e}")
+        db.session.rollback()
+
+
+# Process-wide worker used by the modal handlers
+job_worker = JobWorker()
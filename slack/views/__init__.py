@@ -3,11 +3,13 @@
 from .builders import (
     build_emoji_modal,
     build_image_emoji_modal,
+    build_share_blocks,
     get_default_state,
 )
 
 __all__ = [
     "build_emoji_modal",
     "build_image_emoji_modal",
+    "build_share_blocks",
     "get_default_state",
 ]
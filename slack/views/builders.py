@@ -14,7 +14,12 @@ def get_default_state():
     }
 
 
-def build_image_emoji_modal(channel_id: str, file_id: str = None, file_url: str = None) -> dict:
+def build_image_emoji_modal(
+    channel_id: str,
+    file_id: str = None,
+    file_url: str = None,
+    thumbs: list = None,
+) -> dict:
     """Build modal view for image emoji creation with file upload."""
     blocks = [
         {
@@ -129,6 +134,7 @@ def build_image_emoji_modal(channel_id: str, file_id: str = None, file_url: str
             "channel_id": channel_id,
             "file_id": file_id or "",
             "file_url": file_url or "",
+            "thumbs": thumbs or [],
         }),
         "title": {"type": "plain_text", "text": "이미지 이모지 만들기"},
         "submit": {"type": "plain_text", "text": "만들기"},
@@ -223,3 +229,41 @@ def build_emoji_modal(channel_id: str, initial_text: str = "") -> dict:
             },
         ],
     }
+
+
+def build_share_blocks(
+    channel_id: str,
+    artifact_id: str,
+    text: str,
+    effect: str,
+    font: str,
+    background: str,
+    text_color: str,
+) -> list:
+    """
+    Build message blocks with a button that shares a generated emoji.
+    
+    The button carries the id of the stored artifact so sharing uploads the
+    same bytes; the options are kept to regenerate it if it was evicted.
+    """
+    return [
+        {
+            "type": "actions",
+            "elements": [
+                {
+                    "type": "button",
+                    "text": {"type": "plain_text", "text": "📢 채널에 공유"},
+                    "action_id": "share_emoji",
+                    "value": json.dumps({
+                        "channel_id": channel_id,
+                        "artifact_id": artifact_id,
+                        "text": text,
+                        "effect": effect,
+                        "font": font,
+                        "background": background,
+                        "text_color": text_color,
+                    }),
+                }
+            ],
+        }
+    ]
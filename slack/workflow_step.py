@@ -1,9 +1,10 @@
 import logging
+import re
 from slack_bolt import App
 from slack_bolt.workflows.step import WorkflowStep
 
-from generators import EmojiGenerator
 from config import Config
+from slack.jobs import job_worker
 
 logger = logging.getLogger(__name__)
 
@@ -172,6 +173,24 @@ def edit_handler(ack, step, configure):
             },
             "optional": True
         },
+        {
+            "type": "input",
+            "block_id": "requester_input",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "requester",
+                "placeholder": {
+                    "type": "plain_text",
+                    "text": "워크플로를 실행한 사람 변수를 넣으세요"
+                },
+                "initial_value": inputs.get("requester", {}).get("value", "")
+            },
+            "label": {
+                "type": "plain_text",
+                "text": "요청자 (생성 요청 제한에 사용)"
+            },
+            "optional": True
+        },
     ]
     
     configure(blocks=blocks)
@@ -229,6 +248,7 @@ def save_handler(ack, view, update):
         "text_color": {"value": values["text_color_input"]["text_color"]["value"]},
         "font": {"value": values["font_input"]["font"]["selected_option"]["value"]},
         "line_break_at": {"value": values["line_break_input"]["line_break_at"]["value"] or "0"},
+        "requester": {"value": values["requester_input"]["requester"]["value"] or ""},
     }
     
     # Define outputs
@@ -249,10 +269,13 @@ def save_handler(ack, view, update):
     ack()
 
 
-def execute_handler(step, complete, fail, client):
+def execute_handler(step, body, fail):
     """
     Handle the workflow step execution.
     Called when the workflow runs and reaches this step.
+    
+    The emoji is rendered and uploaded by the job worker, which completes
+    the step once the file is posted; the listener only queues the job.
     """
     try:
         inputs = step["inputs"]
@@ -260,48 +283,43 @@ def execute_handler(step, complete, fail, client):
         # Extract input values
         text = inputs["text"]["value"]
         effect = inputs["effect"]["value"]
-        background = inputs["background"]["value"]
-        text_color = inputs["text_color"]["value"]
-        font = inputs["font"]["value"]
         line_break_at = int(inputs["line_break_at"]["value"])
+        user_id = _requester_id(step)
         
-        logger.info(f"Generating emoji: text='{text}', effect='{effect}'")
+        logger.info(f"Queueing emoji: text='{text}', effect='{effect}', user='{user_id}'")
         
-        # Generate emoji
-        generator = EmojiGenerator()
-        image_bytes, ext = generator.generate(
-            text=text,
-            effect=effect,
-            text_color=text_color,
-            background=background,
-            font_name=font,
-            line_break_at=line_break_at,
-        )
-        
-        # Create unique filename to avoid conflicts
-        from slack.emoji_uploader import EmojiUploader
-        uploader = EmojiUploader(client)
-        filename = uploader.generate_unique_filename(text, ext, effect)
-        
-        # Upload file to Slack
-        response = client.files_upload_v2(
-            content=image_bytes,
-            filename=filename,
-            title=f"{text} ({effect})",
+        job_id = job_worker.enqueue(
+            user_id,
+            body.get("team_id"),
+            "",
+            "workflow",
+            {
+                "workflow_step_execute_id": step["workflow_step_execute_id"],
+                "text": text,
+                "effect": effect,
+                "background": inputs["background"]["value"],
+                "text_color": inputs["text_color"]["value"],
+                "font": inputs["font"]["value"],
+                "line_break_at": line_break_at,
+            },
         )
-        
-        # Get file URL
-        file_info = response.get("file", {})
-        file_url = file_info.get("url_private", "")
-        
-        logger.info(f"Emoji generated successfully: {filename}")
-        
-        # Complete the step with outputs
-        complete(outputs={
-            "emoji_url": file_url,
-            "emoji_filename": filename,
-        })
-        
+        if job_id is None:
+            fail(error={"message": "생성 요청을 접수하지 못했습니다. 다시 시도해주세요."})
+    
     except Exception as e:
         logger.error(f"Error generating emoji: {e}", exc_info=True)
         fail(error={"message": f"이모지 생성 중 오류가 발생했습니다: {str(e)}"})
+
+
+def _requester_id(step) -> str:
+    """
+    Get the user a workflow run renders for (render queue limits are per user).
+    
+    The requester input holds a user variable such as "<@U123>"; steps saved
+    without one share a limit per workflow instead.
+    """
+    requester = step["inputs"].get("requester", {}).get("value") or ""
+    match = re.search(r"\b[UW][A-Z0-9]{6,}\b", requester)
+    if match:
+        return match.group(0)
+    return f"workflow:{step.get('workflow_id', '')}"
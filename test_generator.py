@@ -10,8 +10,43 @@ import sys
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from generators import EmojiGenerator
+# Render into a throwaway cache, not the app's (read by Config on import)
+import atexit
+import shutil
+import tempfile
+
+os.environ["RENDER_CACHE_DIR"] = tempfile.mkdtemp(prefix="render_cache-")
+atexit.register(shutil.rmtree, os.environ["RENDER_CACHE_DIR"], True)
+
+import base64
+import concurrent.futures
+import io
+import json
+import math
+import pickle
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from flask import Flask
+from PIL import Image, ImageChops, ImageDraw
+
+from generators import EmojiGenerator, RenderCache, RenderPool, RenderQueueFull, budget_report, was_reduced
+from generators.render_pool import _affinity_key
+from generators.base import glyph_cache
+from generators.effects import PartyEffect, ShakeEffect, get_effect
+from generators.effects.image_effects import PALETTE_LEVELS, _to_palette_frame, effect_frames
+from generators.effects import frame_pool, gif_encoder
+from generators.effects.gif_encoder import encode_gif, encode_within_budget, has_frame_writer
+from generators.effects.palette import ALPHA_THRESHOLD, coverage_palette, index_coverage
 from config import Config
+from database import db, GenerationJob, JobStore
+from routes.api import api_bp
+from slack import jobs
+from slack.handlers import actions
+from slack.jobs import JobWorker
+from utils import DownloadError, ImageDownloader, image_thumbnails, select_image_url
 
 
 def test_all_effects():
@@ -124,6 +159,993 @@ def test_colors():
             print(f"  [FAIL] {name:20} -> {e}")
 
 
+def test_coverage_mask_frames():
+    """Test that mask-composed frames match drawing the text directly."""
+    generator = EmojiGenerator()
+    
+    print("\nTesting coverage mask frames:")
+    print("-" * 50)
+    
+    for text, background in [("테스트", "transparent"), ("안녕\n하세요", "white"), ("Wg", "#33333380")]:
+        font = generator.text_renderer.get_font("nanumgothic", 90)
+        text_color = generator._parse_color("#FF5733")
+        bg_color = generator._parse_background(background)
+        effect = ShakeEffect(text=text, font=font, text_color=text_color, bg_color=bg_color)
+        
+        for x_offset, y_offset in [(0, 0), (4, -4), (-30, 20)]:
+            expected = Image.new("RGBA", (effect.size, effect.size), bg_color)
+            draw = ImageDraw.Draw(expected)
+            bbox = draw.textbbox((0, 0), text, font=font)
+            x = (effect.size - (bbox[2] - bbox[0])) // 2 - bbox[0] + x_offset
+            y = (effect.size - (bbox[3] - bbox[1])) // 2 - bbox[1] + y_offset
+            draw.text((x, y), text, font=font, fill=text_color)
+            
+            frame = effect.create_frame(x_offset=x_offset, y_offset=y_offset)
+            assert frame.tobytes() == expected.tobytes(), (text, background, x_offset, y_offset)
+        
+        print(f"  [OK] {text!r:20} on {background}")
+
+
+def test_delta_gif_frames():
+    """Test that delta-encoded GIFs decode to the original frames."""
+    print("\nTesting delta GIF frames:")
+    print("-" * 50)
+    
+    # Text that moves, disappears, comes back, then loops to the first frame
+    coverages = []
+    for box in [(10, 10, 30, 30), (12, 10, 32, 30), None, None, (40, 40, 60, 60)]:
+        coverage = Image.new("L", (64, 64), 0)
+        if box:
+            coverage.paste(255, box)
+        coverages.append(coverage)
+    
+    for background in [(0, 0, 0, 0), (255, 255, 255, 255)]:
+        lut, palettes, transparency = coverage_palette(
+            ((255, 87, 51, 255),), background, background[3] < 255
+        )
+        frames = [index_coverage(c, lut, palettes[0], transparency) for c in coverages]
+        
+        gif = Image.open(io.BytesIO(encode_gif(frames, 100)))
+        expected = [frames[0], frames[1], frames[2], frames[4]]
+        assert gif.n_frames == len(expected), background
+        
+        for index, frame in enumerate(expected):
+            gif.seek(index)
+            diff = ImageChops.difference(gif.convert("RGBA"), frame.convert("RGBA"))
+            assert diff.getbbox(alpha_only=False) is None, (background, index)
+        
+        # The repeated empty frame is folded into the previous duration
+        gif.seek(2)
+        assert gif.info["duration"] == 200, background
+        
+        print(f"  [OK] background {background}")
+    
+    # The encoder relies on private Pillow writers; fail loudly if they change
+    assert has_frame_writer(), "GifImagePlugin frame writers changed, check write_gif()"
+    
+    # Without them the same frames are saved through Image.save()
+    frame_writer = gif_encoder._FRAME_WRITER
+    gif_encoder._FRAME_WRITER = ("_write_frame_data_removed",)
+    try:
+        assert not has_frame_writer()
+        gif = Image.open(io.BytesIO(encode_gif(frames, 100)))
+    finally:
+        gif_encoder._FRAME_WRITER = frame_writer
+    
+    assert gif.n_frames == len(expected)
+    for index, frame in enumerate(expected):
+        gif.seek(index)
+        diff = ImageChops.difference(gif.convert("RGBA"), frame.convert("RGBA"))
+        assert diff.getbbox(alpha_only=False) is None, index
+    print("  [OK] Image.save() fallback")
+
+
+def test_party_palettes():
+    """Test that party frames (one palette per color) decode to per-frame RGBA renders."""
+    print("\nTesting party palettes:")
+    print("-" * 50)
+    
+    generator = EmojiGenerator()
+    font = generator.text_renderer.get_font("nanumgothic", 60)
+    
+    for background in ["transparent", "white", "#33333380"]:
+        bg_color = generator._parse_background(background)
+        effect = PartyEffect(
+            text="파티", font=font, text_color=generator._parse_color("#000000"), bg_color=bg_color, frame_count=8
+        )
+        frames = effect.generate_frames()
+        gif = Image.open(io.BytesIO(encode_gif(frames, 100)))
+        assert gif.n_frames == len(frames) == 8, background
+        
+        for index in range(len(frames)):
+            rendered = Image.new("RGBA", (effect.size, effect.size), bg_color)
+            draw = ImageDraw.Draw(rendered)
+            bbox = draw.textbbox((0, 0), "파티", font=font)
+            x = (effect.size - (bbox[2] - bbox[0])) // 2 - bbox[0]
+            y = (effect.size - (bbox[3] - bbox[1])) // 2 - bbox[1]
+            draw.text((x, y), "파티", font=font, fill=effect._frame_color(index))
+            
+            gif.seek(index)
+            decoded = gif.convert("RGBA")
+            if effect.is_transparent_bg():
+                # GIF keeps pixels above the alpha cutoff, fully opaque
+                kept = rendered.getchannel("A").point(lambda a: 255 if a > ALPHA_THRESHOLD else 0)
+                expected = Image.new("RGBA", rendered.size, (0, 0, 0, 0))
+                expected.paste(rendered.convert("RGB"), mask=kept)
+                visible = Image.new("RGBA", decoded.size, (0, 0, 0, 0))
+                visible.paste(decoded, mask=decoded.getchannel("A"))
+                decoded = visible
+            else:
+                expected = rendered.convert("RGB")
+                decoded = decoded.convert("RGB")
+            diff = ImageChops.difference(decoded, expected)
+            assert diff.getbbox(alpha_only=False) is None, (background, index)
+        
+        print(f"  [OK] {len(frames)} frames on {background}")
+
+
+def test_image_wave_effect():
+    """Test that the image wave effect matches shifting and pasting each row."""
+    print("\nTesting image wave effect:")
+    print("-" * 50)
+    
+    rng = random.Random(0)
+    
+    for size, frame_count in [(128, 12), (100, 7)]:
+        pixels = bytes(rng.randrange(256) for _ in range(size * size * 4))
+        img = Image.frombytes("RGBA", (size, size), pixels)
+        
+        frames = effect_frames(img, "wave", frame_count)
+        assert len(frames) == frame_count
+        
+        amplitude = size // 16
+        for i, frame in enumerate(frames):
+            # Previous implementation: crop and paste one row at a time
+            phase = (2 * math.pi * i) / frame_count
+            expected = Image.new("RGBA", img.size, (0, 0, 0, 0))
+            for y in range(size):
+                offset = int(amplitude * math.sin(2 * math.pi * y / size + phase))
+                row = img.crop((0, y, size, y + 1))
+                if offset != 0:
+                    expected.paste(row, (offset, y), row)
+            
+            assert frame.tobytes() == expected.tobytes(), (size, frame_count, i)
+        
+        print(f"  [OK] {size}px, {frame_count} frames")
+
+
+def test_grow_frames():
+    """Test that grow ends at the solved text size, drawn per frame or resampled."""
+    print("\nTesting grow frames:")
+    print("-" * 50)
+    
+    generator = EmojiGenerator()
+    font_size = generator.text_renderer.calculate_auto_font_size(
+        "자라", "nanumgothic", Config.EMOJI_SIZE, padding=generator.TEXT_PADDING
+    )
+    options = {
+        "text": "자라",
+        "font": generator.text_renderer.get_font("nanumgothic", font_size),
+        "text_color": generator._parse_color("#3366FF"),
+        "bg_color": generator._parse_background("transparent"),
+    }
+    
+    original = Config.GROW_RESAMPLE_FRAMES
+    try:
+        Config.GROW_RESAMPLE_FRAMES = False
+        drawn = get_effect("grow")(**options).generate_frames()
+        Config.GROW_RESAMPLE_FRAMES = True
+        resampled = get_effect("grow")(**options).generate_frames()
+    finally:
+        Config.GROW_RESAMPLE_FRAMES = original
+    
+    # The last frame is the text at the size the other effects use
+    static = get_effect("none")(**options).generate_frames()[0]
+    shaken = get_effect("shake")(**options).create_coverage_frame()
+    assert drawn[-1].tobytes() == static.tobytes() == shaken.tobytes()
+    print(f"  [OK] final frame {drawn[-1].getbbox()} matches the static text")
+    
+    # Resampling keeps the frame count, the final frame and the growth curve
+    assert len(resampled) == len(drawn) == get_effect("grow")(**options).frame_count
+    assert resampled[-1].tobytes() == drawn[-1].tobytes()
+    for drawn_frame, resampled_frame in zip(drawn, resampled):
+        for a, b in zip(drawn_frame.getbbox(), resampled_frame.getbbox()):
+            assert abs(a - b) <= 2, (drawn_frame.getbbox(), resampled_frame.getbbox())
+    print(f"  [OK] resampled {len(resampled)} frames within 2px of drawn frames")
+
+
+def test_render_cache():
+    """Test render cache tiers, persistence and size-capped eviction."""
+    print("\nTesting render cache:")
+    print("-" * 50)
+    
+    with tempfile.TemporaryDirectory() as disk_dir:
+        cache = RenderCache(memory_bytes=1000, disk_dir=disk_dir, disk_bytes=1000)
+        key = cache.make_key("text", text="ㅋㅋ", effect="PartyEffect")
+        assert key == cache.make_key("text", effect="PartyEffect", text="ㅋㅋ")
+        assert key != cache.make_key("text", text="ㅋㅋ", effect="ShakeEffect")
+        assert cache.get(key) is None
+        
+        artifacts = [(b"GIF89a" + b"0" * 400, "gif"), (b"GIF89a" + b"1" * 400, "gif")]
+        cache.put(key, artifacts)
+        assert cache.get(key) == artifacts
+        
+        # A new process starts with an empty memory tier and reads from disk
+        reloaded = RenderCache(memory_bytes=1000, disk_dir=disk_dir, disk_bytes=1000)
+        assert reloaded.get(key) == artifacts
+        assert reloaded.stats()["disk"]["hits"] == 1
+        
+        # Going over the disk limit evicts the least recently used entry
+        other = cache.make_key("text", text="other")
+        reloaded.put(other, [(b"\x89PNG" + b"2" * 400, "png")])
+        assert reloaded.get(other) is not None
+        assert os.listdir(disk_dir) == [other]
+        print(f"  [OK] {reloaded.stats()}")
+    
+    # Processes sharing the directory see each other's entries and keep
+    # the limit for all of them together
+    with tempfile.TemporaryDirectory() as disk_dir:
+        first = RenderCache(memory_bytes=1000, disk_dir=disk_dir, disk_bytes=1000)
+        second = RenderCache(memory_bytes=1000, disk_dir=disk_dir, disk_bytes=1000)
+        keys = [first.make_key("text", text=str(index)) for index in range(3)]
+        artifacts = [(b"GIF89a" + b"0" * 394, "gif")]
+        
+        first.put(keys[0], artifacts)
+        assert second.get(keys[0]) == artifacts
+        second.put(keys[1], artifacts)
+        first.put(keys[2], artifacts)
+        
+        sizes = [RenderCache._entry_size(os.path.join(disk_dir, key)) for key in os.listdir(disk_dir)]
+        assert sum(sizes) <= 1000, sizes
+        assert len(sizes) == 2 and keys[2] in os.listdir(disk_dir)
+        print(f"  [OK] shared directory kept at {sum(sizes)} bytes")
+
+
+def test_shared_font_size():
+    """Test that the batch font size fits every text and equals the tightest one."""
+    generator = EmojiGenerator()
+    renderer = generator.text_renderer
+    
+    print("\nTesting shared font size:")
+    print("-" * 50)
+    
+    chars = ["안", "녕", "H", "i", "!", "g", "W"]
+    shared = renderer.calculate_shared_font_size(chars, "nanumgothic", 128, padding=16)
+    individual = [renderer.calculate_auto_font_size(char, "nanumgothic", 128, padding=16) for char in chars]
+    assert shared == min(individual), (shared, individual)
+    
+    # All split characters are rendered with that one face
+    glyphs = generator.generate_split("".join(chars))
+    assert [char for char, _, _ in glyphs] == chars
+    
+    print(f"  [OK] shared size {shared} (individual {individual})")
+
+
+def test_select_thumbnail():
+    """Test picking the smallest Slack thumbnail that covers the emoji size."""
+    print("\n=== Testing thumbnail selection ===")
+    
+    # Panorama: thumbnails are scaled to fit a size x size box
+    file_info = {"mimetype": "image/jpeg", "url_private": "orig"}
+    for size in (360, 480, 720, 800, 960, 1024):
+        file_info[f"thumb_{size}"] = f"t{size}"
+        file_info[f"thumb_{size}_w"] = size
+        file_info[f"thumb_{size}_h"] = size // 4
+    
+    thumbs = image_thumbnails(file_info, target_size=128)
+    # Larger thumbnails than the first full cover are left out
+    assert [url for _, _, url in thumbs] == ["t360", "t480", "t720"]
+    assert select_image_url("orig", thumbs, "contain", target_size=128) == "t360"
+    assert select_image_url("orig", thumbs, "cover", target_size=128) == "t720"
+    assert select_image_url("orig", thumbs, "cover", target_size=512) == "orig"
+    
+    # Possibly animated types always use the original (APNG comes as image/png)
+    for mimetype in ("image/gif", "image/webp", "image/png"):
+        file_info["mimetype"] = mimetype
+        assert image_thumbnails(file_info) == [], mimetype
+    
+    print("  [OK] thumbnails picked per resize mode")
+
+
+def test_image_downloader():
+    """Test the streaming downloader against a local HTTP server."""
+    print("\n=== Testing image downloader ===")
+    
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), "red").save(buffer, format="PNG")
+    bodies = {
+        "/image.png": buffer.getvalue(),
+        "/large.png": buffer.getvalue() + b"\0" * 300_000,
+        "/page.html": b"<html>not an image</html>",
+    }
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = bodies.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            # No Content-Length, so the size limit is hit while streaming
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    
+    try:
+        downloader = ImageDownloader(max_bytes=100_000, connect_timeout=2, read_timeout=2)
+        assert downloader.fetch(f"{base_url}/image.png") == bodies["/image.png"]
+        
+        for path in ("/large.png", "/page.html", "/missing.png"):
+            try:
+                downloader.fetch(base_url + path)
+            except DownloadError as e:
+                print(f"  [OK] {path:12} rejected: {e}")
+            else:
+                raise AssertionError(f"{path} should be rejected")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_animated_image_input():
+    """Test that animated uploads keep their animation within the frame budget."""
+    print("\nTesting animated image input:")
+    print("-" * 50)
+    
+    frames = []
+    for i in range(30):
+        frame = Image.new("RGBA", (300, 200), (0, 0, 0, 0))
+        ImageDraw.Draw(frame).rectangle((i * 8, 50, i * 8 + 60, 150), fill=(255, 0, 0, 255))
+        frames.append(frame)
+    buffer = io.BytesIO()
+    frames[0].save(buffer, format="GIF", save_all=True, append_images=frames[1:], duration=50, loop=0)
+    
+    generator = EmojiGenerator()
+    max_frames = generator.config.ANIMATED_MAX_FRAMES
+    generator.config.ANIMATED_MAX_FRAMES = 10
+    try:
+        for effect in ("none", "shake"):
+            image_bytes, ext = generator.generate_from_image_with_effect(
+                buffer.getvalue(), effect=effect, resize_mode="contain",
+            )
+            gif = Image.open(io.BytesIO(image_bytes))
+            assert ext == "gif" and gif.size == (128, 128), effect
+            
+            # Every third source frame is kept, showing for three frames' time;
+            # the effect splits them into steps to keep moving
+            durations = []
+            for index in range(gif.n_frames):
+                gif.seek(index)
+                durations.append(gif.info["duration"])
+            if effect == "none":
+                assert gif.n_frames == 10, gif.n_frames
+            else:
+                assert gif.n_frames > 10, (effect, gif.n_frames)
+            assert sum(durations) == 1500, (effect, durations)
+            
+            print(f"  [OK] {effect:6} -> {gif.n_frames} frames, {sum(durations)}ms")
+    finally:
+        generator.config.ANIMATED_MAX_FRAMES = max_frames
+
+
+def test_gif_byte_budget():
+    """Test that GIFs over the byte budget get fewer colors, then fewer frames."""
+    print("\nTesting GIF byte budget:")
+    print("-" * 50)
+    
+    rng = random.Random(0)
+    frames = []
+    for _ in range(12):
+        pixels = bytes(rng.randrange(256) if i % 4 != 3 else 255 for i in range(64 * 64 * 4))
+        frames.append(Image.frombytes("RGBA", (64, 64), pixels))
+    
+    full, report = encode_within_budget(frames, 100, _to_palette_frame, PALETTE_LEVELS)
+    assert report["attempts"] == 1 and report["palette_level"] == 255
+    
+    for max_bytes in (len(full) // 2, len(full) // 4):
+        data, report = encode_within_budget(
+            frames, 100, _to_palette_frame, PALETTE_LEVELS, max_bytes=max_bytes,
+        )
+        assert report["within_budget"] and len(data) == report["bytes"] <= max_bytes, report
+        
+        gif = Image.open(io.BytesIO(data))
+        durations = []
+        for index in range(gif.n_frames):
+            gif.seek(index)
+            durations.append(gif.info["duration"])
+        assert gif.n_frames == report["frames"] and sum(durations) == 1200, durations
+        
+        print(f"  [OK] {max_bytes} bytes -> {report}")
+    
+    # Emojis carry how they were fit, through the worker pickle and the disk cache
+    with tempfile.TemporaryDirectory() as disk_dir:
+        generator = EmojiGenerator()
+        generator.render_cache = RenderCache(disk_dir=disk_dir)
+        max_kb = Config.EMOJI_MAX_KB
+        Config.EMOJI_MAX_KB = 2
+        try:
+            result = generator.generate("예산", effect="party")
+        finally:
+            Config.EMOJI_MAX_KB = max_kb
+        
+        report = budget_report(result)
+        assert was_reduced(report) and report["bytes"] == len(result[0]), report
+        assert budget_report(pickle.loads(pickle.dumps(result))) == report
+        
+        generator.render_cache.memory.clear()
+        cached = generator.generate("예산", effect="party")
+        assert cached == result and budget_report(cached) == report
+        assert budget_report(generator.generate("예산")) is None
+        print(f"  [OK] generate() report {report}")
+
+
+def test_split_glyph_cache():
+    """Test that split characters rendered before come from the glyph cache."""
+    print("\nTesting split glyph cache:")
+    print("-" * 50)
+    
+    generator = EmojiGenerator()
+    rendered = []
+    render_plans = generator._render_plans
+    
+    def spy(plans, *args, **kwargs):
+        rendered.extend(plan.text for plan in plans)
+        return render_plans(plans, *args, **kwargs)
+    
+    generator._render_plans = spy
+    style = {"text_color": "#123456", "background": "white"}
+    
+    first = generator.generate_split("가나", **style)
+    assert rendered == ["가", "나"], rendered
+    
+    hits = glyph_cache.stats()["hits"]
+    rendered.clear()
+    second = generator.generate_split("가나", **style)
+    assert rendered == [] and second == first
+    assert glyph_cache.stats()["hits"] == hits + 2
+    print(f"  [OK] repeat served from cache ({glyph_cache.stats()['hits'] - hits} hits)")
+    
+    # Only the new character is rasterized
+    third = generator.generate_split("나다", **style)
+    assert rendered == ["다"], rendered
+    assert third[0] == first[1]
+    print(f"  [OK] new characters rendered: {rendered}")
+
+
+def test_render_pool():
+    """Test that the render pool takes jobs round-robin per user, bounds its queue and keeps cache affinity."""
+    print("\nTesting render pool:")
+    print("-" * 50)
+    
+    pool = RenderPool(workers=1, max_queue=5, max_per_user=3)
+    finished = []
+    try:
+        jobs = [("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1")]
+        futures = []
+        for user_id, text in jobs:
+            future = pool.submit(user_id, "generate", text=text)
+            future.add_done_callback(lambda _, text=text: finished.append(text))
+            futures.append(future)
+        
+        # User a is at its limit, user b is not
+        try:
+            pool.submit("a", "generate", text="a4")
+        except RenderQueueFull as e:
+            print(f"  [OK] rejected: {e}")
+        else:
+            raise AssertionError("a4 should be rejected")
+        
+        for future in futures:
+            image_bytes, ext = future.result(timeout=60)
+            assert ext == "png" and image_bytes
+        
+        # b1 runs before a's third job
+        assert finished == ["a1", "a2", "b1", "a3"], finished
+        assert pool.stats()["completed"] == 4
+        print(f"  [OK] order {finished}")
+        
+        # The worker's own caches are reported back, not the parent's
+        for _ in range(100):
+            if pool.worker_stats() and pool.worker_stats()[0]["renders"]["misses"] == 4:
+                break
+            time.sleep(0.05)
+        stats = pool.worker_stats()
+        assert len(stats) == 1 and stats[0]["pid"] != os.getpid()
+        assert stats[0]["renders"]["misses"] == 4 and "processed_images" in stats[0]
+        print(f"  [OK] worker {stats[0]['pid']} caches: renders {stats[0]['renders']['misses']} misses")
+    finally:
+        pool.shutdown()
+    
+    # The same upload goes back to the worker that has it cached
+    pool = RenderPool(workers=2)
+    try:
+        buffer = io.BytesIO()
+        Image.new("RGB", (300, 200), (200, 40, 40)).save(buffer, format="PNG")
+        for source_id in ["F1", "F2"]:
+            key = _affinity_key("generate_from_image", {"source_id": source_id})
+            assert pool._free_worker(key) == pool._free_worker(key)
+        
+        # The second round comes in the other order, so first-free routing would swap workers
+        for sources in (["F1", "F2"], ["F2", "F1"]):
+            futures = [
+                pool.submit(source_id, "generate_from_image", image_data=buffer.getvalue(), source_id=source_id)
+                for source_id in sources
+            ]
+            for future in futures:
+                future.result(timeout=60)
+        
+        for _ in range(100):
+            hits = sum(stats["processed_images"]["hits"] for stats in pool.worker_stats())
+            if hits == 2:
+                break
+            time.sleep(0.05)
+        assert hits == 2, pool.worker_stats()
+        print(f"  [OK] second submit of each upload hit its worker's cache")
+    finally:
+        pool.shutdown()
+
+
+def test_generation_jobs():
+    """Test that jobs are claimed once, report progress and recover after a restart."""
+    print("\nTesting generation jobs:")
+    print("-" * 50)
+    
+    # Split mode reports one step per character
+    reports = []
+    EmojiGenerator().generate_split("작업", progress=lambda done, total: reports.append((done, total)))
+    assert reports == [(1, 2), (2, 2)], reports
+    print(f"  [OK] progress {reports}")
+    
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    store = JobStore()
+    
+    with app.app_context():
+        db.create_all()
+        job_id = store.create("U1", "T1", "C1", "text", {"text": "작업", "effect": "none"})
+        
+        job = store.claim("worker-1")
+        assert job.id == job_id and job.status == "running" and job.attempts == 1
+        assert store.claim("worker-2") is None
+        assert store.update_progress(job_id, "타일 3/10 인코딩 완료")
+        print("  [OK] claimed once")
+        
+        # The worker died: the job runs again, then fails once out of attempts
+        assert store.recover_stale(stale_seconds=0, max_attempts=2) == []
+        job = store.claim("worker-2")
+        assert job.id == job_id and job.attempts == 2 and job.progress is None
+        failed = store.recover_stale(stale_seconds=0, max_attempts=2)
+        assert [job.id for job in failed] == [job_id] and failed[0].status == "failed"
+        print(f"  [OK] recovered: {failed[0].error}")
+        
+        # Files already posted: the job is done, not run again
+        job_id = store.create("U1", "T1", "C1", "text", {"text": "완료", "effect": "none"})
+        store.claim("worker-1")
+        assert store.mark_uploaded(job_id)
+        assert store.recover_stale(stale_seconds=0, max_attempts=2) == []
+        assert db.session.get(GenerationJob, job_id).status == "done"
+        assert store.claim("worker-1") is None
+        print("  [OK] uploaded job not repeated")
+
+
+class FakeSlackClient:
+    """Slack client stand-in that records the calls made to it."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def chat_postMessage(self, **kwargs):
+        self.calls.append(("chat_postMessage", kwargs))
+        return {"ts": "1.0"}
+    
+    def chat_update(self, **kwargs):
+        self.calls.append(("chat_update", kwargs))
+    
+    def chat_postEphemeral(self, **kwargs):
+        self.calls.append(("chat_postEphemeral", kwargs))
+    
+    def files_upload_v2(self, **kwargs):
+        self.calls.append(("files_upload_v2", kwargs))
+        return {"ok": True}
+    
+    def workflows_stepCompleted(self, **kwargs):
+        self.calls.append(("workflows_stepCompleted", kwargs))
+    
+    def called(self, method):
+        return [kwargs for name, kwargs in self.calls if name == method]
+
+
+class InlineRenderPool:
+    """Render pool stand-in that renders in the calling thread and counts jobs."""
+    
+    def __init__(self):
+        self.submitted = []
+    
+    def submit(self, user_id, method, progress=None, **kwargs):
+        self.submitted.append(method)
+        future = concurrent.futures.Future()
+        future.set_result(getattr(EmojiGenerator(), method)(**kwargs))
+        return future
+
+
+def test_share_stored_artifact():
+    """Test that the share button of a job uploads the stored files without rendering again."""
+    print("\nTesting share of stored artifacts:")
+    print("-" * 50)
+    
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    
+    client = FakeSlackClient()
+    pool = InlineRenderPool()
+    worker = JobWorker()
+    worker.init_app(app)
+    worker._client = client
+    
+    params = {
+        "text": "공유",
+        "effect": "party",
+        "font": "nanumgothic",
+        "text_color": "#FF0000",
+        "background": "transparent",
+        "suggest_names": True,
+    }
+    saved_pool = jobs.render_pool
+    jobs.render_pool = pool
+    try:
+        with app.app_context():
+            db.create_all()
+            job_id = worker.store.create("U1", "T1", "C1", "text", params)
+            worker._run(worker.store.claim("worker-1"))
+            assert db.session.get(GenerationJob, job_id).status == "done"
+        assert pool.submitted == ["generate"]
+        posted = client.called("files_upload_v2")[0]["content"]
+        
+        # The share button is posted to the user with the artifact id
+        button = client.called("chat_postEphemeral")[0]["blocks"][-1]["elements"][0]
+        assert button["action_id"] == "share_emoji"
+        assert json.loads(button["value"])["artifact_id"]
+        
+        handlers = {}
+        bolt_app = type("BoltApp", (), {"action": lambda self, name: lambda f: handlers.setdefault(name, f)})()
+        actions.register(bolt_app)
+        
+        saved_client, saved_worker = actions.WebClient, actions.job_worker
+        actions.WebClient = lambda token: client
+        actions.job_worker = worker
+        responses = []
+        try:
+            handlers["share_emoji"](
+                ack=lambda: None,
+                body={"user": {"id": "U1"}, "actions": [{"value": button["value"]}]},
+                client=client,
+                respond=lambda **kwargs: responses.append(kwargs),
+            )
+            
+            # Without a stored artifact the listener queues a job instead of rendering
+            missing = dict(json.loads(button["value"]), artifact_id="missing")
+            handlers["share_emoji"](
+                ack=lambda: None,
+                body={"user": {"id": "U1"}, "actions": [{"value": json.dumps(missing)}]},
+                client=client,
+                respond=lambda **kwargs: responses.append(kwargs),
+            )
+        finally:
+            actions.WebClient, actions.job_worker = saved_client, saved_worker
+        
+        with app.app_context():
+            job = worker.store.claim("worker-1")
+            assert job.kind == "text" and json.loads(job.params)["shared"]
+    finally:
+        jobs.render_pool = saved_pool
+    
+    assert pool.submitted == ["generate"]
+    shared = client.called("files_upload_v2")[1]
+    assert shared["content"] == posted and shared["channel"] == "C1"
+    assert len(responses) == 2 and responses[0]["replace_original"]
+    print(f"  [OK] shared {len(posted)} stored bytes, renders: {pool.submitted}")
+
+
+def test_job_heartbeat():
+    """Test that jobs send heartbeats during uploads and stop once their claim is lost."""
+    print("\nTesting job heartbeats:")
+    print("-" * 50)
+    
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    
+    class SlowClient(FakeSlackClient):
+        """Upload takes several progress intervals; may let recovery take the job."""
+        
+        recover = False
+        takeover = False
+        
+        def files_upload_v2(self, **kwargs):
+            if self.recover or self.takeover:
+                assert worker.store.recover_stale(stale_seconds=0, max_attempts=3) == []
+            if self.takeover:
+                assert worker.store.claim("worker-2") is not None
+                raise RuntimeError("upload failed")
+            time.sleep(0.3)
+            return super().files_upload_v2(**kwargs)
+    
+    client = SlowClient()
+    worker = JobWorker()
+    worker.init_app(app)
+    worker._client = client
+    beats = []
+    update_progress = worker.store.update_progress
+    worker.store.update_progress = lambda *args: beats.append(args[1]) or update_progress(*args)
+    
+    params = {
+        "text": "심장",
+        "effect": "none",
+        "font": "nanumgothic",
+        "text_color": "#000000",
+        "background": "transparent",
+    }
+    saved_pool, saved_interval = jobs.render_pool, Config.JOB_PROGRESS_SECONDS
+    jobs.render_pool, Config.JOB_PROGRESS_SECONDS = InlineRenderPool(), 0.05
+    try:
+        with app.app_context():
+            db.create_all()
+            job_id = worker.store.create("U1", "T1", "C1", "text", params)
+            worker._run(worker.store.claim("worker-1"))
+            assert db.session.get(GenerationJob, job_id).status == "done"
+            assert beats.count("업로드 중") >= 3, beats
+            print(f"  [OK] {beats.count('업로드 중')} heartbeats during upload")
+            
+            # Recovery requeues the job mid-upload: the worker stops without failing it
+            client.recover = True
+            job_id = worker.store.create("U1", "T1", "C1", "text", params)
+            worker._run(worker.store.claim("worker-1"))
+            job = db.session.get(GenerationJob, job_id)
+            assert job.status == "queued" and job.error is None and job.uploaded_at is None
+            assert len(client.called("chat_postEphemeral")) == 1
+            print("  [OK] lost job left to its next run")
+            assert worker.store.finish(worker.store.claim("worker-2").id)
+            
+            # Another worker took the job over: failing here must not touch its row or message
+            client.recover, client.takeover = False, True
+            job_id = worker.store.create("U1", "T1", "C1", "text", params, message_ts="2.0")
+            worker._run(worker.store.claim("worker-1"))
+            job = db.session.get(GenerationJob, job_id)
+            assert job.status == "running" and job.worker_id == "worker-2" and job.error is None
+            assert not any("❌" in update["text"] for update in client.called("chat_update"))
+            print("  [OK] job taken over by another worker left alone")
+    finally:
+        jobs.render_pool, Config.JOB_PROGRESS_SECONDS = saved_pool, saved_interval
+
+
+def test_workflow_job():
+    """Test that a workflow step is rendered by a job under its requester and completed."""
+    print("\nTesting workflow step job:")
+    print("-" * 50)
+    
+    from slack import workflow_step
+    
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    
+    client = FakeSlackClient()
+    pool = InlineRenderPool()
+    worker = JobWorker()
+    worker.init_app(app)
+    worker._client = client
+    
+    step = {
+        "workflow_step_execute_id": "E1",
+        "workflow_id": "Wf1",
+        "inputs": {
+            "text": {"value": "워크"},
+            "effect": {"value": "none"},
+            "background": {"value": "transparent"},
+            "text_color": {"value": "#000000"},
+            "font": {"value": "nanumgothic"},
+            "line_break_at": {"value": "0"},
+            "requester": {"value": "<@U0123ABCD>"},
+        },
+    }
+    saved_pool, saved_worker = jobs.render_pool, workflow_step.job_worker
+    jobs.render_pool, workflow_step.job_worker = pool, worker
+    failures = []
+    try:
+        with app.app_context():
+            db.create_all()
+            workflow_step.execute_handler(step=step, body={"team_id": "T1"}, fail=failures.append)
+            assert pool.submitted == [] and not client.called("chat_postMessage")
+            
+            job = worker.store.claim("worker-1")
+            assert job.kind == "workflow" and job.user_id == "U0123ABCD"
+            worker._run(job)
+            assert db.session.get(GenerationJob, job.id).status == "done"
+    finally:
+        jobs.render_pool, workflow_step.job_worker = saved_pool, saved_worker
+    
+    assert not failures and pool.submitted == ["generate"]
+    completed = client.called("workflows_stepCompleted")
+    assert completed and completed[0]["workflow_step_execute_id"] == "E1"
+    print(f"  [OK] completed for {job.user_id}: {completed[0]['outputs']['emoji_filename']}")
+
+
+def test_frame_parallel():
+    """Test that frames rendered on the frame pool match serial rendering."""
+    print("\nTesting frame-parallel rendering:")
+    print("-" * 50)
+    
+    generator = EmojiGenerator()
+    font = generator.text_renderer.get_font("nanumgothic", 48)
+    text_color = generator._parse_color("#FF5733")
+    bg_color = generator._parse_background("transparent")
+    image = Image.new("RGBA", (128, 128), (0, 0, 0, 0))
+    ImageDraw.Draw(image).ellipse((10, 10, 110, 110), fill=(255, 80, 40, 255))
+    
+    def render_all():
+        frames = {}
+        for name in ("shake", "wave", "grow", "rotate", "scroll"):
+            effect = get_effect(name)(
+                text="흔들", font=font, text_color=text_color, bg_color=bg_color, frame_count=24
+            )
+            frames[name] = [frame.tobytes() for frame in effect.generate_frames()]
+        for name in ("wave", "rotate"):
+            frames[f"image {name}"] = [frame.tobytes() for frame in effect_frames(image, name, 24)]
+        return frames
+    
+    original_workers, original_share = Config.FRAME_WORKERS, frame_pool._cpu_share
+    try:
+        Config.FRAME_WORKERS = 1
+        serial = render_all()
+        Config.FRAME_WORKERS = 4
+        parallel = render_all()
+        # The frame threads follow the setting instead of keeping their first size
+        assert frame_pool._executor_workers == 4
+        
+        # Render pool workers default to their share of the CPUs
+        Config.FRAME_WORKERS = 0
+        frame_pool.set_cpu_share(0)
+        assert frame_pool.frame_workers() == 1
+    finally:
+        Config.FRAME_WORKERS, frame_pool._cpu_share = original_workers, original_share
+    
+    for name in serial:
+        assert serial[name] == parallel[name], name
+        print(f"  [OK] {name:12} {len(serial[name])} frames")
+    
+    # Each shake frame comes from its own seed, not from the frames before it
+    effect = ShakeEffect(text="흔들", font=font, text_color=text_color, bg_color=bg_color, frame_count=24)
+    assert effect._render_frame(17).tobytes() == serial["shake"][17]
+    assert len(set(serial["shake"])) > 1
+    print("  [OK] shake frames seeded per frame")
+
+
+def test_generate_many():
+    """Test that a batch matches single generations, in order, with per-item errors."""
+    print("\nTesting batch generation:")
+    print("-" * 50)
+    
+    generator = EmojiGenerator()
+    requests = [
+        {"text": "배치", "effect": "shake", "text_color": "#FF5733"},
+        {"text": "배치", "effect": "none", "text_color": "#FF5733"},
+        {"text": "Batch", "effect": "wave", "background": "white"},
+        {"text": "배치", "effect": "shake", "text_color": "#FF5733"},
+        {"text": None},
+        {"text": "배치", "colour": "#FF5733"},
+    ]
+    reports = []
+    results = generator.generate_many(requests, progress=lambda done, total: reports.append((done, total)))
+    
+    # Rendered from scratch, not read back from what generate_many() just cached
+    uncached = EmojiGenerator()
+    uncached.render_cache = RenderCache(memory_bytes=0, disk_bytes=0)
+    
+    assert len(results) == len(requests)
+    for request, (image_bytes, ext, error) in zip(requests[:4], results):
+        assert error is None, error
+        assert (image_bytes, ext) == uncached.generate(**request)
+    assert len(uncached.render_cache.memory) == 0
+    assert results[0] == results[3]
+    for image_bytes, ext, error in results[4:]:
+        assert image_bytes is None and ext is None and error
+        print(f"  [OK] error: {error}")
+    assert reports[-1] == (len(requests), len(requests)), reports
+    print(f"  [OK] {len(requests)} requests in order, progress {reports[-1]}")
+
+
+def test_api_batch():
+    """Test that the batch endpoint streams one NDJSON line per item from the render pool."""
+    print("\nTesting batch API:")
+    print("-" * 50)
+    
+    from routes import api
+    app = Flask(__name__)
+    app.register_blueprint(api_bp)
+    client = app.test_client()
+    
+    items = [
+        {"text": "하나", "effect": "party"},
+        "not an item",
+        {"text": "둘", "text_color": "#3366FF", "background": "white"},
+        {"effect": "wave"},
+    ]
+    
+    class HeldRenderPool:
+        """Render pool stand-in that leaves jobs pending and rejects items without text."""
+        
+        max_per_user = 2
+        
+        def __init__(self):
+            self.submitted = []
+        
+        def submit(self, user_id, method, progress=None, **kwargs):
+            if kwargs["text"] is None:
+                raise RenderQueueFull("queue full")
+            future = concurrent.futures.Future()
+            if kwargs["text"] == "하나":
+                future.set_result((b"GIF89a", "gif"))
+            self.submitted.append((user_id, kwargs["text"], future))
+            return future
+    
+    saved_pool = api.render_pool
+    pool = RenderPool(workers=1)
+    try:
+        api.render_pool = pool
+        response = client.post("/api/generate/batch", json={"items": items})
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        
+        lines = {line["index"]: line for line in map(json.loads, response.get_data(as_text=True).splitlines())}
+        assert sorted(lines) == [0, 1, 2, 3]
+        
+        expected = EmojiGenerator().generate("하나", effect="party")
+        assert lines[0]["success"] and lines[0]["format"] == expected[1]
+        assert base64.b64decode(lines[0]["image"]) == expected[0] and lines[0]["size"] == len(expected[0])
+        assert lines[2]["success"] and lines[2]["format"] == "png"
+        assert not lines[1]["success"] and not lines[3]["success"]
+        assert (pool.stats()["completed"], pool.stats()["failed"]) == (2, 1)
+        print(f"  [OK] {len(lines)} lines, errors: {lines[1]['error']!r}, {lines[3]['error']!r}")
+        
+        assert client.post("/api/generate/batch", json={"items": []}).status_code == 400
+        print("  [OK] empty batch rejected")
+        
+        # Only a window of items is queued; closing cancels what has not started
+        api.render_pool = HeldRenderPool()
+        response = client.post("/api/generate/batch", json={"items": items}, buffered=False)
+        lines = []
+        for chunk in response.iter_encoded():
+            lines.append(json.loads(chunk))
+            if lines[-1]["index"] == 0:
+                break
+        response.close()
+        submitted = api.render_pool.submitted
+        assert [text for _, text, _ in submitted] == ["하나", "둘"]
+        assert {user_id for user_id, _, _ in submitted} == {"api:127.0.0.1"}
+        assert submitted[1][2].cancelled()
+        print(f"  [OK] window of {len(submitted)}, cancelled on disconnect")
+        
+        # A full render queue fails the item, not the batch
+        api.render_pool.submitted.clear()
+        response = client.post("/api/generate/batch", json={"items": [items[0], items[3]]})
+        lines = {line["index"]: line for line in map(json.loads, response.get_data(as_text=True).splitlines())}
+        assert lines[0]["success"] and lines[1] == {"index": 1, "success": False, "error": "queue full"}
+        print(f"  [OK] rejected item: {lines[1]['error']!r}")
+    finally:
+        api.render_pool = saved_pool
+        pool.shutdown()
+
+
 if __name__ == "__main__":
     print("=" * 50)
     print("Slack Emoji Generator - Test Suite")
@@ -139,6 +1161,26 @@ if __name__ == "__main__":
     test_all_effects()
     test_line_break()
     test_colors()
+    test_coverage_mask_frames()
+    test_delta_gif_frames()
+    test_party_palettes()
+    test_image_wave_effect()
+    test_grow_frames()
+    test_render_cache()
+    test_shared_font_size()
+    test_select_thumbnail()
+    test_image_downloader()
+    test_animated_image_input()
+    test_gif_byte_budget()
+    test_split_glyph_cache()
+    test_render_pool()
+    test_generation_jobs()
+    test_share_stored_artifact()
+    test_job_heartbeat()
+    test_workflow_job()
+    test_frame_parallel()
+    test_generate_many()
+    test_api_batch()
     
     print("\n" + "=" * 50)
     print("Tests completed! Check static/ directory for generated images.")
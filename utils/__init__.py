@@ -2,9 +2,24 @@
 
 from .upload import upload_with_retry
 from .sanitize import sanitize_emoji_name, sanitize_filename
+from .artifacts import store_artifacts, load_artifacts
+from .download import (
+    DownloadError,
+    ImageDownloader,
+    download_slack_file,
+    image_thumbnails,
+    select_image_url,
+)
 
 __all__ = [
     "upload_with_retry",
     "sanitize_emoji_name",
     "sanitize_filename",
+    "store_artifacts",
+    "load_artifacts",
+    "DownloadError",
+    "ImageDownloader",
+    "download_slack_file",
+    "image_thumbnails",
+    "select_image_url",
 ]
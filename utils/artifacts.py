@@ -0,0 +1,41 @@
+"""Rendered emoji artifacts that interactive messages refer to by id."""
+
+import uuid
+from typing import List, Optional, Tuple
+
+from generators import render_cache
+
+
+def store_artifacts(artifacts: List[Tuple[bytes, str]]) -> str:
+    """
+    Store a rendered artifact set (one image, scroll tiles or split characters).
+    
+    Args:
+        artifacts: List of (image bytes, extension)
+    
+    Returns:
+        Artifact id to carry in a button payload
+    """
+    artifact_id = uuid.uuid4().hex
+    render_cache.put(_cache_key(artifact_id), artifacts)
+    return artifact_id
+
+
+def load_artifacts(artifact_id: str) -> Optional[List[Tuple[bytes, str]]]:
+    """
+    Get a stored artifact set.
+    
+    Args:
+        artifact_id: Id returned by store_artifacts()
+    
+    Returns:
+        List of (image bytes, extension), or None if it was evicted
+    """
+    if not artifact_id:
+        return None
+    return render_cache.get(_cache_key(artifact_id))
+
+
+def _cache_key(artifact_id: str) -> str:
+    """Render cache key of an artifact set."""
+    return render_cache.make_key("artifact", id=artifact_id)
@@ -0,0 +1,263 @@
+"""Download helpers for Slack-hosted files."""
+
+import io
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+from generators.cache import LRUCache
+from generators.image_processor import ResizeMode
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes of the image formats accepted for emojis
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+)
+
+# Bytes needed to tell the formats apart (WebP: "RIFF" <size> "WEBP")
+SNIFF_BYTES = 12
+
+
+class DownloadError(ValueError):
+    """Raised when a file cannot be downloaded or is not an image."""
+
+
+def sniff_image_type(data: bytes) -> Optional[str]:
+    """
+    Detect the image format from the first bytes of a file.
+    
+    Args:
+        data: Start of the file (at least SNIFF_BYTES when available)
+    
+    Returns:
+        Format name (e.g. "png"), or None if it is not a supported image
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    for signature, image_type in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return image_type
+    return None
+
+
+class ImageDownloader:
+    """
+    Streaming image downloader over a pooled keep-alive session.
+    
+    Bodies are read in chunks and aborted as soon as they pass max_bytes
+    or their first bytes are not an image, so oversized or wrong files
+    never get buffered completely.
+    """
+    
+    CHUNK_SIZE = 64 * 1024
+    
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        pool_size: Optional[int] = None,
+    ):
+        """
+        Initialize downloader.
+        
+        Args:
+            max_bytes: Largest accepted body (defaults to Config.DOWNLOAD_MAX_MB)
+            connect_timeout: Seconds to establish a connection
+                (defaults to Config.DOWNLOAD_CONNECT_TIMEOUT)
+            read_timeout: Seconds to wait between received bytes
+                (defaults to Config.DOWNLOAD_READ_TIMEOUT)
+            pool_size: Keep-alive connections kept per host
+                (defaults to Config.DOWNLOAD_POOL_SIZE)
+        """
+        if max_bytes is None:
+            max_bytes = Config.DOWNLOAD_MAX_MB * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else Config.DOWNLOAD_CONNECT_TIMEOUT,
+            read_timeout if read_timeout is not None else Config.DOWNLOAD_READ_TIMEOUT,
+        )
+        
+        pool_size = pool_size or Config.DOWNLOAD_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> bytes:
+        """
+        Download an image.
+        
+        Args:
+            url: Image URL
+            headers: Extra request headers (e.g. Authorization)
+        
+        Returns:
+            Image bytes
+        
+        Raises:
+            DownloadError: On HTTP/network errors, bodies over max_bytes
+                or files that are not images
+        """
+        try:
+            with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                if response.status_code != 200:
+                    raise DownloadError(f"이미지 다운로드 실패: {response.status_code}")
+                
+                length = response.headers.get("Content-Length")
+                if length and length.isdigit() and int(length) > self.max_bytes:
+                    raise DownloadError(f"이미지가 너무 큽니다: {int(length)} bytes")
+                
+                return self._read_body(response)
+        except requests.RequestException as e:
+            raise DownloadError(f"이미지 다운로드 실패: {e}") from e
+    
+    def _read_body(self, response: requests.Response) -> bytes:
+        """Stream a response body, checking its type and size on the way."""
+        buffer = io.BytesIO()
+        sniffed = False
+        
+        for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+            buffer.write(chunk)
+            if buffer.tell() > self.max_bytes:
+                raise DownloadError(f"이미지가 너무 큽니다: {self.max_bytes} bytes 초과")
+            
+            if not sniffed and buffer.tell() >= SNIFF_BYTES:
+                self._check_image(buffer.getvalue()[:SNIFF_BYTES])
+                sniffed = True
+        
+        data = buffer.getvalue()
+        if not sniffed:
+            self._check_image(data)
+        return data
+    
+    @staticmethod
+    def _check_image(head: bytes):
+        """Reject bodies that do not start like a supported image."""
+        if sniff_image_type(head) is None:
+            raise DownloadError("이미지 파일이 아닙니다")
+
+
+# Shared downloader, so connections to Slack are reused across requests
+image_downloader = ImageDownloader()
+
+# Downloaded file bytes keyed by (Slack file id, url), so re-submitting the
+# same upload with other options does not download it again
+download_cache = LRUCache(
+    max_entries=None,
+    max_bytes=Config.IMAGE_CACHE_MB * 1024 * 1024,
+    sizeof=len,
+    ttl=Config.IMAGE_CACHE_TTL,
+)
+
+# Slack thumbnail sizes that come with their dimensions, smallest first.
+# Thumbnails are scaled to fit a size x size box, keeping the aspect ratio.
+THUMB_SIZES = (360, 480, 720, 800, 960, 1024)
+
+# Types that may be animated; their thumbnails only show the first frame.
+# Slack reports APNG uploads as image/png, so every PNG uses the original.
+ANIMATED_MIMETYPES = ("image/gif", "image/webp", "image/apng", "image/png")
+
+
+def image_thumbnails(file_info: dict, target_size: Optional[int] = None) -> List[List]:
+    """
+    Collect the thumbnails of a Slack file that can replace the original.
+    
+    Thumbnails past the first one covering target_size on both sides are
+    never picked, so they are left out to keep button values small.
+    Possibly animated images have no usable thumbnails (Slack's are
+    still frames).
+    
+    Args:
+        file_info: Slack file object
+        target_size: Emoji size (defaults to Config.EMOJI_SIZE)
+    
+    Returns:
+        List of [width, height, url], smallest first
+    """
+    if file_info.get("mimetype") in ANIMATED_MIMETYPES:
+        return []
+    
+    target = target_size or Config.EMOJI_SIZE
+    thumbnails = []
+    for size in THUMB_SIZES:
+        url = file_info.get(f"thumb_{size}")
+        width = file_info.get(f"thumb_{size}_w")
+        height = file_info.get(f"thumb_{size}_h")
+        if not (url and width and height):
+            continue
+        
+        thumbnails.append([int(width), int(height), url])
+        if min(int(width), int(height)) >= target:
+            break
+    
+    return thumbnails
+
+
+def select_image_url(
+    file_url: str,
+    thumbnails: Optional[Sequence[Sequence]],
+    resize_mode: str = ResizeMode.COVER,
+    target_size: Optional[int] = None,
+) -> str:
+    """
+    Pick the smallest image that still covers the emoji size.
+    
+    Cover and fill scale the short side to the emoji size, contain the long
+    side. Falls back to the original when no thumbnail is large enough.
+    
+    Args:
+        file_url: Original file URL
+        thumbnails: Thumbnails from image_thumbnails()
+        resize_mode: Resize mode - 'fill', 'cover', or 'contain'
+        target_size: Emoji size (defaults to Config.EMOJI_SIZE)
+    
+    Returns:
+        URL to download
+    """
+    target = target_size or Config.EMOJI_SIZE
+    for width, height, url in thumbnails or ():
+        if resize_mode == ResizeMode.CONTAIN:
+            covered = max(width, height) >= target
+        else:
+            covered = min(width, height) >= target
+        if covered:
+            return url
+    return file_url
+
+
+def download_slack_file(file_id: str, file_url: str) -> bytes:
+    """
+    Download a private Slack file with the bot token.
+    
+    Args:
+        file_id: Slack file id (cache key, may be empty)
+        file_url: Private file URL
+    
+    Returns:
+        File bytes
+    
+    Raises:
+        DownloadError: If the download fails or the file is not an image
+    """
+    cache_key = (file_id, file_url)
+    if file_id:
+        cached = download_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"[DOWNLOAD] 캐시 사용 - file: {file_id}")
+            return cached
+    
+    headers = {"Authorization": f"Bearer {Config.SLACK_BOT_TOKEN}"}
+    data = image_downloader.fetch(file_url, headers=headers)
+    
+    if file_id:
+        download_cache.put(cache_key, data)
+    return data